@@ -13,18 +13,21 @@ const MasterTable = () => {
   const [loading, setLoading] = useState(false);
   const [page, setPage] = useState(0);
   const [hasMore, setHasMore] = useState(true);
+  const [cursor, setCursor] = useState(null); // opaque keyset cursor from the previous page
   const pageSize = 10;
 
   const fetchMovies = async () => {
     setLoading(true);
     try {
-      const response = await fetch(`${API_ENDPOINT}/movies/search?limit=${pageSize}&offset=${page * pageSize}`);
+      const queryParams = new URLSearchParams({ limit: pageSize });
+      if (page > 0 && cursor) queryParams.append('cursor', cursor);
+      const response = await fetch(`${API_ENDPOINT}/movies/search?${queryParams.toString()}`);
       const data = await response.json();
 
-      if (data.results.length === 0) {
+      setRowData(prev => [...prev, ...data.results]); // append new movies
+      setCursor(data.next_cursor);
+      if (!data.next_cursor) {
         setHasMore(false); // no more movies to load
-      } else {
-        setRowData(prev => [...prev, ...data.results]); // append new movies
       }
     } catch (error) {
       console.error("Error fetching movies:", error);
@@ -40,6 +43,7 @@ const MasterTable = () => {
   useEffect(() => {
     setRowData([]);
     setPage(0);
+    setCursor(null);
     setHasMore(true);
   }, [searchTerm]);
 
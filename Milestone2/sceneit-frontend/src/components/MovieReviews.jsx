@@ -9,7 +9,9 @@ const MovieReviews = () => {
     const [reviews, setReviews] = useState([]);
     const [movieTitle, setMovieTitle] = useState('');
     const [loading, setLoading] = useState(false);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState('');
+    const [nextCursor, setNextCursor] = useState(null); // keyset cursor for the next page of reviews
     const authUser = JSON.parse(localStorage.getItem('authUser')) || {};
     const loggedInUserId = authUser?.user?.user_id;
 
@@ -26,12 +28,16 @@ const MovieReviews = () => {
         }
     };
 
-    const fetchReviews = async () => {
+    // cursor = null loads the first page, otherwise the page after it is appended
+    const fetchReviews = async (cursor = null) => {
         if (!movieId) return;
-        setLoading(true);
+        const setBusy = cursor ? setLoadingMore : setLoading;
+        setBusy(true);
         setError('');
         try {
-            const response = await fetch(`http://localhost:8000/reviews/search?movie_id=${movieId}`);
+            const params = new URLSearchParams({ movie_id: movieId });
+            if (cursor) params.append('cursor', cursor);
+            const response = await fetch(`http://localhost:8000/reviews/search?${params.toString()}`);
             if (!response.ok) {
                 const data = await response.json().catch(() => ({}));
                 throw new Error(data.detail || 'Failed to fetch reviews');
@@ -49,14 +55,15 @@ const MovieReviews = () => {
                 .filter(result => result.status === 'fulfilled')
                 .map(result => result.value.review); // Extract the main review object
 
-            setReviews(successfulReviews || []);
+            setReviews(prev => cursor ? [...prev, ...successfulReviews] : successfulReviews);
+            setNextCursor(data.next_cursor || null);
 
         } catch (error) {
             console.error('Error fetching reviews:', error);
             setError(error.message || 'An error occurred loading reviews.');
-            setReviews([]);
+            if (!cursor) setReviews([]);
         } finally {
-            setLoading(false);
+            setBusy(false);
         }
     };
 
@@ -164,6 +171,16 @@ const MovieReviews = () => {
                     ))}
                 </div>
             )}
+
+            {!loading && nextCursor && (
+                <button
+                    className="load-more-button"
+                    onClick={() => fetchReviews(nextCursor)}
+                    disabled={loadingMore}
+                >
+                    {loadingMore ? 'Loading...' : 'Load More'}
+                </button>
+            )}
         </div>
     );
 };
@@ -14,6 +14,53 @@ const UserProfile = () => {
   const [reputation, setReputation] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  // keyset cursors for the next page of each paginated list (null when there is none)
+  const [reviewsCursor, setReviewsCursor] = useState(null);
+  const [likesCursor, setLikesCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState('');
+
+  const fetchReviewDetails = async (reviewIds) => {
+    const results = await Promise.allSettled(reviewIds.map(id =>
+      fetch(`${API_ENDPOINT}/reviews/${id}`)
+        .then(res => res.ok ? res.json() : Promise.reject(`Review ${id} fetch failed`))
+    ));
+    return results
+      .filter(result => result.status === 'fulfilled')
+      .map(result => result.value);
+  };
+
+  const loadMoreReviews = async () => {
+    if (!reviewsCursor) return;
+    setLoadingMore('reviews');
+    try {
+      const res = await fetch(`${API_ENDPOINT}/user_profile/${userId}/user_reviews?cursor=${encodeURIComponent(reviewsCursor)}`);
+      if (!res.ok) throw new Error(res.statusText);
+      const data = await res.json();
+      setUserReviews(prev => [...prev, ...(data.results || [])]);
+      setReviewsCursor(data.next_cursor || null);
+    } catch (err) {
+      console.error("Failed to fetch more reviews:", err);
+    } finally {
+      setLoadingMore('');
+    }
+  };
+
+  const loadMoreLikedReviews = async () => {
+    if (!likesCursor) return;
+    setLoadingMore('likes');
+    try {
+      const res = await fetch(`${API_ENDPOINT}/user_profile/${userId}/user_liked?cursor=${encodeURIComponent(likesCursor)}`);
+      if (!res.ok) throw new Error(res.statusText);
+      const data = await res.json();
+      const moreLikedReviews = await fetchReviewDetails(data.review_ids || []);
+      setLikedReviews(prev => [...prev, ...moreLikedReviews]);
+      setLikesCursor(data.next_cursor || null);
+    } catch (err) {
+      console.error("Failed to fetch more liked reviews:", err);
+    } finally {
+      setLoadingMore('');
+    }
+  };
 
   useEffect(() => {
     const fetchUserData = async () => {
@@ -25,6 +72,8 @@ const UserProfile = () => {
       setLikedReviews([]);
       setLikedMovies([]);
       setSimilarUsers([]);
+      setReviewsCursor(null);
+      setLikesCursor(null);
 
       try {
         const results = await Promise.allSettled([
@@ -48,26 +97,15 @@ const UserProfile = () => {
         if (reviewsRes.status === 'fulfilled' && reviewsRes.value.ok) {
           const reviewsData = await reviewsRes.value.json();
           setUserReviews(reviewsData.results || []);
+          setReviewsCursor(reviewsData.next_cursor || null);
         } else {
           console.error("Failed to fetch user reviews:", reviewsRes.reason || reviewsRes.value?.statusText);
         }
 
         if (likesRes.status === 'fulfilled' && likesRes.value.ok) {
           const likesData = await likesRes.value.json();
-          const likedReviewIds = likesData.review_ids || [];
-          if (likedReviewIds.length > 0) {
-            const likedReviewFetches = likedReviewIds.map(id =>
-              fetch(`${API_ENDPOINT}/reviews/${id}`)
-                .then(res => res.ok ? res.json() : Promise.reject(`Review ${id} fetch failed`))
-            );
-            const likedReviewResults = await Promise.allSettled(likedReviewFetches);
-            const successfulLikedReviews = likedReviewResults
-              .filter(result => result.status === 'fulfilled')
-              .map(result => result.value);
-            setLikedReviews(successfulLikedReviews);
-          } else {
-            setLikedReviews([]);
-          }
+          setLikedReviews(await fetchReviewDetails(likesData.review_ids || []));
+          setLikesCursor(likesData.next_cursor || null);
         } else {
           console.error("Failed to fetch liked review IDs:", likesRes.reason || likesRes.value?.statusText);
         }
@@ -209,6 +247,11 @@ const UserProfile = () => {
               ))
             )}
           </ul>
+          {reviewsCursor && (
+            <button className="load-more-button" onClick={loadMoreReviews} disabled={loadingMore === 'reviews'}>
+              {loadingMore === 'reviews' ? 'Loading...' : 'Load More'}
+            </button>
+          )}
         </div>
       </section>
 
@@ -246,6 +289,11 @@ const UserProfile = () => {
                 ))
                 )}
             </ul>
+            {likesCursor && (
+              <button className="load-more-button" onClick={loadMoreLikedReviews} disabled={loadingMore === 'likes'}>
+                {loadingMore === 'likes' ? 'Loading...' : 'Load More'}
+              </button>
+            )}
         </div>
       </section>
 
@@ -0,0 +1,118 @@
+"""
+Concurrency stress test for review likes: many threads like the same review at
+once, every user several times, through the single-statement insert in
+queries/likes.py (the one like_item runs).
+
+Reports throughput and checks that no user ended up with more than one like on
+the review, i.e. that the unique index on Likes(user_id, review_id) held under
+contention. Exits with status 1 if it didn't.
+
+The likes it creates are kept unless --cleanup is given (the reputation points
+the like trigger awarded are not taken back either way).
+
+Run from the sceneit directory against a seeded database:
+    python -m benchmarks.like_concurrency [--review-id 1] [--users 50] [--attempts 5] [--workers 16]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extras
+
+from queries.likes import INSERT_REVIEW_LIKE_SQL
+from utils.db import get_db_connection
+
+DUPLICATE_LIKES_SQL = """
+SELECT user_id, COUNT(*) AS likes
+FROM Likes
+WHERE review_id = %s
+GROUP BY user_id
+HAVING COUNT(*) > 1
+"""
+
+
+def like_once(review_id, user_id):
+    """Returns ("created", like_id), ("duplicate", None) or ("error", message)."""
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(INSERT_REVIEW_LIKE_SQL, {"user_id": user_id, "target_id": review_id})
+                row = cur.fetchone()
+    except psycopg2.errors.UniqueViolation:
+        return "duplicate", None
+    except psycopg2.Error as e:
+        return "error", str(e)
+    if row["like_id"] is not None:
+        return "created", row["like_id"]
+    if not row["user_exists"] or not row["target_exists"]:
+        return "error", "user or review not found"
+    return "duplicate", None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--review-id", type=int, default=1)
+    parser.add_argument("--users", type=int, default=50, help="distinct users liking the review")
+    parser.add_argument("--attempts", type=int, default=5, help="likes fired per user")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent threads (keep <= DB_POOL_MAX_SIZE)")
+    parser.add_argument("--cleanup", action="store_true", help="delete the likes created by this run")
+    args = parser.parse_args()
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM Reviews WHERE review_id = %s", (args.review_id,))
+            if cur.fetchone() is None:
+                sys.exit(f"Review {args.review_id} not found")
+            cur.execute("SELECT user_id FROM Users ORDER BY user_id LIMIT %s", (args.users,))
+            user_ids = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT user_id FROM Likes WHERE review_id = %s", (args.review_id,))
+            already_liked = {row[0] for row in cur.fetchall()}
+
+    attempts = [user_id for user_id in user_ids for _ in range(args.attempts)]
+    random.shuffle(attempts)
+    print(f"Firing {len(attempts)} likes from {len(user_ids)} users at review {args.review_id} "
+          f"with {args.workers} workers")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = list(executor.map(lambda user_id: like_once(args.review_id, user_id), attempts))
+    seconds = time.perf_counter() - start
+
+    counts = Counter(status for status, _ in outcomes)
+    created_ids = [value for status, value in outcomes if status == "created"]
+    errors = Counter(value for status, value in outcomes if status == "error")
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(DUPLICATE_LIKES_SQL, (args.review_id,))
+            duplicate_rows = cur.fetchall()
+            if args.cleanup and created_ids:
+                cur.execute("DELETE FROM Likes WHERE like_id = ANY(%s)", (created_ids,))
+
+    expected_created = len(set(user_ids) - already_liked)
+    report = {
+        "attempts": len(attempts),
+        "workers": args.workers,
+        "seconds": round(seconds, 3),
+        "attempts_per_second": round(len(attempts) / seconds, 1) if seconds else None,
+        "created": counts["created"],
+        "expected_created": expected_created,
+        "duplicates_rejected": counts["duplicate"],
+        "errors": dict(errors),
+        "users_with_duplicate_likes": len(duplicate_rows),
+    }
+    print(json.dumps(report, indent=2))
+
+    ok = not duplicate_rows and not errors and counts["created"] == expected_created
+    print("OK" if ok else "FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
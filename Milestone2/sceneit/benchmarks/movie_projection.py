@@ -0,0 +1,157 @@
+"""
+Compares the old fan-out LEFT JOIN movie projection with the per-dimension
+projection in queries/movie_projection.py.
+
+For every call site it reports:
+  - rows processed: sum of actual rows * loops over every node in the plan,
+    i.e. how many intermediate rows Postgres had to produce
+  - median / p95 latency over a number of runs
+
+Run from the sceneit directory against a seeded database:
+    python -m benchmarks.movie_projection [--runs 20]
+"""
+import argparse
+import json
+import statistics
+import time
+
+from queries.movies import GET_MOVIE_SQL, GET_MOVIES_BY_AUDIENCE_RATING_SQL, build_movie_search_query
+from utils.db import get_db_connection
+
+# The projection every call site used before queries/movie_projection.py.
+FAN_OUT_PROJECTION_SQL = """
+SELECT
+    m.*,
+    ARRAY_AGG(DISTINCT g.name) FILTER (WHERE g.name IS NOT NULL) as genres,
+    ARRAY_AGG(DISTINCT w.name) FILTER (WHERE w.name IS NOT NULL) as writers,
+    ARRAY_AGG(DISTINCT a.name) FILTER (WHERE a.name IS NOT NULL) as actors,
+    ARRAY_AGG(DISTINCT s.name) FILTER (WHERE s.name IS NOT NULL) as studios,
+    ARRAY_AGG(DISTINCT d.name) FILTER (WHERE d.name IS NOT NULL) as directors
+FROM Movie m
+LEFT JOIN MovieGenre mg ON m.movie_id = mg.movie_id
+LEFT JOIN Genre g ON mg.genre_id = g.genre_id
+LEFT JOIN MovieWriter mw ON m.movie_id = mw.movie_id
+LEFT JOIN Writer w ON mw.writer_id = w.writer_id
+LEFT JOIN MovieActor ma ON m.movie_id = ma.movie_id
+LEFT JOIN Actor a ON ma.actor_id = a.actor_id
+LEFT JOIN MovieStudio ms ON m.movie_id = ms.movie_id
+LEFT JOIN Studio s ON ms.studio_id = s.studio_id
+LEFT JOIN MovieDirector md ON m.movie_id = md.movie_id
+LEFT JOIN Director d ON md.director_id = d.director_id
+"""
+
+FAN_OUT_TOP_REVIEWED_SQL = """
+WITH groupedReviews AS (
+    SELECT movie_id, count(*) AS reviewCount
+    FROM reviews
+    GROUP BY movie_id
+    ORDER BY reviewCount DESC
+    LIMIT 10
+)
+""" + FAN_OUT_PROJECTION_SQL.replace(
+    "FROM Movie m", "FROM Movie m\nINNER JOIN groupedReviews gr ON gr.movie_id = m.movie_id"
+) + "GROUP BY m.movie_id, gr.reviewCount"
+
+PROJECTION_TOP_REVIEWED_SQL = """
+WITH groupedReviews AS (
+    SELECT movie_id, count(*) AS reviewCount
+    FROM reviews
+    GROUP BY movie_id
+    ORDER BY reviewCount DESC
+    LIMIT 10
+)
+""" + GET_MOVIE_SQL.replace(
+    "FROM Movie m", "FROM Movie m\nINNER JOIN groupedReviews gr ON gr.movie_id = m.movie_id"
+).replace("WHERE m.movie_id = %s", "")
+
+
+def most_linked_movie_id(cur):
+    # the movie with the most cast/crew links is the worst case for the fan-out
+    cur.execute("""
+        SELECT m.movie_id
+        FROM Movie m
+        ORDER BY (SELECT COUNT(*) FROM MovieActor WHERE movie_id = m.movie_id)
+               * GREATEST((SELECT COUNT(*) FROM MovieWriter WHERE movie_id = m.movie_id), 1)
+               * GREATEST((SELECT COUNT(*) FROM MovieGenre WHERE movie_id = m.movie_id), 1) DESC
+        LIMIT 1
+    """)
+    row = cur.fetchone()
+    return row[0] if row else 1
+
+
+def cases(movie_id):
+    search_sql, search_params, _, _ = build_movie_search_query(limit=50, offset=0)
+    return [
+        (
+            "get_movie",
+            (FAN_OUT_PROJECTION_SQL + " WHERE m.movie_id = %s GROUP BY m.movie_id", (movie_id,)),
+            (GET_MOVIE_SQL, (movie_id,)),
+        ),
+        (
+            "search_movies",
+            (FAN_OUT_PROJECTION_SQL + " WHERE 1=1 GROUP BY m.movie_id ORDER BY m.title LIMIT %s OFFSET %s", (50, 0)),
+            (search_sql, search_params),
+        ),
+        (
+            "get_movies_by_rating",
+            (FAN_OUT_PROJECTION_SQL + " WHERE m.audience_rating IS NOT NULL GROUP BY m.movie_id "
+                                      "ORDER BY m.audience_rating DESC LIMIT 10", ()),
+            (GET_MOVIES_BY_AUDIENCE_RATING_SQL.format(direction="DESC"), ()),
+        ),
+        (
+            "mv_top_10_reviewed_movies",
+            (FAN_OUT_TOP_REVIEWED_SQL, ()),
+            (PROJECTION_TOP_REVIEWED_SQL, ()),
+        ),
+    ]
+
+
+def rows_processed(plan):
+    total = plan.get("Actual Rows", 0) * plan.get("Actual Loops", 1)
+    for child in plan.get("Plans", []):
+        total += rows_processed(child)
+    return total
+
+
+def measure(cur, query, params, runs):
+    cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + query, params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    processed = rows_processed(plan[0]["Plan"])
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return processed, statistics.median(timings), p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per query")
+    args = parser.parse_args()
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            movie_id = most_linked_movie_id(cur)
+            print(f"Benchmarking with movie_id={movie_id} for get_movie, {args.runs} runs per query\n")
+            header = f"{'call site':<28}{'plan':<12}{'rows processed':>16}{'median ms':>12}{'p95 ms':>10}"
+            print(header)
+            print("-" * len(header))
+            for name, (old_sql, old_params), (new_sql, new_params) in cases(movie_id):
+                old = measure(cur, old_sql, old_params, args.runs)
+                new = measure(cur, new_sql, new_params, args.runs)
+                for label, (processed, median, p95) in (("fan-out", old), ("per-dim", new)):
+                    print(f"{name:<28}{label:<12}{processed:>16}{median:>12.2f}{p95:>10.2f}")
+                reduction = (1 - new[0] / old[0]) * 100 if old[0] else 0
+                speedup = old[1] / new[1] if new[1] else 0
+                print(f"{'':<28}{'change':<12}{reduction:>15.1f}%{speedup:>11.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,43 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
 import psycopg2
 from typing import Optional, List
-from queries.create_tables import CREATE_TABLES_SQL, CREATE_INDICES_SQL, INFO_TS_VECTOR_TRIGGER, CREATE_MATERIALIZED_VIEW, MATERIALIZED_VIEW_INDEX, REFRESH_MATERIALIZED_VIEW
+from queries.create_tables import CREATE_TABLES_SQL, MIGRATE_TIMESTAMPS_SQL, CREATE_INDICES_SQL, INFO_TS_VECTOR_TRIGGER, CREATE_MATERIALIZED_VIEW, MATERIALIZED_VIEW_INDEX, REFRESH_MATERIALIZED_VIEW
 from queries.reputation import (
     CREATE_REPUTATION_TABLE_SQL,
     CREATE_REPUTATION_TRIGGERS_SQL,
     GET_USER_REPUTATION_SQL,
     GET_USER_REPUTATION_BY_ID_SQL
 )
-from static.vars import MOVIES_CSV_PATH, USERS_CSV_PATH,REVIEWS_CSV_PATH
+from queries.counters import CREATE_COUNTER_TRIGGERS_SQL
+from queries.response_cache import CACHE_CHANNEL, CREATE_CACHE_TRIGGERS_SQL
+from queries.movies import GET_MOVIE_SQL, GET_MOVIES_BY_AUDIENCE_RATING_SQL, TOP_REVIEWED_MOVIES_SQL, MOVIE_UPDATE_COLUMNS, UPDATE_MOVIE_IF_CHANGED_SQL, build_movie_search_query
+from queries.reviews import (
+    GET_REVIEW_WITH_LIKES_SQL,
+    GET_REVIEW_COMMENTS_SQL,
+    REVIEW_IDS_BY_MOVIE_SQL,
+    REVIEW_IDS_BY_MOVIE_SORT_KEYS,
+    REVIEW_IDS_BY_MOVIE_CURSOR_COLUMNS,
+    ALL_REVIEWS_SQL,
+    ALL_REVIEWS_SORTS,
+    CREATE_REVIEW_SQL,
+    CREATE_COMMENT_SQL
+)
+from queries.likes import (
+    INSERT_REVIEW_LIKE_SQL,
+    INSERT_COMMENT_LIKE_SQL,
+    ADD_LIKED_MOVIE_SQL,
+    REMOVE_LIKED_MOVIE_SQL
+)
+from queries import user_profile as user_profile_queries
+from static.vars import MOVIES_CSV_PATH, USERS_CSV_PATH,REVIEWS_CSV_PATH, USE_ASYNC_DB, USE_WRITE_BEHIND, USE_RESPONSE_CACHE
 from utils.insert_data import insert_movies, insert_users, insert_reviews
-from utils.db import get_db_connection
+from utils.bulk_ingest import bulk_insert_movies, bulk_insert_reviews
+from utils.jobs import ensure_job_run_table, scheduled, get_recent_job_runs
+from utils.counters import migrate_counter_columns
+from utils.job_queue import ensure_job_queue_table, enqueue_job, get_job, get_job_queue_stats
+from utils.db import get_db_connection, get_pool, close_pool, get_pool_stats
+from utils.async_db import get_async_db_connection, open_async_pool, close_async_pool, get_async_pool_stats
 import psycopg2.extras
 from pydantic import BaseModel
 from datetime import date
@@ -19,17 +45,29 @@ from fastapi import FastAPI, HTTPException
 import psycopg2
 import psycopg2.extras
 from pydantic import BaseModel, EmailStr
-from passlib.context import CryptContext
 from utils.db import get_db_connection
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
-from utils.review_info import get_review_info
-from utils.user_profile import review_ids_from_user
-from utils.batch import batch_handle_related
+from utils.review_info import get_review_infos, get_review_infos_async
+from utils.user_profile import review_ids_from_user, review_ids_from_user_async
+from utils.batch import batch_handle_related, sync_movie_links
+from utils.bulk_writes import (
+    BULK_MAX_ITEMS,
+    like_validation_error,
+    bulk_create_movies,
+    bulk_create_reviews,
+    bulk_create_comments,
+    bulk_like_items,
+    bulk_add_watched
+)
+from utils.passwords import PasswordHasherBusy, get_password_pool, close_password_pool, hash_password, hash_password_async, verify_password, verify_password_async, hash_passwords, get_password_pool_stats
+from utils.sessions import issue_session_token, verify_session_token
+from utils.response_cache import cached, response_cache, cache_listener, ensure_cache_triggers, get_response_cache_stats
+from utils.write_behind import watch_buffer, like_buffer, start_write_behind, stop_write_behind, get_write_behind_stats
+from utils.dimension_cache import DIMENSION_TABLES, dimension_cache, warm_dimension_cache, get_dimension_cache_stats
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, apply_keyset, paginate
 from enum import Enum
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import psycopg
 
 update_tables = True
 
@@ -43,8 +81,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
+    expose_headers=["X-Next-Cursor"],  # cursor for list-shaped paginated responses
 )
 
+def register_route(path, sync_handler, async_handler, methods=["GET"], **kwargs):
+    """
+    Hot endpoints have a sync (psycopg2) and an async (psycopg) implementation
+    while we migrate. USE_ASYNC_DB decides which one serves the route; the sync
+    function stays importable/callable either way (e.g. /seed calls like_item).
+    """
+    handler = async_handler if USE_ASYNC_DB else sync_handler
+    app.add_api_route(path, handler, methods=methods, **kwargs)
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
@@ -52,42 +100,130 @@ MATERIALIZED_VIEW_NAME = "mv_top_10_reviewed_movies"
 
 scheduler = AsyncIOScheduler()
 
-def sync_refresh_materialized_view():
-    """
-    Uses get_db_connection to connect and refresh the materialized view.
-    APScheduler will run this in a thread pool.
-    """
-    print(f"[{datetime.now()}] Background Task: Attempting to refresh '{MATERIALIZED_VIEW_NAME}'...")
-    try:
-        with get_db_connection() as conn:
-            conn.autocommit = True
+def enqueue_scheduled(kind):
+    """Scheduled jobs only queue their work; a job queue worker (utils/job_queue.py) runs it."""
+    return lambda: f"queued as job {enqueue_job(kind)}"
 
-            with conn.cursor() as cur:
-                print(f"[{datetime.now()}] Executing: REFRESH MATERIALIZED VIEW {MATERIALIZED_VIEW_NAME};")
-                cur.execute(f"REFRESH MATERIALIZED VIEW {MATERIALIZED_VIEW_NAME};")
-            print(f"[{datetime.now()}] Background Task: Successfully refreshed '{MATERIALIZED_VIEW_NAME}'.")
-    except psycopg2.Error as e:
-        print(f"[{datetime.now()}] Background Task Error: Database error during refresh: {e}")
-    except Exception as e:
-        print(f"[{datetime.now()}] Background Task Error: An unexpected error occurred: {e}")
+# job id -> (function, interval). Every worker schedules all of them; run_scheduled_job
+# lets only one worker per interval actually run each and records the run in JobRun.
+# /movies_top_reviewed reads the trigger-maintained MovieReviewCount and the view is
+# only its fallback, so it is refreshed on the repair schedule.
+SCHEDULED_JOBS = {
+    "mv_refresh_job": (enqueue_scheduled("refresh_top_reviewed"), timedelta(hours=6)),
+    "counter_reconcile_job": (enqueue_scheduled("reconcile_counters"), timedelta(hours=6)),
+    "reputation_recompute_job": (enqueue_scheduled("recompute_reputation"), timedelta(hours=24)),
+}
 
 @app.on_event("startup")
 async def startup_event():
+    try:
+        get_pool()
+        print("Database connection pool ready.")
+    except psycopg2.Error as e:
+        # the pool is created lazily on first use if the database isn't up yet
+        print(f"Could not warm database connection pool: {e}")
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                migrated = migrate_counter_columns(cur)
+        if migrated is not None:
+            print(f"Added and backfilled counter columns: {migrated}")
+    except psycopg2.Error as e:
+        print(f"Could not migrate counter columns: {e}")
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                warm_dimension_cache(cur)
+        print("Dimension cache warmed.")
+    except psycopg2.Error as e:
+        print(f"Could not warm dimension cache: {e}")
+    if USE_ASYNC_DB:
+        try:
+            await open_async_pool()
+            print("Async database connection pool ready.")
+        except psycopg.Error as e:
+            print(f"Could not warm async database connection pool: {e}")
+    try:
+        ensure_job_run_table()
+        ensure_job_queue_table()
+    except psycopg2.Error as e:
+        print(f"Could not create job tables: {e}")
     print("Starting scheduler...")
-    scheduler.add_job(
-        sync_refresh_materialized_view,
-        IntervalTrigger(hours=1),
-        id="mv_refresh_job",
-        replace_existing=True
-    )
+    for job_id, (job, interval) in SCHEDULED_JOBS.items():
+        scheduler.add_job(
+            scheduled(job_id, interval.total_seconds(), job),
+            IntervalTrigger(seconds=interval.total_seconds()),
+            id=job_id,
+            replace_existing=True
+        )
     scheduler.start()
     print("Scheduler started.")
+    if USE_WRITE_BEHIND:
+        start_write_behind()
+        print("Write-behind buffers started.")
+    get_password_pool()
+    if USE_RESPONSE_CACHE:
+        try:
+            ensure_cache_triggers()
+        except psycopg2.Error as e:
+            # cached responses then only expire by TTL
+            print(f"Could not install response cache triggers: {e}")
+        cache_listener.start()
+        print("Response cache listener started.")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     print("Shutting down scheduler...")
     scheduler.shutdown()
     print("Scheduler shut down.")
+    cache_listener.stop()
+    if USE_WRITE_BEHIND:
+        # flushes whatever is still buffered, so it needs the pool
+        stop_write_behind()
+        print("Write-behind buffers flushed.")
+    close_pool()
+    await close_async_pool()
+    close_password_pool()
+    print("Database connection pools closed.")
+
+
+FOREIGN_KEY_VIOLATION = "23503"
+UNIQUE_VIOLATION = "23505"
+NOT_FOUND_BY_COLUMN = {
+    "user_id": "User not found",
+    "movie_id": "Movie not found",
+    "review_id": "Review not found",
+    "comment_id": "Comment not found",
+}
+
+def raise_for_constraint(e, duplicate_detail=None):
+    """
+    Single-statement writes check existence in the same statement, but a
+    concurrent delete or duplicate insert can still slip past and trip a
+    constraint; answer with the 404/400 the check would have given.
+    Works for psycopg2 and psycopg errors.
+    """
+    constraint = e.diag.constraint_name or ""
+    if e.diag.sqlstate == FOREIGN_KEY_VIOLATION:
+        for column, detail in NOT_FOUND_BY_COLUMN.items():
+            if constraint.endswith(f"_{column}_fkey"):
+                raise HTTPException(status_code=404, detail=detail)
+    if e.diag.sqlstate == UNIQUE_VIOLATION and duplicate_detail:
+        raise HTTPException(status_code=400, detail=duplicate_detail)
+
+
+def run_bulk(bulk_write, items):
+    # one transaction for the whole list; per-item failures are reported in "results"
+    if not items:
+        raise HTTPException(status_code=400, detail="No items given")
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                return bulk_write(cur, items)
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 class LikeCreate(BaseModel):
@@ -95,63 +231,77 @@ class LikeCreate(BaseModel):
     review_id: Optional[int] = None
     comment_id: Optional[int] = None
 
-@app.post("/likes/")
-def like_item(like: LikeCreate):
-    if not like.review_id and not like.comment_id:
-        raise HTTPException(status_code=400, detail="Must provide either review_id or comment_id")
-    if like.review_id and like.comment_id:
-        raise HTTPException(status_code=400, detail="Cannot like both a review and a comment at the same time")
+def validate_like(like: LikeCreate):
+    error = like_validation_error(like)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+def like_target(like: LikeCreate):
+    if like.review_id:
+        return INSERT_REVIEW_LIKE_SQL, "review", like.review_id
+    return INSERT_COMMENT_LIKE_SQL, "comment", like.comment_id
+
+def like_result(row, target):
+    if not row["user_exists"]:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not row["target_exists"]:
+        raise HTTPException(status_code=404, detail=f"{target.capitalize()} not found")
+    if row["already_liked"] or row["like_id"] is None:
+        raise HTTPException(status_code=400, detail=f"User has already liked this {target}")
+    return {key: row[key] for key in ("like_id", "user_id", f"{target}_id", "created_at")}
+
+def buffered_like(like: LikeCreate, response: Response):
+    """
+    Write-behind mode: acknowledges the like once buffered (None if the buffer is
+    full and the caller should write it now). Missing users/targets and repeat
+    likes aren't reported back, they are dropped at flush time.
+    """
+    if USE_WRITE_BEHIND and like_buffer.offer(like):
+        response.status_code = 202
+        return {"message": "Like queued"}
+    return None
+
+def like_item(like: LikeCreate, response: Response):
+    validate_like(like)
+    queued = buffered_like(like, response)
+    if queued:
+        return queued
+    query, target, target_id = like_target(like)
 
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                # Check if user exists
-                cur.execute("SELECT user_id FROM Users WHERE user_id = %s", (like.user_id,))
-                if cur.fetchone() is None:
-                    raise HTTPException(status_code=404, detail="User not found")
-
-                if like.review_id:
-                    # Check if review exists
-                    cur.execute("SELECT review_id FROM Reviews WHERE review_id = %s", (like.review_id,))
-                    if cur.fetchone() is None:
-                        raise HTTPException(status_code=404, detail="Review not found")
-
-                    # Check if user already liked this review
-                    cur.execute("SELECT like_id FROM Likes WHERE user_id = %s AND review_id = %s", (like.user_id, like.review_id))
-                    if cur.fetchone():
-                        raise HTTPException(status_code=400, detail="User has already liked this review")
-
-                    # Insert like for review
-                    cur.execute("""
-                        INSERT INTO Likes (user_id, review_id, created_at) 
-                        VALUES (%s, %s, NOW()) 
-                        RETURNING like_id, user_id, review_id, created_at
-                    """, (like.user_id, like.review_id))
-
-                elif like.comment_id:
-                    # Check if comment exists
-                    cur.execute("SELECT comment_id FROM Comments WHERE comment_id = %s", (like.comment_id,))
-                    if cur.fetchone() is None:
-                        raise HTTPException(status_code=404, detail="Comment not found")
-
-                    # Check if user already liked this comment
-                    cur.execute("SELECT like_id FROM Likes WHERE user_id = %s AND comment_id = %s", (like.user_id, like.comment_id))
-                    if cur.fetchone():
-                        raise HTTPException(status_code=400, detail="User has already liked this comment")
-
-                    # Insert like for comment
-                    cur.execute("""
-                        INSERT INTO Likes (user_id, comment_id, created_at) 
-                        VALUES (%s, %s, NOW()) 
-                        RETURNING like_id, user_id, comment_id, created_at
-                    """, (like.user_id, like.comment_id))
-
-                new_like = cur.fetchone()
-                return new_like
+                # existence checks, duplicate check and insert in one statement
+                cur.execute(query, {"user_id": like.user_id, "target_id": target_id})
+                return like_result(cur.fetchone(), target)
 
     except psycopg2.Error as e:
+        raise_for_constraint(e, duplicate_detail=f"User has already liked this {target}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+async def like_item_async(like: LikeCreate, response: Response):
+    validate_like(like)
+    queued = buffered_like(like, response)
+    if queued:
+        return queued
+    query, target, target_id = like_target(like)
+
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, {"user_id": like.user_id, "target_id": target_id})
+                return like_result(await cur.fetchone(), target)
+
+    except psycopg.Error as e:
+        raise_for_constraint(e, duplicate_detail=f"User has already liked this {target}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/likes/", like_item, like_item_async, methods=["POST"])
+
+@app.post("/likes/bulk")
+def like_items_bulk(likes: List[LikeCreate]):
+    return run_bulk(bulk_like_items, likes)
+
 
 class ReviewCreate(BaseModel):
     movie_id: int
@@ -169,56 +319,79 @@ def create_review(review: ReviewCreate):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                # Check if movie exists
-                cur.execute("SELECT movie_id FROM Movie WHERE movie_id = %s", (review.movie_id,))
-                if cur.fetchone() is None:
+                cur.execute(CREATE_REVIEW_SQL, {
+                    "movie_id": review.movie_id, "user_id": review.user_id,
+                    "title": review.title, "content": review.content, "rating": review.rating
+                })
+                new_review = cur.fetchone()
+                if not new_review["movie_exists"]:
                     raise HTTPException(status_code=404, detail="Movie not found")
-
-                # Check if user exists
-                cur.execute("SELECT user_id FROM Users WHERE user_id = %s", (review.user_id,))
-                if cur.fetchone() is None:
+                if not new_review["user_exists"]:
                     raise HTTPException(status_code=404, detail="User not found")
-
-                # Insert the review
-                cur.execute("""
-                    INSERT INTO Reviews (movie_id, user_id, title, content, rating, created_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
-                    RETURNING review_id, movie_id, user_id, title, content, rating, created_at, updated_at
-                """, (review.movie_id, review.user_id, review.title, review.content, review.rating))
-
-                new_review = cur.fetchone()
+                del new_review["movie_exists"], new_review["user_exists"]
                 return new_review
 
     except psycopg2.Error as e:
+        raise_for_constraint(e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@app.post("/reviews/bulk")
+def create_reviews_bulk(reviews: List[ReviewCreate]):
+    return run_bulk(bulk_create_reviews, reviews)
+
 class UserCreate(BaseModel):
     username: str
     email: EmailStr
     password: str
 
 
-@app.post("/users/signup")
-def create_user(user: UserCreate):
-    try:
-        hashed_password = pwd_context.hash(user.password)
+INSERT_USER_SQL = """
+    INSERT INTO Users (username, email, password_hash, created_at, updated_at)
+    VALUES (%s, %s, %s, NOW(), NOW())
+    RETURNING user_id, username, email, created_at
+"""
+
+def raise_password_busy(e):
+    raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
+def insert_user(user: UserCreate, hashed_password: str):
+    try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute("""
-                    INSERT INTO Users (username, email, password_hash, created_at, updated_at) 
-                    VALUES (%s, %s, %s, NOW(), NOW()) 
-                    RETURNING user_id, username, email, created_at
-                """, (user.username, user.email, hashed_password))
-
-                new_user = cur.fetchone()
-                return new_user
+                cur.execute(INSERT_USER_SQL, (user.username, user.email, hashed_password))
+                return cur.fetchone()
 
     except psycopg2.errors.UniqueViolation:
         raise HTTPException(status_code=400, detail="Username or email already exists")
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+def create_user(user: UserCreate):
+    try:
+        hashed_password = hash_password(user.password)
+    except PasswordHasherBusy as e:
+        raise_password_busy(e)
+    return insert_user(user, hashed_password)
+
+async def create_user_async(user: UserCreate):
+    try:
+        hashed_password = await hash_password_async(user.password)
+    except PasswordHasherBusy as e:
+        raise_password_busy(e)
+
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(INSERT_USER_SQL, (user.username, user.email, hashed_password))
+                return await cur.fetchone()
+
+    except psycopg.errors.UniqueViolation:
+        raise HTTPException(status_code=400, detail="Username or email already exists")
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/users/signup", create_user, create_user_async, methods=["POST"])
+
 @app.get("/users/{user_id}/liked_movies/{movie_id}", status_code=200)
 def check_if_movie_liked(user_id: int, movie_id: int):
     try:
@@ -251,33 +424,40 @@ class LikedMovieInfo(BaseModel):
     liked_at: datetime 
 
 
-@app.get("/user_profile/{user_id}/liked_movies", response_model=List[LikedMovieInfo])
-def get_user_liked_movies(user_id: int):
+def get_user_liked_movies(
+    user_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Retrieves a list of movies liked by the specified user.
+    Retrieves a page of movies liked by the specified user, most recent first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
+    try:
+        query, params = apply_keyset(
+            user_profile_queries.USER_LIKED_MOVIES_SQL, [user_id],
+            user_profile_queries.USER_LIKED_MOVIES_SORT_KEYS, "liked_movies", cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                 # Check if user exists (optional but good practice)
-                cur.execute("SELECT 1 FROM Users WHERE user_id = %s", (user_id,))
+                cur.execute(user_profile_queries.USER_EXISTS_SQL, (user_id,))
                 if cur.fetchone() is None:
                     raise HTTPException(status_code=404, detail="User not found")
 
-                query = """
-                    SELECT
-                        m.movie_id,
-                        m.title,
-                        lm.liked_at
-                    FROM Liked_Movie lm
-                    JOIN Movie m ON lm.movie_id = m.movie_id
-                    WHERE lm.user_id = %s
-                    ORDER BY lm.liked_at DESC; -- Show most recently liked first
-                """
-                cur.execute(query, (user_id,))
-                liked_movies = cur.fetchall()
+                cur.execute(query, params)
+                liked_movies, next_cursor = paginate(
+                    cur.fetchall(), limit, "liked_movies", user_profile_queries.USER_LIKED_MOVIES_CURSOR_COLUMNS)
+                if next_cursor:
+                    response.headers["X-Next-Cursor"] = next_cursor
                 return liked_movies # Returns list of dicts matching LikedMovieInfo
 
+    except HTTPException:
+        raise
     except psycopg2.Error as e:
         print(f"Database error fetching liked movies for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="Database error retrieving liked movies.")
@@ -285,31 +465,65 @@ def get_user_liked_movies(user_id: int):
         print(f"Unexpected error fetching liked movies for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
+async def get_user_liked_movies_async(
+    user_id: int,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    """
+    Retrieves a page of movies liked by the specified user, most recent first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        query, params = apply_keyset(
+            user_profile_queries.USER_LIKED_MOVIES_SQL, [user_id],
+            user_profile_queries.USER_LIKED_MOVIES_SORT_KEYS, "liked_movies", cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(user_profile_queries.USER_EXISTS_SQL, (user_id,))
+                if await cur.fetchone() is None:
+                    raise HTTPException(status_code=404, detail="User not found")
+
+                await cur.execute(query, params)
+                liked_movies, next_cursor = paginate(
+                    await cur.fetchall(), limit, "liked_movies", user_profile_queries.USER_LIKED_MOVIES_CURSOR_COLUMNS)
+                if next_cursor:
+                    response.headers["X-Next-Cursor"] = next_cursor
+                return liked_movies
+
+    except HTTPException:
+        raise
+    except psycopg.Error as e:
+        print(f"Database error fetching liked movies for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Database error retrieving liked movies.")
+    except Exception as e:
+        print(f"Unexpected error fetching liked movies for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+register_route("/user_profile/{user_id}/liked_movies", get_user_liked_movies, get_user_liked_movies_async,
+               response_model=List[LikedMovieInfo])
+
 
 @app.delete("/unlike_movie", status_code=200)
 def remove_liked_movie(user_id: int, movie_id: int):
     try:
         with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                 # Check user exists (optional, foreign key handles it but good for explicit error)
-                cur.execute("SELECT 1 FROM Users WHERE user_id = %s", (user_id,))
-                if cur.fetchone() is None:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(REMOVE_LIKED_MOVIE_SQL, {"user_id": user_id, "movie_id": movie_id})
+                result = cur.fetchone()
+                if not result["user_exists"]:
                     raise HTTPException(status_code=404, detail="User not found")
-                # Check movie exists (optional)
-                cur.execute("SELECT 1 FROM Movie WHERE movie_id = %s", (movie_id,))
-                if cur.fetchone() is None:
+                if not result["movie_exists"]:
                     raise HTTPException(status_code=404, detail="Movie not found")
 
-                cur.execute("""
-                    DELETE FROM Liked_Movie
-                    WHERE user_id = %s AND movie_id = %s;
-                """, (user_id, movie_id))
-
-                if cur.rowcount == 0:
-                    # Could mean it wasn't liked, or user/movie doesn't exist (handled above)
-                    # Return success regardless, idempotency is fine here
+                if not result["changed"]:
+                    # Idempotent: the movie wasn't liked
                     return {"message": "Like removed or movie was not liked"}
-                conn.commit()
                 return {"message": "Movie removed from liked list"}
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -319,32 +533,28 @@ def remove_liked_movie(user_id: int, movie_id: int):
 def add_liked_movie(user_id: int, movie_id: int):
     try:
         with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                # Check user exists
-                cur.execute("SELECT 1 FROM Users WHERE user_id = %s", (user_id,))
-                if cur.fetchone() is None:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.execute(ADD_LIKED_MOVIE_SQL, {"user_id": user_id, "movie_id": movie_id})
+                result = cur.fetchone()
+                if not result["user_exists"]:
                     raise HTTPException(status_code=404, detail="User not found")
-                # Check movie exists
-                cur.execute("SELECT 1 FROM Movie WHERE movie_id = %s", (movie_id,))
-                if cur.fetchone() is None:
+                if not result["movie_exists"]:
                     raise HTTPException(status_code=404, detail="Movie not found")
 
-                cur.execute("""
-                    INSERT INTO Liked_Movie (user_id, movie_id, liked_at)
-                    VALUES (%s, %s, NOW())
-                    ON CONFLICT (user_id, movie_id) DO NOTHING;
-                """, (user_id, movie_id))
-
-                if cur.rowcount == 0:
+                if not result["changed"]:
                     # It's not really an error if it already exists, return success
                     return {"message": "Movie already liked by user or like added successfully"}
-                conn.commit()
                 return {"message": "Movie added to liked list"}
     except psycopg2.Error as e:
+        raise_for_constraint(e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
 @app.post("/watch")
-def add_watched_movie(user_id: int, movie_id: int):
+def add_watched_movie(user_id: int, movie_id: int, response: Response):
+    # write-behind mode: acknowledged once buffered; unknown users/movies are dropped at flush time
+    if USE_WRITE_BEHIND and watch_buffer.offer(WatchCreate(user_id=user_id, movie_id=movie_id)):
+        response.status_code = 202
+        return {"message": "Watch queued"}
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
@@ -361,78 +571,105 @@ def add_watched_movie(user_id: int, movie_id: int):
 
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+class WatchCreate(BaseModel):
+    user_id: int
+    movie_id: int
+
+@app.post("/watch/bulk")
+def add_watched_movies_bulk(watched: List[WatchCreate]):
+    return run_bulk(bulk_add_watched, watched)
     
 
 class SetupType(str, Enum):
     local = "local"
     prod = "prod"
 
+class SeedMode(str, Enum):
+    reload = "reload"  # drop and rebuild everything
+    delta = "delta"    # only write movies that changed in movies.csv
+
 @app.post("/seed")
-def setup_database(setup_type: SetupType):
+def setup_database(setup_type: SetupType, mode: SeedMode = SeedMode.reload):
     conn = get_db_connection()
     cur = conn.cursor()
 
     sample_size = 50
     if setup_type == SetupType.prod:
         sample_size = 1000
+
+    if mode == SeedMode.delta:
+        cur.execute(CREATE_TABLES_SQL)
+        cur.execute(MIGRATE_TIMESTAMPS_SQL)
+        migrate_counter_columns(cur)
+        conn.commit()
+        cur.close()
+        conn.close()
+        # the sync and view refresh run on a job queue worker; poll GET /jobs/{job_id}
+        job_id = enqueue_job("sync_catalog", {"sample_size": sample_size}, priority=10)
+        return {"message": "Movie catalog sync queued", "job_id": job_id}
     
     if update_tables:
         print("Dropping all tables")
-        cur.execute("DROP TABLE IF EXISTS Liked_Movie CASCADE; Drop table if exists Movie cascade; Drop table if exists Watched cascade; Drop table if exists Users cascade; Drop table if exists reviews cascade; Drop table if exists Likes cascade; Drop table if exists UserReputation cascade;")
+        cur.execute("DROP TABLE IF EXISTS Liked_Movie CASCADE; Drop table if exists Movie cascade; Drop table if exists Watched cascade; Drop table if exists Users cascade; Drop table if exists reviews cascade; Drop table if exists Comments cascade; Drop table if exists Likes cascade; Drop table if exists UserReputation cascade; Drop table if exists MovieSyncState cascade; Drop table if exists MovieReviewCount cascade;")
+        for table in DIMENSION_TABLES:
+            dimension_cache.invalidate(table)
     cur.execute(CREATE_TABLES_SQL)
+    cur.execute(MIGRATE_TIMESTAMPS_SQL)
+    migrate_counter_columns(cur)
     cur.execute(CREATE_INDICES_SQL)
     cur.execute(INFO_TS_VECTOR_TRIGGER)
     cur.execute(CREATE_REPUTATION_TABLE_SQL)
     cur.execute(CREATE_REPUTATION_TRIGGERS_SQL)
+    cur.execute(CREATE_COUNTER_TRIGGERS_SQL)
+    cur.execute(CREATE_CACHE_TRIGGERS_SQL)
     cur.execute(CREATE_MATERIALIZED_VIEW)
     cur.execute(MATERIALIZED_VIEW_INDEX)
     conn.commit()
     print("inserting movie")
-    insert_movies(MOVIES_CSV_PATH, sample_size)
+    ingest_stats = [bulk_insert_movies(MOVIES_CSV_PATH, sample_size)]
     print("inserting users")
+    users = []
     for i in range(ord('a'), ord('z')+1):
         uname = chr(i) + "@cmail.com"
         pw = uname
-        user = UserCreate(username = chr(i), email=uname,password= pw)
-        create_user(user)
+        users.append(UserCreate(username = chr(i), email=uname,password= pw))
+    # hashed in parallel on the password pool, then inserted in order so ids stay 1..26
+    for user, hashed_password in zip(users, hash_passwords([user.password for user in users])):
+        insert_user(user, hashed_password)
     print("inserting reviews")
-    insert_reviews(REVIEWS_CSV_PATH, sample_size)
-    create_review(ReviewCreate(movie_id=1,user_id=1,title="nad Movie!",content="I hate the cinematography and the story.",rating=5.5))
-    create_review(ReviewCreate(movie_id=2,user_id=1,title="what the heck!",content="wow, bing.",rating=35.5))
-    create_review(ReviewCreate(movie_id=3,user_id=1,title="Great Movie!",content="I really enjoyed the cinematography and the story.",rating=85.5))
-    create_review(ReviewCreate(movie_id=4,user_id=1,title="it's ok",content="I real the story.",rating=33.5))
+    ingest_stats.append(bulk_insert_reviews(REVIEWS_CSV_PATH, sample_size))
+    run_bulk(bulk_create_reviews, [
+        ReviewCreate(movie_id=1,user_id=1,title="nad Movie!",content="I hate the cinematography and the story.",rating=5.5),
+        ReviewCreate(movie_id=2,user_id=1,title="what the heck!",content="wow, bing.",rating=35.5),
+        ReviewCreate(movie_id=3,user_id=1,title="Great Movie!",content="I really enjoyed the cinematography and the story.",rating=85.5),
+        ReviewCreate(movie_id=4,user_id=1,title="it's ok",content="I real the story.",rating=33.5),
+    ])
 
     print("inserting likes")
-    repeats = []
-    for _ in range(200):
-        id = random.randint(1, 10)
-        rid = random.randint(1, 49)
-        data =LikeCreate(
-            user_id=id,  # user_id from 1 to 10
-            review_id=rid,  # review_id from 1 to 10
+    # repeated (user, review) pairs come back as per-item 400s
+    run_bulk(bulk_like_items, [
+        LikeCreate(
+            user_id=random.randint(1, 10),  # user_id from 1 to 10
+            review_id=random.randint(1, 49),
             comment_id=None  # comment_id is set to None
         )
-        if (id,rid) in repeats: continue
-        repeats.append((id,rid))
-        like_item(data)
+        for _ in range(200)
+    ])
     print("adding comments")
-    for i in range(100):
-        reply_to_rid = random.randint(1,10)
-        Comment = CommentCreate(review_id = reply_to_rid, user_id = random.randint(1,10), content = 'this is a comment')
-        create_comment(Comment)
+    run_bulk(bulk_create_comments, [
+        CommentCreate(review_id = random.randint(1,10), user_id = random.randint(1,10), content = 'this is a comment')
+        for _ in range(100)
+    ])
     print("liking comments")
-    repeats = []
-    for _ in range(100):
-        id = random.randint(1, 10)
-        cid = random.randint(1, 10)
-        data = LikeCreate(
-            user_id=id,  # user_id from 1 to 10
-            review_id=None,  
-            comment_id=cid
+    run_bulk(bulk_like_items, [
+        LikeCreate(
+            user_id=random.randint(1, 10),  # user_id from 1 to 10
+            review_id=None,
+            comment_id=random.randint(1, 10)
         )
-        if (id,cid) in repeats: continue
-        repeats.append((id,cid))
-        like_item(data)
+        for _ in range(100)
+    ])
     
     print("inserting liked")
     add_liked_movie(2, 1)
@@ -451,62 +688,35 @@ def setup_database(setup_type: SetupType):
     # add_watched_movie(3,7)
 
     cur.execute(REFRESH_MATERIALIZED_VIEW)
+    # the tables were dropped and rebuilt under every process's response cache
+    cur.execute("SELECT pg_notify(%s, %s)", (CACHE_CHANNEL, "movie:*,review:*,ranking:*"))
     conn.commit()
 
 
     cur.close()
     conn.close()
 
-    return {"message": "Database setup successful"}
+    return {"message": "Database setup successful", "ingest": ingest_stats}
 class SimilarUser(BaseModel):
     user_id: int
     username: str
     mutual_count: int
 
-@app.get("/user_profile/{user_id}/similar_likes", response_model=List[SimilarUser])
 def get_top_similar_users_by_likes(user_id: int):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute("SELECT 1 FROM Users WHERE user_id = %s", (user_id,))
+                cur.execute(user_profile_queries.USER_EXISTS_SQL, (user_id,))
                 if cur.fetchone() is None:
                     raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found")
 
-                query = """
-                    WITH UserLikedCounts AS (
-                        SELECT
-                            user_id,
-                            COUNT(movie_id) AS liked_count
-                        FROM Liked_Movie
-                        GROUP BY user_id
-                    )
-                    SELECT
-                        other_user.user_id,
-                        other_user.username,
-                        COUNT(lm1.movie_id) AS mutual_count
-                    FROM Liked_Movie lm1
-                    JOIN Liked_Movie lm2 ON lm1.movie_id = lm2.movie_id
-                                         AND lm1.user_id <> lm2.user_id
-                    JOIN Users other_user ON lm2.user_id = other_user.user_id
-                    JOIN UserLikedCounts target_count ON lm1.user_id = target_count.user_id
-                    JOIN UserLikedCounts other_count ON lm2.user_id = other_count.user_id
-                    WHERE
-                        lm1.user_id = %s
-                        AND other_count.liked_count <= (2 * target_count.liked_count)
-                        AND target_count.liked_count <= (2 * other_count.liked_count)
-                    GROUP BY
-                        other_user.user_id,
-                        other_user.username
-                    ORDER BY
-                        mutual_count DESC,
-                        other_user.user_id ASC
-                    LIMIT 3;
-                """
-                cur.execute(query, (user_id,))
+                cur.execute(user_profile_queries.SIMILAR_USERS_BY_LIKES_SQL, (user_id,))
                 similar_users = cur.fetchall()
 
                 return similar_users
 
+    except HTTPException:
+        raise
     except psycopg2.Error as e:
         print(f"Database error in get_top_similar_users_by_likes: {e}")
         raise HTTPException(status_code=500, detail="An error occurred while fetching similar users.")
@@ -514,26 +724,97 @@ def get_top_similar_users_by_likes(user_id: int):
         print(f"Unexpected error in get_top_similar_users_by_likes: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
+async def get_top_similar_users_by_likes_async(user_id: int):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(user_profile_queries.USER_EXISTS_SQL, (user_id,))
+                if await cur.fetchone() is None:
+                    raise HTTPException(status_code=404, detail=f"User with ID {user_id} not found")
+
+                await cur.execute(user_profile_queries.SIMILAR_USERS_BY_LIKES_SQL, (user_id,))
+                return await cur.fetchall()
+
+    except HTTPException:
+        raise
+    except psycopg.Error as e:
+        print(f"Database error in get_top_similar_users_by_likes: {e}")
+        raise HTTPException(status_code=500, detail="An error occurred while fetching similar users.")
+    except Exception as e:
+        print(f"Unexpected error in get_top_similar_users_by_likes: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+register_route("/user_profile/{user_id}/similar_likes", get_top_similar_users_by_likes,
+               get_top_similar_users_by_likes_async, response_model=List[SimilarUser])
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
-@app.post("/users/login")
+LOGIN_USER_SQL = "SELECT user_id, username, email, password_hash FROM Users WHERE email = %s"
+
+def login_result(db_user):
+    # the token lets later requests skip bcrypt; send it back as "Authorization: Bearer <token>"
+    token, expires_at = issue_session_token(db_user["user_id"])
+    return {
+        "success": True,
+        "user": {"user_id": db_user["user_id"], "username": db_user["username"], "email": db_user["email"]},
+        "token": token,
+        "expires_at": expires_at,
+    }
+
 def login_user(user: UserLogin):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute("SELECT user_id, username, email, password_hash FROM Users WHERE email = %s", (user.email,))
+                cur.execute(LOGIN_USER_SQL, (user.email,))
                 db_user = cur.fetchone()
 
-                if not db_user or not pwd_context.verify(user.password, db_user["password_hash"]):
-                    return {"success": False, "message": "Invalid credentials"}
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-                return {"success": True, "user": {"user_id": db_user["user_id"], "username": db_user["username"], "email": db_user["email"]}}
+    # verified after the connection is back in the pool, it isn't needed meanwhile
+    try:
+        if not db_user or not verify_password(user.password, db_user["password_hash"]):
+            return {"success": False, "message": "Invalid credentials"}
+    except PasswordHasherBusy as e:
+        raise_password_busy(e)
+    return login_result(db_user)
 
-    except psycopg2.Error as e:
+async def login_user_async(user: UserLogin):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(LOGIN_USER_SQL, (user.email,))
+                db_user = await cur.fetchone()
+
+    except psycopg.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+    try:
+        if not db_user or not await verify_password_async(user.password, db_user["password_hash"]):
+            return {"success": False, "message": "Invalid credentials"}
+    except PasswordHasherBusy as e:
+        raise_password_busy(e)
+    return login_result(db_user)
+
+register_route("/users/login", login_user, login_user_async, methods=["POST"])
+
+def session_user_id(authorization: Optional[str]):
+    """User id from an "Authorization: Bearer <token>" header issued by /users/login; 401 otherwise."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing session token", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return verify_session_token(token)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+
+# declared before /users/{user_id} so "me" isn't parsed as an id
+@app.get("/users/me")
+def get_session_user(authorization: Optional[str] = Header(None)):
+    return get_user_details(session_user_id(authorization))
+
 
 # Request/Response Models
 class MovieCreate(BaseModel):
@@ -562,6 +843,48 @@ class MovieUpdate(MovieCreate):
 def read_root():
     return {"message": "hello world sceneit"}
 
+@app.get("/db/pool")
+def get_db_pool_stats():
+    return {"sync": get_pool_stats(), "async": get_async_pool_stats(), "dimension_cache": get_dimension_cache_stats(),
+            "write_behind": get_write_behind_stats(), "password_pool": get_password_pool_stats(),
+            "response_cache": get_response_cache_stats()}
+
+@app.get("/db/jobs")
+def get_db_job_runs(limit: int = Query(50, ge=1, le=500)):
+    """Recent scheduled job runs across all workers, newest first, and job queue counts/timings by kind."""
+    try:
+        return {"scheduled_runs": get_recent_job_runs(limit), "queue": get_job_queue_stats()}
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+class JobCreate(BaseModel):
+    kind: str
+    payload: dict = {}
+    priority: int = 0
+    max_attempts: int = 3
+
+@app.post("/jobs", status_code=202)
+def create_job(job: JobCreate):
+    if job.max_attempts < 1:
+        raise HTTPException(status_code=400, detail="max_attempts must be at least 1")
+    try:
+        job_id = enqueue_job(job.kind, job.payload, job.priority, job.max_attempts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {"job_id": job_id}
+
+@app.get("/jobs/{job_id}")
+def get_job_status(job_id: int):
+    try:
+        job = get_job(job_id)
+    except psycopg2.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 @app.get("/data/{table_name}")
 def get_table_data(table_name: str):
     try:
@@ -577,34 +900,11 @@ def get_table_data(table_name: str):
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Error fetching values: {e}")
 
-@app.get("/user_profile/{user_id}/most_mutual")
 def get_most_mutual_watched_user(user_id: int):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute("""
-                    WITH user_watched_count AS (
-                        SELECT user_id, COUNT(movie_id) AS watched_count
-                        FROM watched
-                        GROUP BY user_id
-                    ),
-                    mutual_watched AS (
-                        SELECT 
-                            u2.user_id, 
-                            COUNT(*) AS mutual_count
-                        FROM watched w1
-                        JOIN watched w2 ON w1.movie_id = w2.movie_id 
-                                        AND w1.user_id <> w2.user_id
-                        JOIN user_watched_count u1 ON w1.user_id = u1.user_id
-                        JOIN user_watched_count u2 ON w2.user_id = u2.user_id
-                        WHERE w1.user_id = %s and u2.watched_count <= 2 * u1.watched_count
-                        GROUP BY u2.user_id
-                    )
-                    SELECT user_id, mutual_count
-                    FROM mutual_watched
-                    ORDER BY mutual_count DESC
-                    LIMIT 1
-                """, (user_id,))
+                cur.execute(user_profile_queries.MOST_MUTUAL_WATCHED_SQL, (user_id,))
 
                 user = cur.fetchone()
 
@@ -616,37 +916,59 @@ def get_most_mutual_watched_user(user_id: int):
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+async def get_most_mutual_watched_user_async(user_id: int):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(user_profile_queries.MOST_MUTUAL_WATCHED_SQL, (user_id,))
+
+                user = await cur.fetchone()
+
+                if user is None:
+                    raise HTTPException(status_code=404, detail="No mutual users found")
+
+                return user
+
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/user_profile/{user_id}/most_mutual", get_most_mutual_watched_user, get_most_mutual_watched_user_async)
+
 
 @app.get("/reviews/search")
-def search_comments_by_movie_id(movie_id: int):
-    # Query to get review IDs for a given movie
-    query = """
-        SELECT review_id FROM Reviews
-        WHERE movie_id = %s
-        ORDER BY Reviews.created_at DESC
-    """
+def search_comments_by_movie_id(
+    movie_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    # Query to get one page of review IDs for a given movie, newest first
+    try:
+        query, params = apply_keyset(REVIEW_IDS_BY_MOVIE_SQL, [movie_id], REVIEW_IDS_BY_MOVIE_SORT_KEYS,
+                                     "reviews_by_movie", cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute(query, (movie_id,))
-                rows = cur.fetchall()
+                cur.execute(query, params)
+                rows, next_cursor = paginate(cur.fetchall(), limit, "reviews_by_movie", REVIEW_IDS_BY_MOVIE_CURSOR_COLUMNS)
                 
                 if not rows:
-                    return {"count": 0, "reviews": []}
+                    return {"count": 0, "reviews": [], "next_cursor": None}
 
-                # Fetch detailed review info for each review_id
-                review_infos = [get_review_info(row["review_id"]) for row in rows]
+                # Fetch detailed review info for the whole page in one query
+                review_infos = get_review_infos([row["review_id"] for row in rows], conn)
 
                 return {
                     "count": len(review_infos),
-                    "reviews": review_infos
+                    "reviews": review_infos,
+                    "next_cursor": next_cursor
                 }
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.get("/movies/search")
 def search_movies(
     title: Optional[str] = None,
     genres: Optional[List[str]] = Query(None),
@@ -656,138 +978,73 @@ def search_movies(
     directors: Optional[List[str]] = Query(None),
     year: Optional[int] = None,
     rating: Optional[str] = None,
-    limit: int = Query(50, ge=1),
-    offset: int = Query(0, ge=0)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    q: Optional[str] = None,
+    fuzzy: bool = False,
+    cursor: Optional[str] = None
 ):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                # Build base query
-                query = """
-                SELECT 
-                    m.*,
-                    ARRAY_AGG(DISTINCT g.name) FILTER (WHERE g.name IS NOT NULL) as genres,
-                    ARRAY_AGG(DISTINCT w.name) FILTER (WHERE w.name IS NOT NULL) as writers,
-                    ARRAY_AGG(DISTINCT a.name) FILTER (WHERE a.name IS NOT NULL) as actors,
-                    ARRAY_AGG(DISTINCT s.name) FILTER (WHERE s.name IS NOT NULL) as studios,
-                    ARRAY_AGG(DISTINCT d.name) FILTER (WHERE d.name IS NOT NULL) as directors
-                FROM Movie m
-                LEFT JOIN MovieGenre mg ON m.movie_id = mg.movie_id
-                LEFT JOIN Genre g ON mg.genre_id = g.genre_id
-                LEFT JOIN MovieWriter mw ON m.movie_id = mw.movie_id
-                LEFT JOIN Writer w ON mw.writer_id = w.writer_id
-                LEFT JOIN MovieActor ma ON m.movie_id = ma.movie_id
-                LEFT JOIN Actor a ON ma.actor_id = a.actor_id
-                LEFT JOIN MovieStudio ms ON m.movie_id = ms.movie_id
-                LEFT JOIN Studio s ON ms.studio_id = s.studio_id
-                LEFT JOIN MovieDirector md ON m.movie_id = md.movie_id
-                LEFT JOIN Director d ON md.director_id = d.director_id
-                WHERE 1=1
-                """
-                
-                params = []
-                
-                if title:
-                    query += " AND m.title ILIKE %s"
-                    params.append(f"%{title}%")
-                
-                if genres:
-                    for genre in genres:
-                        query += """ 
-                        AND EXISTS (
-                            SELECT 1 
-                            FROM MovieGenre mg_inner 
-                            JOIN Genre g_inner ON mg_inner.genre_id = g_inner.genre_id 
-                            WHERE mg_inner.movie_id = m.movie_id 
-                            AND g_inner.name ILIKE %s
-                        )
-                        """
-                        params.append(f"%{genre}%")
-                
-                if writers:
-                    for writer in writers:
-                        query += """ 
-                        AND EXISTS (
-                            SELECT 1 
-                            FROM MovieWriter mw_inner 
-                            JOIN Writer w_inner ON mw_inner.writer_id = w_inner.writer_id 
-                            WHERE mw_inner.movie_id = m.movie_id 
-                            AND w_inner.name ILIKE %s
-                        )
-                        """
-                        params.append(f"%{writer}%")
-                
-                if actors:
-                    for actor in actors:
-                        query += """ 
-                        AND EXISTS (
-                            SELECT 1 
-                            FROM MovieActor ma_inner 
-                            JOIN Actor a_inner ON ma_inner.actor_id = a_inner.actor_id 
-                            WHERE ma_inner.movie_id = m.movie_id 
-                            AND a_inner.name ILIKE %s
-                        )
-                        """
-                        params.append(f"%{actor}%")
-                
-                if year:
-                    query += " AND EXTRACT(YEAR FROM m.in_theaters_date) = %s"
-                    params.append(year)
-
-                if rating:
-                    query += " AND m.rating ~* %s"
-                    params.append(rating)
-
-                if studios:
-                    for studio in studios:
-                        query += """ 
-                        AND EXISTS (
-                            SELECT 1 
-                            FROM MovieStudio ms_inner 
-                            JOIN Studio s_inner ON ms_inner.studio_id = s_inner.studio_id 
-                            WHERE ms_inner.movie_id = m.movie_id 
-                            AND s_inner.name ILIKE %s
-                        )
-                        """
-                        params.append(f"%{studio}%")
-                
-                if directors:
-                    for director in directors:
-                        query += """ 
-                        AND EXISTS (
-                            SELECT 1 
-                            FROM MovieDirector md_inner 
-                            JOIN Director d_inner ON md_inner.director_id = d_inner.director_id 
-                            WHERE md_inner.movie_id = m.movie_id 
-                            AND d_inner.name ILIKE %s
-                        )
-                        """
-                        params.append(f"%{director}%")
-                
-                # Add group by and ordering
-                query += """
-                GROUP BY m.movie_id, m.title, m.info, m.critics_consensus, 
-                         m.rating, m.in_theaters_date, m.on_streaming_date,
-                         m.runtime_in_minutes, m.tomatometer_status,
-                         m.tomatometer_rating, m.tomatometer_count,
-                         m.audience_rating, m.audience_count
-                ORDER BY m.title 
-                LIMIT %s OFFSET %s
-                """
-                
-                params.append(limit)
-                params.append(offset)
+                try:
+                    query, params, cursor_tag, cursor_columns = build_movie_search_query(
+                        title, genres, writers, actors, studios, directors, year, rating, limit, offset, q, fuzzy, cursor)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
                 cur.execute(query, params)
-                rows = cur.fetchall()
+                rows, next_cursor = paginate(cur.fetchall(), limit, cursor_tag, cursor_columns)
 
                 return {
                     "count": len(rows),
-                    "results": rows
+                    "results": rows,
+                    "next_cursor": next_cursor
                 }
                 
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+async def search_movies_async(
+    title: Optional[str] = None,
+    genres: Optional[List[str]] = Query(None),
+    writers: Optional[List[str]] = Query(None),
+    actors: Optional[List[str]] = Query(None),
+    studios: Optional[List[str]] = Query(None),
+    directors: Optional[List[str]] = Query(None),
+    year: Optional[int] = None,
+    rating: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    q: Optional[str] = None,
+    fuzzy: bool = False,
+    cursor: Optional[str] = None
+):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                try:
+                    query, params, cursor_tag, cursor_columns = build_movie_search_query(
+                        title, genres, writers, actors, studios, directors, year, rating, limit, offset, q, fuzzy, cursor)
+                except ValueError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                await cur.execute(query, params)
+                rows, next_cursor = paginate(await cur.fetchall(), limit, cursor_tag, cursor_columns)
+
+                return {
+                    "count": len(rows),
+                    "results": rows,
+                    "next_cursor": next_cursor
+                }
+
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/movies/search", search_movies, search_movies_async)
+
+@app.post("/movies/bulk")
+def create_movies_bulk(movies: List[MovieCreate]):
+    return run_bulk(bulk_create_movies, movies)
+
 @app.post("/movies/", status_code=201)
 def create_movie(movie: MovieCreate):
     conn = None
@@ -853,38 +1110,12 @@ def create_movie(movie: MovieCreate):
             conn.close()
             print("Database connection closed.")
 
-@app.get("/movies/{movie_id}")
+@cached("movie", lambda movie_id: [f"movie:{movie_id}"], ttl=300)
 def get_movie(movie_id: int):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                query = """
-                    SELECT 
-                        m.*,
-                        ARRAY_AGG(DISTINCT g.name) FILTER (WHERE g.name IS NOT NULL) as genres,
-                        ARRAY_AGG(DISTINCT w.name) FILTER (WHERE w.name IS NOT NULL) as writers,
-                        ARRAY_AGG(DISTINCT a.name) FILTER (WHERE a.name IS NOT NULL) as actors,
-                        ARRAY_AGG(DISTINCT s.name) FILTER (WHERE s.name IS NOT NULL) as studios,
-                        ARRAY_AGG(DISTINCT d.name) FILTER (WHERE d.name IS NOT NULL) as directors
-                    FROM Movie m
-                    LEFT JOIN MovieGenre mg ON m.movie_id = mg.movie_id
-                    LEFT JOIN Genre g ON mg.genre_id = g.genre_id
-                    LEFT JOIN MovieWriter mw ON m.movie_id = mw.movie_id
-                    LEFT JOIN Writer w ON mw.writer_id = w.writer_id
-                    LEFT JOIN MovieActor ma ON m.movie_id = ma.movie_id
-                    LEFT JOIN Actor a ON ma.actor_id = a.actor_id
-                    LEFT JOIN MovieStudio ms ON m.movie_id = ms.movie_id
-                    LEFT JOIN Studio s ON ms.studio_id = s.studio_id
-                    LEFT JOIN MovieDirector md ON m.movie_id = md.movie_id
-                    LEFT JOIN Director d ON md.director_id = d.director_id
-                    WHERE m.movie_id = %s
-                    GROUP BY m.movie_id, m.title, m.info, m.critics_consensus, 
-                             m.rating, m.in_theaters_date, m.on_streaming_date,
-                             m.runtime_in_minutes, m.tomatometer_status,
-                             m.tomatometer_rating, m.tomatometer_count,
-                             m.audience_rating, m.audience_count
-                """
-                cur.execute(query, (movie_id,))
+                cur.execute(GET_MOVIE_SQL, (movie_id,))
                 movie = cur.fetchone()
                 
                 if movie is None:
@@ -895,89 +1126,51 @@ def get_movie(movie_id: int):
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@cached("movie", lambda movie_id: [f"movie:{movie_id}"], ttl=300)
+async def get_movie_async(movie_id: int):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(GET_MOVIE_SQL, (movie_id,))
+                movie = await cur.fetchone()
+
+                if movie is None:
+                    raise HTTPException(status_code=404, detail="Movie not found")
+
+                return movie
+
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/movies/{movie_id}", get_movie, get_movie_async)
+
 @app.put("/movies/{movie_id}")
 def update_movie(movie_id: int, movie: MovieUpdate):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                # Check if movie exists
-                cur.execute("SELECT movie_id FROM Movie WHERE movie_id = %s", (movie_id,))
+                # Check if movie exists (and hold it so concurrent edits of its links serialize)
+                cur.execute("SELECT movie_id FROM Movie WHERE movie_id = %s FOR UPDATE", (movie_id,))
                 if cur.fetchone() is None:
                     raise HTTPException(status_code=404, detail="Movie not found")
 
-                # Update movie details
-                cur.execute("""
-                    UPDATE Movie 
-                    SET title = %s, info = %s, critics_consensus = %s, rating = %s,
-                        in_theaters_date = %s, on_streaming_date = %s, runtime_in_minutes = %s,
-                        tomatometer_status = %s, tomatometer_rating = %s, tomatometer_count = %s,
-                        audience_rating = %s, audience_count = %s
-                    WHERE movie_id = %s
-                """, (movie.title, movie.info, movie.critics_consensus, movie.rating,
-                     movie.in_theaters_date, movie.on_streaming_date, movie.runtime_in_minutes,
-                     movie.tomatometer_status, movie.tomatometer_rating, movie.tomatometer_count,
-                     movie.audience_rating, movie.audience_count, movie_id))
-
-                # Delete existing relationships
-                cur.execute("DELETE FROM MovieGenre WHERE movie_id = %s", (movie_id,))
-                cur.execute("DELETE FROM MovieWriter WHERE movie_id = %s", (movie_id,))
-                cur.execute("DELETE FROM MovieActor WHERE movie_id = %s", (movie_id,))
-                cur.execute("DELETE FROM MovieStudio WHERE movie_id = %s", (movie_id,))
-                cur.execute("DELETE FROM MovieDirector WHERE movie_id = %s", (movie_id,))
+                # Update movie details; skipped by the WHERE clause when nothing changed
+                params = {col: getattr(movie, col) for col in MOVIE_UPDATE_COLUMNS}
+                params["movie_id"] = movie_id
+                cur.execute(UPDATE_MOVIE_IF_CHANGED_SQL, params)
 
-                # Insert related entities and relationships
-                for genre in movie.genres:
-                    cur.execute("INSERT INTO Genre (name) VALUES (%s) ON CONFLICT (name) DO NOTHING RETURNING genre_id", (genre,))
-                    result = cur.fetchone()
-                    if result:
-                        genre_id = result['genre_id']
-                    else:
-                        cur.execute("SELECT genre_id FROM Genre WHERE name = %s", (genre,))
-                        genre_id = cur.fetchone()['genre_id']
-                    cur.execute("INSERT INTO MovieGenre (movie_id, genre_id) VALUES (%s, %s)", (movie_id, genre_id))
-
-                # Similar process for writers, actors, studios, directors
-                for writer in movie.writers:
-                    cur.execute("INSERT INTO Writer (name) VALUES (%s) ON CONFLICT (name) DO NOTHING RETURNING writer_id", (writer,))
-                    result = cur.fetchone()
-                    if result:
-                        writer_id = result['writer_id']
-                    else:
-                        cur.execute("SELECT writer_id FROM Writer WHERE name = %s", (writer,))
-                        writer_id = cur.fetchone()['writer_id']
-                    cur.execute("INSERT INTO MovieWriter (movie_id, writer_id) VALUES (%s, %s)", (movie_id, writer_id))
-
-                for actor in movie.actors:
-                    cur.execute("INSERT INTO Actor (name) VALUES (%s) ON CONFLICT (name) DO NOTHING RETURNING actor_id", (actor,))
-                    result = cur.fetchone()
-                    if result:
-                        actor_id = result['actor_id']
-                    else:
-                        cur.execute("SELECT actor_id FROM Actor WHERE name = %s", (actor,))
-                        actor_id = cur.fetchone()['actor_id']
-                    cur.execute("INSERT INTO MovieActor (movie_id, actor_id) VALUES (%s, %s)", (movie_id, actor_id))
-
-                for studio in movie.studios:
-                    cur.execute("INSERT INTO Studio (name) VALUES (%s) ON CONFLICT (name) DO NOTHING RETURNING studio_id", (studio,))
-                    result = cur.fetchone()
-                    if result:
-                        studio_id = result['studio_id']
-                    else:
-                        cur.execute("SELECT studio_id FROM Studio WHERE name = %s", (studio,))
-                        studio_id = cur.fetchone()['studio_id']
-                    cur.execute("INSERT INTO MovieStudio (movie_id, studio_id) VALUES (%s, %s)", (movie_id, studio_id))
-
-                for director in movie.directors:
-                    cur.execute("INSERT INTO Director (name) VALUES (%s) ON CONFLICT (name) DO NOTHING RETURNING director_id", (director,))
-                    result = cur.fetchone()
-                    if result:
-                        director_id = result['director_id']
-                    else:
-                        cur.execute("SELECT director_id FROM Director WHERE name = %s", (director,))
-                        director_id = cur.fetchone()['director_id']
-                    cur.execute("INSERT INTO MovieDirector (movie_id, director_id) VALUES (%s, %s)", (movie_id, director_id))
+                # Only add/remove the links that differ from what's stored
+                sync_movie_links(cur, movie_id, {
+                    'Genre': movie.genres,
+                    'Writer': movie.writers,
+                    'Actor': movie.actors,
+                    'Studio': movie.studios,
+                    'Director': movie.directors,
+                })
 
                 conn.commit()
+                # this process shouldn't wait for the NOTIFY to see its own update
+                response_cache.invalidate([f"movie:{movie_id}"])
                 return get_movie(movie_id)
 
     except psycopg2.Error as e:
@@ -1003,6 +1196,8 @@ def delete_movie(movie_id: int):
                 # Delete the movie
                 cur.execute("DELETE FROM Movie WHERE movie_id = %s", (movie_id,))
                 conn.commit()
+                # this process shouldn't wait for the NOTIFY to stop serving the movie
+                response_cache.invalidate([f"movie:{movie_id}"])
 
                 return {"message": "Movie deleted successfully"}
 
@@ -1010,84 +1205,117 @@ def delete_movie(movie_id: int):
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
-@app.get("/user_profile/{user_id}/user_liked")
-def get_liked_reviews_and_comments(user_id: int):
+def get_liked_reviews_and_comments(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        query, params = apply_keyset(
+            user_profile_queries.USER_LIKED_ITEMS_SQL, [user_id],
+            user_profile_queries.USER_LIKED_ITEMS_SORT_KEYS, "user_liked", cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
+        db_cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
         
-        query = """
-        SELECT review_id, comment_id FROM Likes
-        WHERE user_id = %s
-        """
-        cursor.execute(query, (user_id,))
-        likes = cursor.fetchall()
+        db_cursor.execute(query, params)
+        likes, next_cursor = paginate(
+            db_cursor.fetchall(), limit, "user_liked", user_profile_queries.USER_LIKED_ITEMS_CURSOR_COLUMNS)
         
-        cursor.close()
+        db_cursor.close()
         conn.close()
         
         # Separate review IDs and comment IDs
-        review_ids = [like[0] for like in likes if like[0] is not None]
-        comment_ids = [like[1] for like in likes if like[1] is not None]
+        review_ids = [like["review_id"] for like in likes if like["review_id"] is not None]
+        comment_ids = [like["comment_id"] for like in likes if like["comment_id"] is not None]
         
-        return {"review_ids": review_ids, "comment_ids": comment_ids}
+        return {"review_ids": review_ids, "comment_ids": comment_ids, "next_cursor": next_cursor}
     
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-from utils.review_info import get_review_info
-from utils.user_profile import review_ids_from_user
+async def get_liked_reviews_and_comments_async(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        query, params = apply_keyset(
+            user_profile_queries.USER_LIKED_ITEMS_SQL, [user_id],
+            user_profile_queries.USER_LIKED_ITEMS_SORT_KEYS, "user_liked", cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(query, params)
+                likes, next_cursor = paginate(
+                    await cur.fetchall(), limit, "user_liked", user_profile_queries.USER_LIKED_ITEMS_CURSOR_COLUMNS)
+
+        review_ids = [like["review_id"] for like in likes if like["review_id"] is not None]
+        comment_ids = [like["comment_id"] for like in likes if like["comment_id"] is not None]
+
+        return {"review_ids": review_ids, "comment_ids": comment_ids, "next_cursor": next_cursor}
+
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/user_profile/{user_id}/user_liked", get_liked_reviews_and_comments, get_liked_reviews_and_comments_async)
 
-@app.get("/user_profile/{user_id}/user_reviews")
-def get_reviews_from_user(user_id: int):
+def get_reviews_from_user(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     try:
-        # Fetch review IDs for the given user
-        review_ids = review_ids_from_user(user_id)
+        # Fetch one page of review IDs for the given user
+        review_ids, next_cursor = review_ids_from_user(user_id, limit, cursor)
         # print(review_ids)
         # If no reviews are found, return a message
         if not review_ids:
             return {"message": "No reviews found for this user."}
 
-        # Fetch detailed review information for each review_id
-        reviews_data = []
-        for review_id in review_ids:
-            # print('here', review_id)
-            review_info = get_review_info(review_id)
-            reviews_data.append(review_info)
+        # Fetch detailed review information for the whole page in one query
+        reviews_data = get_review_infos(review_ids)
 
-        return {"count": len(reviews_data), "results": reviews_data}
+        return {"count": len(reviews_data), "results": reviews_data, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+async def get_reviews_from_user_async(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    try:
+        async with get_async_db_connection() as conn:
+            review_ids, next_cursor = await review_ids_from_user_async(conn, user_id, limit, cursor)
+            if not review_ids:
+                return {"message": "No reviews found for this user."}
+
+            reviews_data = await get_review_infos_async(conn, review_ids)
+
+        return {"count": len(reviews_data), "results": reviews_data, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/user_profile/{user_id}/user_reviews", get_reviews_from_user, get_reviews_from_user_async)
     
 @app.get("/movies_top")
+@cached("movies_top", ["ranking:movies_top"], ttl=60, stale_while_revalidate=300)
 def get_movies_by_rating(best: bool = True):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                query = f"""
-                SELECT 
-                    m.*,
-                    ARRAY_AGG(DISTINCT g.name) FILTER (WHERE g.name IS NOT NULL) as genres,
-                    ARRAY_AGG(DISTINCT w.name) FILTER (WHERE w.name IS NOT NULL) as writers,
-                    ARRAY_AGG(DISTINCT a.name) FILTER (WHERE a.name IS NOT NULL) as actors,
-                    ARRAY_AGG(DISTINCT s.name) FILTER (WHERE s.name IS NOT NULL) as studios,
-                    ARRAY_AGG(DISTINCT d.name) FILTER (WHERE d.name IS NOT NULL) as directors
-                FROM Movie m
-                LEFT JOIN MovieGenre mg ON m.movie_id = mg.movie_id
-                LEFT JOIN Genre g ON mg.genre_id = g.genre_id
-                LEFT JOIN MovieWriter mw ON m.movie_id = mw.movie_id
-                LEFT JOIN Writer w ON mw.writer_id = w.writer_id
-                LEFT JOIN MovieActor ma ON m.movie_id = ma.movie_id
-                LEFT JOIN Actor a ON ma.actor_id = a.actor_id
-                LEFT JOIN MovieStudio ms ON m.movie_id = ms.movie_id
-                LEFT JOIN Studio s ON ms.studio_id = s.studio_id
-                LEFT JOIN MovieDirector md ON m.movie_id = md.movie_id
-                LEFT JOIN Director d ON md.director_id = d.director_id
-                WHERE m.audience_rating IS NOT NULL
-                GROUP BY m.movie_id
-                ORDER BY m.audience_rating {"DESC" if best else "ASC"}
-                LIMIT 10
-                """
+                query = GET_MOVIES_BY_AUDIENCE_RATING_SQL.format(direction="DESC" if best else "ASC")
 
                 cur.execute(query)
                 rows = cur.fetchall()
@@ -1113,39 +1341,38 @@ def create_comment(comment: CommentCreate):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                cur.execute("SELECT review_id FROM Reviews WHERE review_id = %s", (comment.review_id,))
-                if cur.fetchone() is None:
+                cur.execute(CREATE_COMMENT_SQL, {
+                    "review_id": comment.review_id, "user_id": comment.user_id, "content": comment.content
+                })
+                new_comment = cur.fetchone()
+                if not new_comment["review_exists"]:
                     raise HTTPException(status_code=404, detail="Review not found")
-
-                cur.execute("SELECT user_id FROM Users WHERE user_id = %s", (comment.user_id,))
-                if cur.fetchone() is None:
+                if not new_comment["user_exists"]:
                     raise HTTPException(status_code=404, detail="User not found")
-
-                cur.execute("""
-                    INSERT INTO Comments (review_id, user_id, content, created_at, updated_at)
-                    VALUES (%s, %s, %s, NOW(), NOW())
-                    RETURNING comment_id, review_id, user_id, content, created_at, updated_at
-                """, (comment.review_id, comment.user_id, comment.content))
-
-                new_comment = cur.fetchone()
+                del new_comment["review_exists"], new_comment["user_exists"]
                 return new_comment
 
     except psycopg2.Error as e:
+        raise_for_constraint(e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/comments/bulk")
+def create_comments_bulk(comments: List[CommentCreate]):
+    return run_bulk(bulk_create_comments, comments)
     
 
 @app.get("/movies_top_reviewed")
+@cached("movies_top_reviewed", ["ranking:top_reviewed"], ttl=60, stale_while_revalidate=300)
 def get_top_reviewed_movies():
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                query = """
-                    SELECT *
-                    FROM mv_top_10_reviewed_movies
-                    ORDER BY reviewCount DESC;
-                """
-                
-                cur.execute(query)
+                try:
+                    cur.execute(TOP_REVIEWED_MOVIES_SQL, (10,))
+                except psycopg2.errors.UndefinedTable:
+                    # database created before MovieReviewCount existed: serve the materialized view
+                    conn.rollback()
+                    cur.execute(f"SELECT * FROM {MATERIALIZED_VIEW_NAME} ORDER BY reviewCount DESC;")
                 rows = cur.fetchall()
 
                 return {
@@ -1158,6 +1385,7 @@ def get_top_reviewed_movies():
 
 
 @app.get("/users/top_likes")
+@cached("users_top_likes", ["ranking:top_likes"], ttl=60, stale_while_revalidate=300)
 def get_top_users_by_likes():
     try:
         with get_db_connection() as conn:
@@ -1184,28 +1412,13 @@ def get_top_users_by_likes():
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     
 
-@app.get("/reviews/{review_id}")
+@cached("review", lambda review_id: [f"review:{review_id}"], ttl=60)
 def get_review_with_comments(review_id: int):
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                 # Fetch review details along with like count
-                cur.execute("""
-                    SELECT 
-                        r.review_id, r.movie_id, r.user_id, r.title, r.content, r.rating, 
-                        r.created_at, r.updated_at,
-                        u.username, u.email,
-                        COALESCE(like_count.likes, 0) AS like_count
-                    FROM Reviews r
-                    JOIN Users u ON r.user_id = u.user_id
-                    LEFT JOIN (
-                        SELECT review_id, COUNT(*) AS likes
-                        FROM Likes 
-                        WHERE review_id IS NOT NULL
-                        GROUP BY review_id
-                    ) like_count ON r.review_id = like_count.review_id
-                    WHERE r.review_id = %s
-                """, (review_id,))
+                cur.execute(GET_REVIEW_WITH_LIKES_SQL, (review_id,))
                 
                 review = cur.fetchone()
                 
@@ -1213,22 +1426,7 @@ def get_review_with_comments(review_id: int):
                     raise HTTPException(status_code=404, detail="Review not found")
 
                 # Fetch all comments with like count for each comment
-                cur.execute("""
-                    SELECT 
-                        c.comment_id, c.review_id, c.user_id, c.content, c.created_at, c.updated_at,
-                        u.username, u.email,
-                        COALESCE(like_count.likes, 0) AS like_count
-                    FROM Comments c
-                    JOIN Users u ON c.user_id = u.user_id
-                    LEFT JOIN (
-                        SELECT comment_id, COUNT(*) AS likes
-                        FROM Likes 
-                        WHERE comment_id IS NOT NULL
-                        GROUP BY comment_id
-                    ) like_count ON c.comment_id = like_count.comment_id
-                    WHERE c.review_id = %s
-                    ORDER BY c.created_at ASC
-                """, (review_id,))
+                cur.execute(GET_REVIEW_COMMENTS_SQL, (review_id,))
 
                 comments = cur.fetchall()
 
@@ -1240,52 +1438,75 @@ def get_review_with_comments(review_id: int):
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+@cached("review", lambda review_id: [f"review:{review_id}"], ttl=60)
+async def get_review_with_comments_async(review_id: int):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(GET_REVIEW_WITH_LIKES_SQL, (review_id,))
+                review = await cur.fetchone()
+
+                if not review:
+                    raise HTTPException(status_code=404, detail="Review not found")
+
+                await cur.execute(GET_REVIEW_COMMENTS_SQL, (review_id,))
+                comments = await cur.fetchall()
+
+                return {
+                    "review": review,
+                    "comments": comments
+                }
+
+    except psycopg.Error as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+register_route("/reviews/{review_id}", get_review_with_comments, get_review_with_comments_async)
+
 class ReviewSortOptions(str, Enum):
     created_at = "created_at"
     most_comments = "most_comments"
 
 @app.get("/reviews/")
-def get_all_reviews(sort_by: ReviewSortOptions = ReviewSortOptions.created_at):
+def get_all_reviews(
+    sort_by: ReviewSortOptions = ReviewSortOptions.created_at,
+    movie_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    sort_keys, cursor_columns = ALL_REVIEWS_SORTS[sort_by.value]
+    cursor_tag = f"reviews:{sort_by.value}"
+
+    query, params = ALL_REVIEWS_SQL, []
+    if movie_id is not None:
+        query += " AND r.movie_id = %s"
+        params.append(movie_id)
+    if user_id is not None:
+        query += " AND r.user_id = %s"
+        params.append(user_id)
+    if since is not None:
+        query += " AND r.created_at >= %s"
+        params.append(since)
+
+    try:
+        query, params = apply_keyset(query, params, sort_keys, cursor_tag, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     try:
         with get_db_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                # Base query to fetch reviews with like and comment count
-                query = """
-                    SELECT 
-                        r.review_id, r.movie_id, r.user_id, r.title, r.content, r.rating, 
-                        r.created_at, r.updated_at,
-                        u.username, u.email,
-                        COALESCE(like_count.likes, 0) AS like_count,
-                        COALESCE(comment_count.comments, 0) AS comment_count
-                    FROM Reviews r
-                    JOIN Users u ON r.user_id = u.user_id
-                    LEFT JOIN (
-                        SELECT review_id, COUNT(*) AS likes
-                        FROM Likes 
-                        WHERE review_id IS NOT NULL
-                        GROUP BY review_id
-                    ) like_count ON r.review_id = like_count.review_id
-                    LEFT JOIN (
-                        SELECT review_id, COUNT(*) AS comments
-                        FROM Comments 
-                        GROUP BY review_id
-                    ) comment_count ON r.review_id = comment_count.review_id
-                """
-
-                if sort_by == ReviewSortOptions.created_at:
-                    query += " ORDER BY r.created_at DESC"
-                elif sort_by == ReviewSortOptions.most_comments:
-                    query += " ORDER BY COALESCE(comment_count.comments, 0) DESC, r.created_at DESC"
-
-                cur.execute(query)
-                reviews = cur.fetchall()
+                cur.execute(query, params)
+                reviews, next_cursor = paginate(cur.fetchall(), limit, cursor_tag, cursor_columns)
 
-                return {"count": len(reviews), "reviews": reviews}
+                return {"count": len(reviews), "reviews": reviews, "next_cursor": next_cursor}
 
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.get("/users/reputation")
+@cached("users_reputation", ["ranking:reputation"], ttl=60, stale_while_revalidate=300)
 def get_user_reputation():
     limit = 10
     try:
@@ -1320,19 +1541,13 @@ def get_user_details(user_id: int):
         print(f"Unexpected error fetching user {user_id}: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
     
-@app.get("/user_profile/{user_id}/reputation")
 def get_user_reputation_info(user_id: int): # Renamed function for clarity
     try:
         with get_db_connection() as conn:
             # Use RealDictCursor to get column names
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
 
-                query = """
-                SELECT reputation_score, last_updated
-                FROM UserReputation
-                WHERE user_id = %s
-                """
-                cur.execute(query, (user_id,))
+                cur.execute(user_profile_queries.USER_REPUTATION_INFO_SQL, (user_id,))
                 result = cur.fetchone()
 
                 if not result:
@@ -1344,9 +1559,34 @@ def get_user_reputation_info(user_id: int): # Renamed function for clarity
                 # The RealDictCursor already returns a dict with correct keys
                 return result # Directly return the dictionary { "reputation_score": ..., "last_updated": ...}
 
+    except HTTPException:
+        raise
     except psycopg2.Error as e:
         print(f"Database error fetching reputation for user {user_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Database error fetching reputation: {str(e)}")
     except Exception as e:
         print(f"Unexpected error fetching reputation for user {user_id}: {e}")
-        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+async def get_user_reputation_info_async(user_id: int):
+    try:
+        async with get_async_db_connection() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(user_profile_queries.USER_REPUTATION_INFO_SQL, (user_id,))
+                result = await cur.fetchone()
+
+                if not result:
+                    raise HTTPException(status_code=404, detail="User reputation not found.")
+
+                return result
+
+    except HTTPException:
+        raise
+    except psycopg.Error as e:
+        print(f"Database error fetching reputation for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error fetching reputation: {str(e)}")
+    except Exception as e:
+        print(f"Unexpected error fetching reputation for user {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+register_route("/user_profile/{user_id}/reputation", get_user_reputation_info, get_user_reputation_info_async)
@@ -1,3 +1,5 @@
+from utils.load_csv import parse_csv_timestamp
+
 class Review:
     @staticmethod
     def review_attrs_soft_check(review_attrs):
@@ -10,6 +12,6 @@ class Review:
         self.title = review_attrs['title']
         self.content = review_attrs['content']
         self.rating = float(review_attrs['rating'])
-        self.created_at = review_attrs['created_at']
-        self.updated_at = review_attrs['updated_at']
+        self.created_at = parse_csv_timestamp(review_attrs['created_at'])
+        self.updated_at = parse_csv_timestamp(review_attrs['updated_at'])
 
@@ -1,3 +1,5 @@
+from utils.load_csv import parse_csv_timestamp
+
 class User:
     @staticmethod
     def user_attrs_soft_check(user_attrs):
@@ -8,5 +10,5 @@ class User:
         self.username = user_attrs['username']
         self.email = user_attrs['email']
         self.password_hash = user_attrs['password_hash']
-        self.created_at = user_attrs['created_at']
-        self.updated_at = user_attrs.get('updated_at', None)  # Default to None if not provided
+        self.created_at = parse_csv_timestamp(user_attrs['created_at'])
+        self.updated_at = parse_csv_timestamp(user_attrs.get('updated_at')) or self.created_at  # Default to created_at if not provided
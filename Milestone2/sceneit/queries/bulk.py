@@ -0,0 +1,71 @@
+# Multi-row inserts for the /.../bulk endpoints (utils/bulk_writes.py), run with
+# psycopg2.extras.execute_values: %s expands to the VALUES list.
+#
+# Existence is validated set-wise before these run; the EXISTS guards only skip
+# rows whose parent disappeared in between, so a concurrent delete turns into a
+# per-item 404 instead of failing the whole batch on the foreign key.
+
+BULK_INSERT_MOVIES_SQL = """
+INSERT INTO Movie (movie_id, title, info, critics_consensus, rating,
+                   in_theaters_date, on_streaming_date, runtime_in_minutes,
+                   tomatometer_status, tomatometer_rating, tomatometer_count,
+                   audience_rating, audience_count)
+VALUES %s
+RETURNING movie_id, title
+"""
+
+BULK_INSERT_REVIEWS_SQL = """
+INSERT INTO Reviews (review_id, movie_id, user_id, title, content, rating, created_at, updated_at)
+SELECT v.review_id, v.movie_id, v.user_id, v.title, v.content, v.rating, NOW(), NOW()
+FROM (VALUES %s) AS v(review_id, movie_id, user_id, title, content, rating)
+WHERE EXISTS (SELECT 1 FROM Movie m WHERE m.movie_id = v.movie_id)
+  AND EXISTS (SELECT 1 FROM Users u WHERE u.user_id = v.user_id)
+RETURNING review_id, movie_id, user_id, title, content, rating, created_at, updated_at
+"""
+BULK_REVIEW_TEMPLATE = "(%s::int, %s::int, %s::int, %s::text, %s::text, %s::numeric)"
+
+BULK_INSERT_COMMENTS_SQL = """
+INSERT INTO Comments (comment_id, review_id, user_id, content, created_at, updated_at)
+SELECT v.comment_id, v.review_id, v.user_id, v.content, NOW(), NOW()
+FROM (VALUES %s) AS v(comment_id, review_id, user_id, content)
+WHERE EXISTS (SELECT 1 FROM Reviews r WHERE r.review_id = v.review_id)
+  AND EXISTS (SELECT 1 FROM Users u WHERE u.user_id = v.user_id)
+RETURNING comment_id, review_id, user_id, content, created_at, updated_at
+"""
+BULK_COMMENT_TEMPLATE = "(%s::int, %s::int, %s::int, %s::text)"
+
+BULK_INSERT_LIKES_SQL = """
+INSERT INTO Likes (user_id, review_id, comment_id, created_at)
+SELECT v.user_id, v.review_id, v.comment_id, NOW()
+FROM (VALUES %s) AS v(user_id, review_id, comment_id)
+WHERE EXISTS (SELECT 1 FROM Users u WHERE u.user_id = v.user_id)
+  AND (v.review_id IS NULL OR EXISTS (SELECT 1 FROM Reviews r WHERE r.review_id = v.review_id))
+  AND (v.comment_id IS NULL OR EXISTS (SELECT 1 FROM Comments c WHERE c.comment_id = v.comment_id))
+  AND NOT EXISTS (
+      SELECT 1 FROM Likes l
+      WHERE l.user_id = v.user_id AND (l.review_id = v.review_id OR l.comment_id = v.comment_id)
+  )
+ON CONFLICT DO NOTHING
+RETURNING like_id, user_id, review_id, comment_id, created_at
+"""
+BULK_LIKE_TEMPLATE = "(%s::int, %s::int, %s::int)"
+
+# likes the given users already have on the given reviews/comments
+EXISTING_LIKES_SQL = """
+SELECT user_id, review_id, comment_id
+FROM Likes
+WHERE user_id = ANY(%s) AND (review_id = ANY(%s) OR comment_id = ANY(%s))
+"""
+
+BULK_INSERT_WATCHED_SQL = """
+INSERT INTO Watched (user_id, movie_id)
+SELECT v.user_id, v.movie_id
+FROM (VALUES %s) AS v(user_id, movie_id)
+WHERE EXISTS (SELECT 1 FROM Users u WHERE u.user_id = v.user_id)
+  AND EXISTS (SELECT 1 FROM Movie m WHERE m.movie_id = v.movie_id)
+ON CONFLICT (user_id, movie_id) DO NOTHING
+RETURNING user_id, movie_id, watched_at
+"""
+BULK_WATCHED_TEMPLATE = "(%s::int, %s::int)"
+
+ALLOCATE_IDS_SQL = "SELECT nextval(pg_get_serial_sequence(%s, %s)) AS id FROM generate_series(1, %s)"
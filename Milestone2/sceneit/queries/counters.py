@@ -0,0 +1,167 @@
+# Denormalized like/comment counters on Reviews and Comments, and review counts
+# per movie in MovieReviewCount, kept up to date by
+# statement-level triggers (one UPDATE per statement, so bulk inserts/deletes
+# and ON DELETE CASCADEs cost one aggregate instead of one update per row).
+# utils/counters.py reconciles them against the real counts.
+
+# Transition tables can't be shared between INSERT and DELETE triggers, so each
+# table gets two triggers that both name their transition table changed_rows
+# and run the same function, which picks the sign from TG_OP.
+CREATE_COUNTER_TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION update_like_counters()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INT := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+BEGIN
+    UPDATE Reviews r
+    SET like_count = r.like_count + delta * d.likes
+    FROM (
+        SELECT review_id, COUNT(*) AS likes FROM changed_rows
+        WHERE review_id IS NOT NULL GROUP BY review_id
+    ) d
+    WHERE r.review_id = d.review_id;
+
+    UPDATE Comments c
+    SET like_count = c.like_count + delta * d.likes
+    FROM (
+        SELECT comment_id, COUNT(*) AS likes FROM changed_rows
+        WHERE comment_id IS NOT NULL GROUP BY comment_id
+    ) d
+    WHERE c.comment_id = d.comment_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_comment_counters()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INT := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+BEGIN
+    UPDATE Reviews r
+    SET comment_count = r.comment_count + delta * d.comments
+    FROM (SELECT review_id, COUNT(*) AS comments FROM changed_rows GROUP BY review_id) d
+    WHERE r.review_id = d.review_id;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ordered by movie_id so concurrent loaders lock MovieReviewCount rows in the same order
+CREATE OR REPLACE FUNCTION update_movie_review_counts()
+RETURNS TRIGGER AS $$
+DECLARE
+    delta INT := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+BEGIN
+    INSERT INTO MovieReviewCount (movie_id, review_count)
+    SELECT movie_id, delta * COUNT(*) FROM changed_rows
+    WHERE EXISTS (SELECT 1 FROM Movie m WHERE m.movie_id = changed_rows.movie_id)
+    GROUP BY movie_id
+    ORDER BY movie_id
+    ON CONFLICT (movie_id)
+    DO UPDATE SET review_count = MovieReviewCount.review_count + EXCLUDED.review_count;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS movie_review_counts_on_insert ON Reviews;
+CREATE TRIGGER movie_review_counts_on_insert
+    AFTER INSERT ON Reviews
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_movie_review_counts();
+
+DROP TRIGGER IF EXISTS movie_review_counts_on_delete ON Reviews;
+CREATE TRIGGER movie_review_counts_on_delete
+    AFTER DELETE ON Reviews
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_movie_review_counts();
+
+DROP TRIGGER IF EXISTS like_counters_on_insert ON Likes;
+CREATE TRIGGER like_counters_on_insert
+    AFTER INSERT ON Likes
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_like_counters();
+
+DROP TRIGGER IF EXISTS like_counters_on_delete ON Likes;
+CREATE TRIGGER like_counters_on_delete
+    AFTER DELETE ON Likes
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_like_counters();
+
+DROP TRIGGER IF EXISTS comment_counters_on_insert ON Comments;
+CREATE TRIGGER comment_counters_on_insert
+    AFTER INSERT ON Comments
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_comment_counters();
+
+DROP TRIGGER IF EXISTS comment_counters_on_delete ON Comments;
+CREATE TRIGGER comment_counters_on_delete
+    AFTER DELETE ON Comments
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION update_comment_counters();
+"""
+
+# Likes/Comments/Reviews are SHARE locked first (utils/counters.py) so no counter
+# moves between reading the real counts and writing them back.
+RECONCILE_REVIEW_COUNTERS_SQL = """
+UPDATE Reviews r
+SET like_count = actual.like_count, comment_count = actual.comment_count
+FROM (
+    SELECT r.review_id, COALESCE(l.likes, 0) AS like_count, COALESCE(c.comments, 0) AS comment_count
+    FROM Reviews r
+    LEFT JOIN (
+        SELECT review_id, COUNT(*) AS likes FROM Likes WHERE review_id IS NOT NULL GROUP BY review_id
+    ) l ON l.review_id = r.review_id
+    LEFT JOIN (
+        SELECT review_id, COUNT(*) AS comments FROM Comments GROUP BY review_id
+    ) c ON c.review_id = r.review_id
+) actual
+WHERE r.review_id = actual.review_id
+  AND (r.like_count <> actual.like_count OR r.comment_count <> actual.comment_count)
+RETURNING r.review_id
+"""
+
+RECONCILE_COMMENT_COUNTERS_SQL = """
+UPDATE Comments c
+SET like_count = actual.like_count
+FROM (
+    SELECT c.comment_id, COALESCE(l.likes, 0) AS like_count
+    FROM Comments c
+    LEFT JOIN (
+        SELECT comment_id, COUNT(*) AS likes FROM Likes WHERE comment_id IS NOT NULL GROUP BY comment_id
+    ) l ON l.comment_id = c.comment_id
+) actual
+WHERE c.comment_id = actual.comment_id
+  AND c.like_count <> actual.like_count
+RETURNING c.comment_id
+"""
+
+# upserts movies whose count is wrong or missing, zeroes movies that lost all their reviews
+RECONCILE_MOVIE_REVIEW_COUNTS_SQL = """
+WITH actual AS (
+    SELECT movie_id, COUNT(*) AS review_count FROM Reviews GROUP BY movie_id
+),
+fixed AS (
+    INSERT INTO MovieReviewCount (movie_id, review_count)
+    SELECT movie_id, review_count FROM actual
+    ORDER BY movie_id
+    ON CONFLICT (movie_id) DO UPDATE SET review_count = EXCLUDED.review_count
+    WHERE MovieReviewCount.review_count <> EXCLUDED.review_count
+    RETURNING movie_id
+),
+zeroed AS (
+    UPDATE MovieReviewCount c
+    SET review_count = 0
+    WHERE c.review_count <> 0
+      AND NOT EXISTS (SELECT 1 FROM Reviews r WHERE r.movie_id = c.movie_id)
+    RETURNING movie_id
+)
+SELECT (SELECT COUNT(*) FROM fixed) + (SELECT COUNT(*) FROM zeroed)
+"""
@@ -1,3 +1,5 @@
+from queries.movie_projection import MOVIE_DIMENSION_COLUMNS_SQL
+
 CREATE_TABLES_SQL = """
 CREATE TABLE IF NOT EXISTS Movie (
     movie_id SERIAL PRIMARY KEY,
@@ -77,8 +79,8 @@ CREATE TABLE IF NOT EXISTS Users (
   username VARCHAR(50) UNIQUE NOT NULL,
   email VARCHAR(255) UNIQUE NOT NULL,
   password_hash VARCHAR(255) NOT NULL,
-  created_at VARCHAR(255) NOT NULL,
-  updated_at VARCHAR(255) NOT NULL
+  created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS Reviews (
@@ -88,8 +90,11 @@ CREATE TABLE IF NOT EXISTS Reviews (
     title VARCHAR(255) NOT NULL,
     content TEXT NOT NULL,
     rating DECIMAL(4,2) NOT NULL CHECK (rating BETWEEN 0 AND 100),
-    created_at VARCHAR(255) NOT NULL,
-    updated_at VARCHAR(255) NOT NULL
+    created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    -- maintained by triggers (queries/counters.py)
+    like_count INT NOT NULL DEFAULT 0,
+    comment_count INT NOT NULL DEFAULT 0
 );
 
 CREATE TABLE IF NOT EXISTS Comments (
@@ -98,7 +103,8 @@ CREATE TABLE IF NOT EXISTS Comments (
     user_id INT NOT NULL REFERENCES Users(user_id) ON DELETE CASCADE,
     content TEXT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    like_count INT NOT NULL DEFAULT 0  -- maintained by triggers (queries/counters.py)
 );
 
 CREATE TABLE IF NOT EXISTS Likes (
@@ -119,6 +125,18 @@ CREATE TABLE IF NOT EXISTS Watched (
     watched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
     PRIMARY KEY (user_id, movie_id)
 );
+-- reviews per movie, maintained by triggers (queries/counters.py); backs /movies_top_reviewed
+CREATE TABLE IF NOT EXISTS MovieReviewCount (
+    movie_id INT PRIMARY KEY REFERENCES Movie(movie_id) ON DELETE CASCADE,
+    review_count INT NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_movie_review_count_top ON MovieReviewCount(review_count DESC, movie_id);
+-- hash of the movies.csv row each movie was last loaded from (utils/delta_sync.py)
+CREATE TABLE IF NOT EXISTS MovieSyncState (
+    movie_id INT PRIMARY KEY REFERENCES Movie(movie_id) ON DELETE CASCADE,
+    row_hash TEXT NOT NULL,
+    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
 CREATE TABLE IF NOT EXISTS Liked_Movie (
     user_id INT NOT NULL REFERENCES Users(user_id) ON DELETE CASCADE,
     movie_id INT NOT NULL REFERENCES Movie(movie_id) ON DELETE CASCADE,
@@ -128,12 +146,86 @@ CREATE TABLE IF NOT EXISTS Liked_Movie (
 
 """
 
+# Users/Reviews created_at/updated_at used to be VARCHAR; converts databases
+# created before they became TIMESTAMPTZ. Does nothing once they are.
+MIGRATE_TIMESTAMPS_SQL = """
+DO $$
+DECLARE
+    col RECORD;
+BEGIN
+    FOR col IN
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+          AND table_name IN ('users', 'reviews')
+          AND column_name IN ('created_at', 'updated_at')
+          AND data_type = 'character varying'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE %I ALTER COLUMN %I TYPE TIMESTAMPTZ USING %I::timestamptz, ALTER COLUMN %I SET DEFAULT CURRENT_TIMESTAMP',
+            col.table_name, col.column_name, col.column_name, col.column_name
+        );
+    END LOOP;
+END $$;
+"""
+
+# Reviews/Comments counter columns (queries/counters.py) for databases created
+# before them; utils.counters.migrate_counter_columns runs this only when one is
+# missing and then backfills them. MISSING_COUNTER_COLUMNS_SQL counts the missing
+# ones (0 before CREATE_TABLES_SQL has run, since then there is nothing to migrate).
+MISSING_COUNTER_COLUMNS_SQL = """
+SELECT COUNT(*)
+FROM (VALUES ('reviews', 'like_count'), ('reviews', 'comment_count'), ('comments', 'like_count'))
+     AS expected (table_name, column_name)
+WHERE to_regclass('reviews') IS NOT NULL
+  AND to_regclass('comments') IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1 FROM information_schema.columns c
+      WHERE c.table_schema = current_schema()
+        AND c.table_name = expected.table_name
+        AND c.column_name = expected.column_name
+  )
+"""
+
+MIGRATE_COUNTER_COLUMNS_SQL = """
+ALTER TABLE Reviews
+    ADD COLUMN IF NOT EXISTS like_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS comment_count INT NOT NULL DEFAULT 0;
+ALTER TABLE Comments
+    ADD COLUMN IF NOT EXISTS like_count INT NOT NULL DEFAULT 0;
+"""
+
 CREATE_INDICES_SQL = """
 CREATE INDEX IF NOT EXISTS idx_movie_title_lower ON Movie(LOWER(title));
 CREATE INDEX IF NOT EXISTS idx_movie_title ON Movie(title);
 CREATE INDEX IF NOT EXISTS idx_movie_reviews_id ON Reviews(movie_id);
+-- one index per /reviews/ sort order (ReviewSortOptions), plus the per-movie and per-user timelines
+-- (/reviews/?movie_id=, /reviews/search, /user_profile/{id}/user_reviews), scanned backwards for DESC
+CREATE INDEX IF NOT EXISTS idx_reviews_created ON Reviews(created_at, review_id);
+CREATE INDEX IF NOT EXISTS idx_reviews_most_comments ON Reviews(comment_count, created_at, review_id);
+CREATE INDEX IF NOT EXISTS idx_reviews_movie_created ON Reviews(movie_id, created_at, review_id);
+CREATE INDEX IF NOT EXISTS idx_reviews_user_created ON Reviews(user_id, created_at, review_id);
 
 CREATE INDEX IF NOT EXISTS idx_likes_user_id ON Likes(user_id);
+-- one like per user per review/comment; also serves the "already liked" checks.
+-- Databases created before these indexes may hold duplicate likes (concurrent
+-- likes of the same item); keep the oldest of each so the indexes can be built.
+-- Only needed once, so skipped when both indexes already exist.
+DO $$
+BEGIN
+    IF to_regclass('idx_likes_user_review') IS NULL OR to_regclass('idx_likes_user_comment') IS NULL THEN
+        DELETE FROM Likes a USING Likes b
+        WHERE a.user_id = b.user_id
+          AND a.review_id IS NOT DISTINCT FROM b.review_id
+          AND a.comment_id IS NOT DISTINCT FROM b.comment_id
+          AND a.like_id > b.like_id;
+    END IF;
+END $$;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_likes_user_review ON Likes(user_id, review_id) WHERE review_id IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_likes_user_comment ON Likes(user_id, comment_id) WHERE comment_id IS NOT NULL;
+-- like counts per review / comment
+CREATE INDEX IF NOT EXISTS idx_likes_review_id ON Likes(review_id) WHERE review_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_likes_comment_id ON Likes(comment_id) WHERE comment_id IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_moviegenre_movie_id ON MovieGenre(movie_id);
 CREATE INDEX IF NOT EXISTS idx_moviegenre_genre_id ON Genre(genre_id);
 
@@ -151,15 +243,44 @@ CREATE INDEX IF NOT EXISTS idx_moviestudio_studio_id ON Studio(studio_id);
 
 CREATE INDEX IF NOT EXISTS idx_movie_title_lower ON Movie(LOWER(title));
 CREATE UNIQUE INDEX IF NOT EXISTS idx_movie_title ON Movie(title);
+
+-- full-text search (/movies/search?q=...)
+CREATE INDEX IF NOT EXISTS idx_movie_info_ts_vector ON Movie USING GIN (info_ts_vector);
+
+-- trigram indexes: serve ILIKE '%term%' and the fuzzy (word similarity) mode of /movies/search,
+-- which the b-tree title indexes can't do with a leading wildcard
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS idx_movie_title_trgm ON Movie USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_genre_name_trgm ON Genre USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_writer_name_trgm ON Writer USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_actor_name_trgm ON Actor USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_studio_name_trgm ON Studio USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_director_name_trgm ON Director USING GIN (name gin_trgm_ops);
+
+-- name -> movies lookups for the filters above; the junction PKs lead with movie_id
+CREATE INDEX IF NOT EXISTS idx_moviegenre_genre ON MovieGenre(genre_id);
+CREATE INDEX IF NOT EXISTS idx_moviewriter_writer ON MovieWriter(writer_id);
+CREATE INDEX IF NOT EXISTS idx_movieactor_actor ON MovieActor(actor_id);
+CREATE INDEX IF NOT EXISTS idx_moviestudio_studio ON MovieStudio(studio_id);
+CREATE INDEX IF NOT EXISTS idx_moviedirector_director ON MovieDirector(director_id);
 """
 #useful for faster joins for returning full movie results
 
 # create tsvector collumns on [info] collumn of [Movie] for better search
 # also need a trigger to run to keep this new collum up to date with the info collumn
+# the vector also covers title (weight A) and critics_consensus (weight B) so
+# ts_rank_cd ranks title matches above matches buried in the synopsis (weight C)
 INFO_TS_VECTOR_TRIGGER = """
+CREATE OR REPLACE FUNCTION movie_search_vector(title TEXT, critics_consensus TEXT, info TEXT)
+RETURNS tsvector AS $$
+  SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+      || setweight(to_tsvector('english', coalesce(critics_consensus, '')), 'B')
+      || setweight(to_tsvector('english', coalesce(info, '')), 'C');
+$$ LANGUAGE sql IMMUTABLE;
+
 CREATE OR REPLACE FUNCTION update_info_vector() RETURNS TRIGGER AS $$
 BEGIN
-  NEW.info_ts_vector := to_tsvector('english', NEW.info);
+  NEW.info_ts_vector := movie_search_vector(NEW.title, NEW.critics_consensus, NEW.info);
   RETURN NEW;
 END
 $$ LANGUAGE plpgsql;
@@ -167,9 +288,14 @@ $$ LANGUAGE plpgsql;
 CREATE OR REPLACE TRIGGER movie_info_vector_update
 BEFORE INSERT OR UPDATE ON Movie
 FOR EACH ROW EXECUTE FUNCTION update_info_vector();
+
+-- rows written before the vector covered title/critics_consensus
+UPDATE Movie
+SET info_ts_vector = movie_search_vector(title, critics_consensus, info)
+WHERE info_ts_vector IS DISTINCT FROM movie_search_vector(title, critics_consensus, info);
 """
 
-CREATE_MATERIALIZED_VIEW = """
+CREATE_MATERIALIZED_VIEW = f"""
 CREATE MATERIALIZED VIEW mv_top_10_reviewed_movies AS
 WITH groupedReviews AS (
     SELECT movie_id, count(*) AS reviewCount
@@ -193,30 +319,22 @@ SELECT
     m.audience_rating,
     m.audience_count,
     gr.reviewCount,
-    ARRAY_AGG(DISTINCT g.name) FILTER (WHERE g.name IS NOT NULL) as genres,
-    ARRAY_AGG(DISTINCT w.name) FILTER (WHERE w.name IS NOT NULL) as writers,
-    ARRAY_AGG(DISTINCT a.name) FILTER (WHERE a.name IS NOT NULL) as actors,
-    ARRAY_AGG(DISTINCT s.name) FILTER (WHERE s.name IS NOT NULL) as studios,
-    ARRAY_AGG(DISTINCT d.name) FILTER (WHERE d.name IS NOT NULL) as directors
+{MOVIE_DIMENSION_COLUMNS_SQL}
 FROM Movie m
-INNER JOIN groupedReviews gr ON gr.movie_id = m.movie_id
-LEFT JOIN MovieGenre mg ON m.movie_id = mg.movie_id
-LEFT JOIN Genre g ON mg.genre_id = g.genre_id
-LEFT JOIN MovieWriter mw ON m.movie_id = mw.movie_id
-LEFT JOIN Writer w ON mw.writer_id = w.writer_id
-LEFT JOIN MovieActor ma ON m.movie_id = ma.movie_id
-LEFT JOIN Actor a ON ma.actor_id = a.actor_id
-LEFT JOIN MovieStudio ms ON m.movie_id = ms.movie_id
-LEFT JOIN Studio s ON ms.studio_id = s.studio_id
-LEFT JOIN MovieDirector md ON m.movie_id = md.movie_id
-LEFT JOIN Director d ON md.director_id = d.director_id
-GROUP BY m.movie_id, gr.reviewCount;
+INNER JOIN groupedReviews gr ON gr.movie_id = m.movie_id;
 """
 
+# the unique index is what REFRESH ... CONCURRENTLY needs
 MATERIALIZED_VIEW_INDEX="""
 CREATE INDEX idx_mv_top_10_reviewed_movies_count ON mv_top_10_reviewed_movies (reviewCount DESC);
+CREATE UNIQUE INDEX idx_mv_top_10_reviewed_movies_movie_id ON mv_top_10_reviewed_movies (movie_id);
 """
 
 REFRESH_MATERIALIZED_VIEW="""
 REFRESH MATERIALIZED VIEW mv_top_10_reviewed_movies;
+"""
+
+# doesn't block readers of the view; needs the unique index above
+REFRESH_MATERIALIZED_VIEW_CONCURRENTLY="""
+REFRESH MATERIALIZED VIEW CONCURRENTLY mv_top_10_reviewed_movies;
 """
\ No newline at end of file
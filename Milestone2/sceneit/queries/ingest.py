@@ -0,0 +1,50 @@
+# Checkpoints for utils/parallel_ingest.py. One row per CSV partition: where it
+# starts in the file, how many rows it spans and the first primary key its valid
+# rows get, so a resumed load reproduces exactly the same ids. A partition is
+# marked done in the same transaction that loads it.
+CREATE_INGEST_PARTITION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS IngestPartition (
+    dataset VARCHAR(50) NOT NULL,
+    partition_no INT NOT NULL,
+    source_path TEXT NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    row_count INT NOT NULL,
+    first_id INT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'done')),
+    rows_loaded INT,
+    completed_at TIMESTAMP,
+    PRIMARY KEY (dataset, partition_no)
+);
+"""
+
+GET_INGEST_PARTITIONS_SQL = """
+SELECT partition_no, source_path, byte_offset, row_count, first_id, status, rows_loaded
+FROM IngestPartition
+WHERE dataset = %s
+ORDER BY partition_no
+"""
+
+INSERT_INGEST_PARTITION_SQL = """
+INSERT INTO IngestPartition (dataset, partition_no, source_path, byte_offset, row_count, first_id)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+# claims the partition; the row lock also keeps a second ingest run off it
+CLAIM_INGEST_PARTITION_SQL = """
+UPDATE IngestPartition
+SET status = 'done', completed_at = NOW()
+WHERE dataset = %s AND partition_no = %s AND status = 'pending'
+"""
+
+SET_INGEST_PARTITION_ROWS_SQL = """
+UPDATE IngestPartition
+SET rows_loaded = %s
+WHERE dataset = %s AND partition_no = %s
+"""
+
+DELETE_INGEST_PARTITIONS_SQL = "DELETE FROM IngestPartition WHERE dataset = %s"
+
+# partitions insert explicit ids, so move the serial past them once loading is done
+SYNC_ID_SEQUENCE_SQL = "SELECT setval(pg_get_serial_sequence('{table}', '{id_column}'), MAX({id_column})) FROM {table}"
+
+MAX_ID_SQL = "SELECT COALESCE(MAX({id_column}), 0) FROM {table}"
@@ -1,6 +1,6 @@
 INSERT_REVIEW_SQL = """
 INSERT INTO Reviews (movie_id, user_id, title, content, rating, created_at, updated_at)
-VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
+VALUES (%s, %s, %s, %s, %s, %s, %s)
 RETURNING review_id;
 """
 
@@ -8,7 +8,7 @@ NUM_REVIEWS_SQL = "SELECT COUNT(*) FROM Reviews"
 
 INSERT_USER_SQL = """
 INSERT INTO Users (username, email, password_hash, created_at, updated_at)
-VALUES (%s, %s, %s, NOW(), NOW())
+VALUES (%s, %s, %s, %s, %s)
 RETURNING user_id;
 """
 
@@ -0,0 +1,88 @@
+# Durable queue for heavy maintenance work (ingest, view refreshes, backfills),
+# run by `python -m utils.job_queue` worker processes instead of the API.
+# Higher priority first, then oldest run_after. Not dropped by /seed.
+CREATE_JOB_QUEUE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS JobQueue (
+    job_id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    priority INT NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    attempts INT NOT NULL DEFAULT 0,
+    max_attempts INT NOT NULL DEFAULT 3,
+    run_after TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    enqueued_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ,
+    duration_seconds DOUBLE PRECISION,
+    worker VARCHAR(255),
+    result JSONB,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_queue_ready ON JobQueue(priority DESC, run_after, job_id) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_job_queue_running ON JobQueue(started_at) WHERE status = 'running';
+"""
+
+ENQUEUE_JOB_SQL = """
+INSERT INTO JobQueue (kind, payload, priority, max_attempts)
+VALUES (%s, %s, %s, %s)
+RETURNING job_id
+"""
+
+# SKIP LOCKED lets any number of workers poll at once: each one takes the first
+# ready job nobody else is claiming instead of queueing up behind its row lock
+CLAIM_JOB_SQL = """
+UPDATE JobQueue
+SET status = 'running', attempts = attempts + 1, started_at = NOW(), finished_at = NULL, worker = %s
+WHERE job_id = (
+    SELECT job_id FROM JobQueue
+    WHERE status = 'queued' AND run_after <= NOW()
+    ORDER BY priority DESC, run_after, job_id
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING job_id, kind, payload, attempts, max_attempts
+"""
+
+COMPLETE_JOB_SQL = """
+UPDATE JobQueue
+SET status = 'succeeded', result = %s, last_error = NULL, duration_seconds = %s, finished_at = NOW()
+WHERE job_id = %s
+"""
+
+# requeues with exponential backoff until max_attempts is used up
+FAIL_JOB_SQL = """
+UPDATE JobQueue
+SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+    run_after = NOW() + make_interval(secs => %(retry_base)s * power(2, attempts - 1)),
+    last_error = %(error)s,
+    duration_seconds = %(duration)s,
+    finished_at = NOW()
+WHERE job_id = %(job_id)s
+RETURNING status
+"""
+
+# jobs left 'running' by a worker that died count as a failed attempt
+RECOVER_STALE_JOBS_SQL = """
+UPDATE JobQueue
+SET status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+    run_after = NOW(),
+    last_error = 'worker ' || COALESCE(worker, '?') || ' stopped responding',
+    finished_at = NOW()
+WHERE status = 'running' AND started_at < NOW() - make_interval(secs => %s)
+RETURNING job_id
+"""
+
+GET_JOB_SQL = """
+SELECT job_id, kind, payload, priority, status, attempts, max_attempts, run_after, enqueued_at,
+       started_at, finished_at, duration_seconds, worker, result, last_error
+FROM JobQueue
+WHERE job_id = %s
+"""
+
+JOB_QUEUE_STATS_SQL = """
+SELECT kind, status, COUNT(*) AS jobs, AVG(duration_seconds) AS avg_seconds, MAX(duration_seconds) AS max_seconds
+FROM JobQueue
+GROUP BY kind, status
+ORDER BY kind, status
+"""
@@ -0,0 +1,47 @@
+# Coordination and history for the APScheduler jobs (utils/jobs.py). One row per
+# run that a worker actually started; other workers skip the job while the
+# advisory lock is held or a run started recently. Not dropped by /seed.
+CREATE_JOB_RUN_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS JobRun (
+    run_id SERIAL PRIMARY KEY,
+    job_id VARCHAR(100) NOT NULL,
+    worker VARCHAR(255) NOT NULL,
+    started_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    finished_at TIMESTAMPTZ,
+    duration_seconds DOUBLE PRECISION,
+    status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (status IN ('running', 'succeeded', 'failed')),
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_run_job_started ON JobRun(job_id, started_at DESC);
+"""
+
+# session-level, so it stays held across the commits made while the job runs
+TRY_JOB_LOCK_SQL = "SELECT pg_try_advisory_lock(hashtext('sceneit.job.' || %s))"
+JOB_UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('sceneit.job.' || %s))"
+
+# a failed run doesn't count, so the next worker to fire retries it
+RAN_RECENTLY_SQL = """
+SELECT EXISTS (
+    SELECT 1 FROM JobRun
+    WHERE job_id = %s AND status <> 'failed'
+      AND started_at > NOW() - make_interval(secs => %s)
+)
+"""
+
+START_JOB_RUN_SQL = """
+INSERT INTO JobRun (job_id, worker) VALUES (%s, %s)
+RETURNING run_id
+"""
+
+FINISH_JOB_RUN_SQL = """
+UPDATE JobRun
+SET status = %s, detail = %s, duration_seconds = %s, finished_at = NOW()
+WHERE run_id = %s
+"""
+
+RECENT_JOB_RUNS_SQL = """
+SELECT run_id, job_id, worker, started_at, finished_at, duration_seconds, status, detail
+FROM JobRun
+ORDER BY started_at DESC
+LIMIT %s
+"""
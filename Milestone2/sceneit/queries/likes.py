@@ -0,0 +1,74 @@
+# Each write is a single statement: the checks CTE reads the existence flags the
+# handler needs for its 404/400 responses, and the insert/delete only runs when
+# they pass. The statement always returns one row (flags + the inserted columns,
+# which are NULL when nothing was written).
+#
+# already_liked alone doesn't stop two concurrent likes of the same item: both
+# can pass the check and insert. The partial unique indexes on
+# Likes(user_id, review_id) / (user_id, comment_id) close that race: the like
+# that commits second hits ON CONFLICT DO NOTHING, so its row comes back with
+# already_liked false but no like_id.
+
+INSERT_REVIEW_LIKE_SQL = """
+WITH checks AS (
+    SELECT EXISTS (SELECT 1 FROM Users WHERE user_id = %(user_id)s::int) AS user_exists,
+           EXISTS (SELECT 1 FROM Reviews WHERE review_id = %(target_id)s::int) AS target_exists,
+           EXISTS (SELECT 1 FROM Likes WHERE user_id = %(user_id)s::int AND review_id = %(target_id)s::int) AS already_liked
+),
+inserted AS (
+    INSERT INTO Likes (user_id, review_id, created_at)
+    SELECT %(user_id)s::int, %(target_id)s::int, NOW() FROM checks
+    WHERE user_exists AND target_exists AND NOT already_liked
+    ON CONFLICT (user_id, review_id) WHERE review_id IS NOT NULL DO NOTHING
+    RETURNING like_id, user_id, review_id, created_at
+)
+SELECT checks.user_exists, checks.target_exists, checks.already_liked, inserted.*
+FROM checks LEFT JOIN inserted ON true
+"""
+
+INSERT_COMMENT_LIKE_SQL = """
+WITH checks AS (
+    SELECT EXISTS (SELECT 1 FROM Users WHERE user_id = %(user_id)s::int) AS user_exists,
+           EXISTS (SELECT 1 FROM Comments WHERE comment_id = %(target_id)s::int) AS target_exists,
+           EXISTS (SELECT 1 FROM Likes WHERE user_id = %(user_id)s::int AND comment_id = %(target_id)s::int) AS already_liked
+),
+inserted AS (
+    INSERT INTO Likes (user_id, comment_id, created_at)
+    SELECT %(user_id)s::int, %(target_id)s::int, NOW() FROM checks
+    WHERE user_exists AND target_exists AND NOT already_liked
+    ON CONFLICT (user_id, comment_id) WHERE comment_id IS NOT NULL DO NOTHING
+    RETURNING like_id, user_id, comment_id, created_at
+)
+SELECT checks.user_exists, checks.target_exists, checks.already_liked, inserted.*
+FROM checks LEFT JOIN inserted ON true
+"""
+
+ADD_LIKED_MOVIE_SQL = """
+WITH checks AS (
+    SELECT EXISTS (SELECT 1 FROM Users WHERE user_id = %(user_id)s::int) AS user_exists,
+           EXISTS (SELECT 1 FROM Movie WHERE movie_id = %(movie_id)s::int) AS movie_exists
+),
+inserted AS (
+    INSERT INTO Liked_Movie (user_id, movie_id, liked_at)
+    SELECT %(user_id)s::int, %(movie_id)s::int, NOW() FROM checks
+    WHERE user_exists AND movie_exists
+    ON CONFLICT (user_id, movie_id) DO NOTHING
+    RETURNING user_id
+)
+SELECT checks.user_exists, checks.movie_exists, EXISTS (SELECT 1 FROM inserted) AS changed
+FROM checks
+"""
+
+REMOVE_LIKED_MOVIE_SQL = """
+WITH checks AS (
+    SELECT EXISTS (SELECT 1 FROM Users WHERE user_id = %(user_id)s::int) AS user_exists,
+           EXISTS (SELECT 1 FROM Movie WHERE movie_id = %(movie_id)s::int) AS movie_exists
+),
+deleted AS (
+    DELETE FROM Liked_Movie
+    WHERE user_id = %(user_id)s::int AND movie_id = %(movie_id)s::int
+    RETURNING user_id
+)
+SELECT checks.user_exists, checks.movie_exists, EXISTS (SELECT 1 FROM deleted) AS changed
+FROM checks
+"""
@@ -0,0 +1,47 @@
+# Shared projection for "a movie with all of its genres/writers/actors/studios/directors".
+#
+# Each dimension is aggregated on its own with a correlated subquery instead of
+# LEFT JOINing all five junction tables at once. The joins produced a
+# genres x writers x actors x studios x directors product per movie that
+# ARRAY_AGG(DISTINCT ...) then had to collapse; here every subquery only reads
+# that movie's rows from one junction table (served by idx_movie*_movie_id).
+#
+# Names are unique per movie (junction PK + UNIQUE name), so ORDER BY name gives
+# the same arrays as ARRAY_AGG(DISTINCT name), and a movie with no links still
+# gets NULL rather than an empty array.
+
+# (output column, junction table, entity table, fk column)
+MOVIE_DIMENSIONS = [
+    ("genres", "MovieGenre", "Genre", "genre_id"),
+    ("writers", "MovieWriter", "Writer", "writer_id"),
+    ("actors", "MovieActor", "Actor", "actor_id"),
+    ("studios", "MovieStudio", "Studio", "studio_id"),
+    ("directors", "MovieDirector", "Director", "director_id"),
+]
+
+
+def movie_dimension_columns(movie_alias="m"):
+    """SELECT-list fragment with one aggregated array column per dimension."""
+    return ",\n".join(
+        f"""    (SELECT ARRAY_AGG(e.name ORDER BY e.name)
+       FROM {junction} j
+       JOIN {entity} e ON j.{fk_col} = e.{fk_col}
+      WHERE j.movie_id = {movie_alias}.movie_id) AS {column}"""
+        for column, junction, entity, fk_col in MOVIE_DIMENSIONS
+    )
+
+
+MOVIE_DIMENSION_COLUMNS_SQL = movie_dimension_columns("m")
+
+def movie_projection_sql(extra_columns=()):
+    """Base query: append WHERE / ORDER BY / LIMIT. No GROUP BY needed."""
+    extra = "".join(f",\n    {column}" for column in extra_columns)
+    return f"""
+SELECT 
+    m.*,
+{MOVIE_DIMENSION_COLUMNS_SQL}{extra}
+FROM Movie m
+"""
+
+
+MOVIE_PROJECTION_SQL = movie_projection_sql()
@@ -0,0 +1,192 @@
+from queries.movie_projection import MOVIE_DIMENSIONS, MOVIE_DIMENSION_COLUMNS_SQL, MOVIE_PROJECTION_SQL, movie_projection_sql
+from utils.pagination import decode_cursor, keyset_condition, order_by_clause
+
+GET_MOVIE_SQL = MOVIE_PROJECTION_SQL + """
+WHERE m.movie_id = %s
+"""
+
+# Same columns as mv_top_10_reviewed_movies, but ranked from the trigger-maintained
+# MovieReviewCount table: reads the top K entries of idx_movie_review_count_top.
+TOP_REVIEWED_MOVIES_SQL = f"""
+WITH top AS (
+    SELECT movie_id, review_count
+    FROM MovieReviewCount
+    ORDER BY review_count DESC, movie_id
+    LIMIT %s
+)
+SELECT
+    m.movie_id,
+    m.title,
+    m.info,
+    m.critics_consensus,
+    m.rating,
+    m.in_theaters_date,
+    m.on_streaming_date,
+    m.runtime_in_minutes,
+    m.tomatometer_status,
+    m.tomatometer_rating,
+    m.tomatometer_count,
+    m.audience_rating,
+    m.audience_count,
+    top.review_count AS reviewCount,
+{MOVIE_DIMENSION_COLUMNS_SQL}
+FROM top
+JOIN Movie m ON m.movie_id = top.movie_id
+ORDER BY top.review_count DESC, top.movie_id
+"""
+
+GET_MOVIES_BY_AUDIENCE_RATING_SQL = MOVIE_PROJECTION_SQL + """
+WHERE m.audience_rating IS NOT NULL
+ORDER BY m.audience_rating {direction}
+LIMIT 10
+"""
+
+# Movie fields PUT /movies/{movie_id} writes. The UPDATE only happens when one of
+# them actually changes, so a links-only edit leaves the Movie row (and its
+# tsvector trigger) alone.
+MOVIE_UPDATE_COLUMNS = [
+    "title", "info", "critics_consensus", "rating", "in_theaters_date", "on_streaming_date",
+    "runtime_in_minutes", "tomatometer_status", "tomatometer_rating", "tomatometer_count",
+    "audience_rating", "audience_count",
+]
+
+UPDATE_MOVIE_IF_CHANGED_SQL = f"""
+UPDATE Movie
+SET {", ".join(f"{col} = %({col})s" for col in MOVIE_UPDATE_COLUMNS)}
+WHERE movie_id = %(movie_id)s
+  AND ({", ".join(MOVIE_UPDATE_COLUMNS)})
+      IS DISTINCT FROM ({", ".join(f"%({col})s" for col in MOVIE_UPDATE_COLUMNS)})
+"""
+
+# every current link of one movie: (entity table, entity id, name)
+MOVIE_LINKS_SQL = "\nUNION ALL\n".join(
+    f"""SELECT '{entity}' AS entity, e.{fk_col} AS entity_id, e.name
+FROM {junction} j
+JOIN {entity} e ON e.{fk_col} = j.{fk_col}
+WHERE j.movie_id = %(movie_id)s"""
+    for _, junction, entity, fk_col in MOVIE_DIMENSIONS
+)
+
+# (filter param, junction table, junction alias, entity table, entity alias, fk column)
+SEARCH_RELATION_FILTERS = [
+    ("genres", "MovieGenre", "mg_inner", "Genre", "g_inner", "genre_id"),
+    ("writers", "MovieWriter", "mw_inner", "Writer", "w_inner", "writer_id"),
+    ("actors", "MovieActor", "ma_inner", "Actor", "a_inner", "actor_id"),
+    ("studios", "MovieStudio", "ms_inner", "Studio", "s_inner", "studio_id"),
+    ("directors", "MovieDirector", "md_inner", "Director", "d_inner", "director_id"),
+]
+
+
+def build_movie_search_query(title=None, genres=None, writers=None, actors=None, studios=None,
+                             directors=None, year=None, rating=None, limit=50, offset=0, q=None,
+                             fuzzy=False, cursor=None):
+    """
+    Builds the /movies/search query and its params. Placeholders are %s so the
+    result runs on both psycopg2 and psycopg (async) cursors.
+
+    q is a free-text query (websearch syntax: quotes, OR, -exclude) matched
+    against Movie.info_ts_vector through its GIN index; results are then
+    ordered by ts_rank_cd relevance instead of title.
+
+    fuzzy switches the title and name filters from ILIKE substring matching to
+    pg_trgm word similarity (`<%`), so typos like "tom hnaks" still match, and
+    orders results by how close the matches are. Both modes are served by the
+    gin_trgm_ops indexes from CREATE_INDICES_SQL.
+
+    Pages are keyset paginated on (relevance, similarity, title, movie_id) for
+    whichever of those apply: cursor is the token from a previous page, and the
+    query fetches limit + 1 rows. Returns (query, params, cursor_tag,
+    cursor_columns) for utils.pagination.paginate.
+    """
+    where = " WHERE 1=1"
+    where_params = []
+    similarity_terms = []
+    similarity_params = []
+
+    if q:
+        where += " AND m.info_ts_vector @@ websearch_to_tsquery('english', %s)"
+        where_params.append(q)
+
+    if title:
+        if fuzzy:
+            where += " AND %s <%% m.title"
+            where_params.append(title)
+            similarity_terms.append("word_similarity(%s, m.title)")
+            similarity_params.append(title)
+        else:
+            where += " AND m.title ILIKE %s"
+            where_params.append(f"%{title}%")
+
+    if year:
+        where += " AND EXTRACT(YEAR FROM m.in_theaters_date) = %s"
+        where_params.append(year)
+
+    if rating:
+        where += " AND m.rating ~* %s"
+        where_params.append(rating)
+
+    relation_values = {
+        "genres": genres,
+        "writers": writers,
+        "actors": actors,
+        "studios": studios,
+        "directors": directors,
+    }
+    for param_name, junction, j_alias, entity, e_alias, fk_col in SEARCH_RELATION_FILTERS:
+        for value in relation_values[param_name] or []:
+            name_match = f"%s <%% {e_alias}.name" if fuzzy else f"{e_alias}.name ILIKE %s"
+            where += f""" 
+            AND EXISTS (
+                SELECT 1 
+                FROM {junction} {j_alias} 
+                JOIN {entity} {e_alias} ON {j_alias}.{fk_col} = {e_alias}.{fk_col} 
+                WHERE {j_alias}.movie_id = m.movie_id 
+                AND {name_match}
+            )
+            """
+            where_params.append(value if fuzzy else f"%{value}%")
+            if fuzzy:
+                similarity_terms.append(f"""COALESCE((
+                    SELECT MAX(word_similarity(%s, {e_alias}.name))
+                    FROM {junction} {j_alias}
+                    JOIN {entity} {e_alias} ON {j_alias}.{fk_col} = {e_alias}.{fk_col}
+                    WHERE {j_alias}.movie_id = m.movie_id
+                ), 0)""")
+                similarity_params.append(value)
+
+    # sort keys, most significant first; ranks are cast to float8 so the values
+    # round-trip exactly through the cursor
+    sort_keys = []
+    extra_columns = []
+    extra_params = []
+    cursor_columns = []
+    if q:
+        rank_expr = "ts_rank_cd(m.info_ts_vector, websearch_to_tsquery('english', %s))::float8"
+        sort_keys.append((rank_expr, [q], "DESC"))
+        extra_columns.append(f"{rank_expr} AS relevance")
+        extra_params.append(q)
+        cursor_columns.append("relevance")
+    if similarity_terms:
+        similarity_expr = "(" + " + ".join(similarity_terms) + ")::float8"
+        sort_keys.append((similarity_expr, similarity_params, "DESC"))
+        extra_columns.append(f"{similarity_expr} AS similarity")
+        extra_params.extend(similarity_params)
+        cursor_columns.append("similarity")
+    sort_keys.append(("m.title", [], "ASC"))
+    sort_keys.append(("m.movie_id", [], "ASC"))
+    cursor_columns.extend(["title", "movie_id"])
+    cursor_tag = "movies:" + ",".join(cursor_columns)
+
+    if cursor:
+        condition, condition_params = keyset_condition(
+            sort_keys, decode_cursor(cursor, cursor_tag, len(sort_keys)))
+        where += " AND " + condition
+        where_params.extend(condition_params)
+
+    order_by, order_params = order_by_clause(sort_keys)
+    query = movie_projection_sql(extra_columns) + where + f"""
+    {order_by}
+    LIMIT %s OFFSET %s
+    """
+    params = extra_params + where_params + order_params + [limit + 1, offset]
+    return query, params, cursor_tag, cursor_columns
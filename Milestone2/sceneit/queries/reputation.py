@@ -91,4 +91,37 @@ SELECT
 FROM UserReputation ur
 JOIN Users u ON ur.user_id = u.user_id
 WHERE ur.user_id = %s;
-""" 
\ No newline at end of file
+""" 
+# Backfill: rebuilds every score from the point system above, which the insert-only
+# triggers can't do for deleted reviews/comments/likes. Reviews, Comments and Likes
+# are SHARE locked first (utils/counters.py) so the triggers can't add points midway.
+RECOMPUTE_REPUTATION_SQL = """
+WITH actual AS (
+    SELECT user_id, SUM(points) AS reputation_score
+    FROM (
+        SELECT user_id, 10 AS points FROM Reviews
+        UNION ALL
+        SELECT user_id, 5 FROM Comments
+        UNION ALL
+        SELECT r.user_id, 2 FROM Likes l JOIN Reviews r ON r.review_id = l.review_id
+    ) p
+    GROUP BY user_id
+),
+fixed AS (
+    INSERT INTO UserReputation (user_id, reputation_score)
+    SELECT user_id, reputation_score FROM actual
+    ORDER BY user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET reputation_score = EXCLUDED.reputation_score, last_updated = CURRENT_TIMESTAMP
+    WHERE UserReputation.reputation_score IS DISTINCT FROM EXCLUDED.reputation_score
+    RETURNING user_id
+),
+zeroed AS (
+    UPDATE UserReputation ur
+    SET reputation_score = 0, last_updated = CURRENT_TIMESTAMP
+    WHERE ur.reputation_score <> 0
+      AND NOT EXISTS (SELECT 1 FROM actual a WHERE a.user_id = ur.user_id)
+    RETURNING user_id
+)
+SELECT (SELECT COUNT(*) FROM fixed) + (SELECT COUNT(*) FROM zeroed)
+"""
@@ -0,0 +1,98 @@
+from queries.movie_projection import MOVIE_DIMENSIONS
+
+# Invalidation feed for the in-process response cache (utils/response_cache.py).
+# Statement-level triggers NOTIFY the cache tags a write touched on CACHE_CHANNEL,
+# as a comma-separated list; every API process LISTENs and drops (or, for
+# ranking entries, marks stale) the cached responses carrying those tags.
+# Notifications are only delivered once the writing transaction commits.
+#
+# Tags:
+#   movie:<id>          GET /movies/{movie_id}
+#   review:<id>         GET /reviews/{review_id} (review, its comments and their like counts)
+#   ranking:<name>      /movies_top, /movies_top_reviewed, /users/top_likes, /users/reputation
+#   <family>:*          every tag of the family (sent instead of long id lists)
+#
+# Counter triggers (queries/counters.py) update Reviews/Comments/MovieReviewCount
+# on like/comment/review writes, so those tables' own triggers cover the counts.
+
+CACHE_CHANNEL = "sceneit_cache"
+
+# NOTIFY payloads are capped at 8000 bytes
+MAX_NOTIFY_TAGS = 200
+
+# (table, function, tags expression over the transition table changed_rows, operations)
+_RANKINGS = "ARRAY['ranking:movies_top', 'ranking:top_reviewed']"
+CACHE_NOTIFY_TABLES = [
+    ("Movie", "notify_movie_cache",
+     f"ARRAY(SELECT DISTINCT 'movie:' || movie_id FROM changed_rows) || {_RANKINGS}",
+     ("INSERT", "UPDATE", "DELETE")),
+    ("Reviews", "notify_review_cache",
+     "ARRAY(SELECT DISTINCT 'review:' || review_id FROM changed_rows)",
+     ("UPDATE", "DELETE")),
+    ("Comments", "notify_comment_cache",
+     "ARRAY(SELECT DISTINCT 'review:' || review_id FROM changed_rows)",
+     ("INSERT", "UPDATE", "DELETE")),
+    ("Likes", "notify_like_cache",
+     "ARRAY['ranking:top_likes']",
+     ("INSERT", "DELETE")),
+    ("MovieReviewCount", "notify_movie_review_count_cache",
+     "ARRAY['ranking:top_reviewed']",
+     ("INSERT", "UPDATE", "DELETE")),
+    ("UserReputation", "notify_reputation_cache",
+     "ARRAY['ranking:reputation']",
+     ("INSERT", "UPDATE", "DELETE")),
+    # usernames/emails are shown on review pages and in the user rankings
+    ("Users", "notify_user_cache",
+     "ARRAY['review:*', 'ranking:top_likes', 'ranking:reputation']",
+     ("UPDATE", "DELETE")),
+] + [
+    (junction, f"notify_{junction.lower()}_cache",
+     f"ARRAY(SELECT DISTINCT 'movie:' || movie_id FROM changed_rows) || {_RANKINGS}",
+     ("INSERT", "DELETE"))
+    for _, junction, _, _ in MOVIE_DIMENSIONS
+]
+
+
+def _notify_function(function, tags):
+    return f"""
+CREATE OR REPLACE FUNCTION {function}()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM notify_cache_tags({tags});
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _notify_trigger(table, function, operation):
+    name = f"cache_{table.lower()}_on_{operation.lower()}"
+    transition = "OLD" if operation == "DELETE" else "NEW"
+    return f"""
+DROP TRIGGER IF EXISTS {name} ON {table};
+CREATE TRIGGER {name}
+    AFTER {operation} ON {table}
+    REFERENCING {transition} TABLE AS changed_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION {function}();
+"""
+
+
+# run with a short lock_timeout: creating triggers locks each table exclusively
+CREATE_CACHE_TRIGGERS_SQL = f"""
+CREATE OR REPLACE FUNCTION notify_cache_tags(tags TEXT[])
+RETURNS VOID AS $$
+BEGIN
+    IF cardinality(tags) = 0 THEN
+        RETURN;
+    END IF;
+    IF cardinality(tags) > {MAX_NOTIFY_TAGS} THEN
+        tags := ARRAY(SELECT DISTINCT split_part(tag, ':', 1) || ':*' FROM unnest(tags) AS tag);
+    END IF;
+    PERFORM pg_notify('{CACHE_CHANNEL}', array_to_string(tags, ','));
+END;
+$$ LANGUAGE plpgsql;
+""" + "".join(
+    _notify_function(function, tags) + "".join(_notify_trigger(table, function, op) for op in operations)
+    for table, function, tags, operations in CACHE_NOTIFY_TABLES
+)
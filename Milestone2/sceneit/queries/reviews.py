@@ -0,0 +1,85 @@
+GET_REVIEW_WITH_LIKES_SQL = """
+SELECT 
+    r.review_id, r.movie_id, r.user_id, r.title, r.content, r.rating, 
+    r.created_at, r.updated_at,
+    u.username, u.email,
+    r.like_count
+FROM Reviews r
+JOIN Users u ON r.user_id = u.user_id
+WHERE r.review_id = %s
+"""
+
+GET_REVIEW_COMMENTS_SQL = """
+SELECT 
+    c.comment_id, c.review_id, c.user_id, c.content, c.created_at, c.updated_at,
+    u.username, u.email,
+    c.like_count
+FROM Comments c
+JOIN Users u ON c.user_id = u.user_id
+WHERE c.review_id = %s
+ORDER BY c.created_at ASC
+"""
+
+REVIEW_IDS_BY_MOVIE_SQL = """
+SELECT review_id, created_at FROM Reviews
+WHERE movie_id = %s
+"""
+REVIEW_IDS_BY_MOVIE_SORT_KEYS = [("Reviews.created_at", [], "DESC"), ("Reviews.review_id", [], "DESC")]
+REVIEW_IDS_BY_MOVIE_CURSOR_COLUMNS = ["created_at", "review_id"]
+
+# Base query to fetch reviews with like and comment count
+ALL_REVIEWS_SQL = """
+SELECT 
+    r.review_id, r.movie_id, r.user_id, r.title, r.content, r.rating, 
+    r.created_at, r.updated_at,
+    u.username, u.email,
+    r.like_count, r.comment_count
+FROM Reviews r
+JOIN Users u ON r.user_id = u.user_id
+WHERE 1=1
+"""
+
+# ReviewSortOptions value -> (keyset sort keys, cursor columns)
+ALL_REVIEWS_SORTS = {
+    "created_at": (
+        [("r.created_at", [], "DESC"), ("r.review_id", [], "DESC")],
+        ["created_at", "review_id"],
+    ),
+    "most_comments": (
+        [("r.comment_count", [], "DESC"), ("r.created_at", [], "DESC"), ("r.review_id", [], "DESC")],
+        ["comment_count", "created_at", "review_id"],
+    ),
+}
+
+# single-statement inserts; see queries/likes.py for the checks CTE pattern
+CREATE_REVIEW_SQL = """
+WITH checks AS (
+    SELECT EXISTS (SELECT 1 FROM Movie WHERE movie_id = %(movie_id)s::int) AS movie_exists,
+           EXISTS (SELECT 1 FROM Users WHERE user_id = %(user_id)s::int) AS user_exists
+),
+inserted AS (
+    INSERT INTO Reviews (movie_id, user_id, title, content, rating, created_at, updated_at)
+    SELECT %(movie_id)s::int, %(user_id)s::int, %(title)s, %(content)s, %(rating)s, NOW(), NOW()
+    FROM checks
+    WHERE movie_exists AND user_exists
+    RETURNING review_id, movie_id, user_id, title, content, rating, created_at, updated_at
+)
+SELECT checks.movie_exists, checks.user_exists, inserted.*
+FROM checks LEFT JOIN inserted ON true
+"""
+
+CREATE_COMMENT_SQL = """
+WITH checks AS (
+    SELECT EXISTS (SELECT 1 FROM Reviews WHERE review_id = %(review_id)s::int) AS review_exists,
+           EXISTS (SELECT 1 FROM Users WHERE user_id = %(user_id)s::int) AS user_exists
+),
+inserted AS (
+    INSERT INTO Comments (review_id, user_id, content, created_at, updated_at)
+    SELECT %(review_id)s::int, %(user_id)s::int, %(content)s, NOW(), NOW()
+    FROM checks
+    WHERE review_exists AND user_exists
+    RETURNING comment_id, review_id, user_id, content, created_at, updated_at
+)
+SELECT checks.review_exists, checks.user_exists, inserted.*
+FROM checks LEFT JOIN inserted ON true
+"""
@@ -0,0 +1,82 @@
+USER_EXISTS_SQL = "SELECT 1 FROM Users WHERE user_id = %s"
+
+USER_LIKED_MOVIES_SQL = """
+SELECT
+    m.movie_id,
+    m.title,
+    lm.liked_at
+FROM Liked_Movie lm
+JOIN Movie m ON lm.movie_id = m.movie_id
+WHERE lm.user_id = %s
+"""
+# Show most recently liked first; keyset sort keys for utils.pagination
+USER_LIKED_MOVIES_SORT_KEYS = [("lm.liked_at", [], "DESC"), ("lm.movie_id", [], "DESC")]
+USER_LIKED_MOVIES_CURSOR_COLUMNS = ["liked_at", "movie_id"]
+
+SIMILAR_USERS_BY_LIKES_SQL = """
+WITH UserLikedCounts AS (
+    SELECT
+        user_id,
+        COUNT(movie_id) AS liked_count
+    FROM Liked_Movie
+    GROUP BY user_id
+)
+SELECT
+    other_user.user_id,
+    other_user.username,
+    COUNT(lm1.movie_id) AS mutual_count
+FROM Liked_Movie lm1
+JOIN Liked_Movie lm2 ON lm1.movie_id = lm2.movie_id
+                     AND lm1.user_id <> lm2.user_id
+JOIN Users other_user ON lm2.user_id = other_user.user_id
+JOIN UserLikedCounts target_count ON lm1.user_id = target_count.user_id
+JOIN UserLikedCounts other_count ON lm2.user_id = other_count.user_id
+WHERE
+    lm1.user_id = %s
+    AND other_count.liked_count <= (2 * target_count.liked_count)
+    AND target_count.liked_count <= (2 * other_count.liked_count)
+GROUP BY
+    other_user.user_id,
+    other_user.username
+ORDER BY
+    mutual_count DESC,
+    other_user.user_id ASC
+LIMIT 3;
+"""
+
+MOST_MUTUAL_WATCHED_SQL = """
+WITH user_watched_count AS (
+    SELECT user_id, COUNT(movie_id) AS watched_count
+    FROM watched
+    GROUP BY user_id
+),
+mutual_watched AS (
+    SELECT 
+        u2.user_id, 
+        COUNT(*) AS mutual_count
+    FROM watched w1
+    JOIN watched w2 ON w1.movie_id = w2.movie_id 
+                    AND w1.user_id <> w2.user_id
+    JOIN user_watched_count u1 ON w1.user_id = u1.user_id
+    JOIN user_watched_count u2 ON w2.user_id = u2.user_id
+    WHERE w1.user_id = %s and u2.watched_count <= 2 * u1.watched_count
+    GROUP BY u2.user_id
+)
+SELECT user_id, mutual_count
+FROM mutual_watched
+ORDER BY mutual_count DESC
+LIMIT 1
+"""
+
+USER_LIKED_ITEMS_SQL = """
+SELECT like_id, review_id, comment_id FROM Likes
+WHERE user_id = %s
+"""
+USER_LIKED_ITEMS_SORT_KEYS = [("like_id", [], "DESC")]
+USER_LIKED_ITEMS_CURSOR_COLUMNS = ["like_id"]
+
+USER_REPUTATION_INFO_SQL = """
+SELECT reputation_score, last_updated
+FROM UserReputation
+WHERE user_id = %s
+"""
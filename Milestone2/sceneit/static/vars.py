@@ -1,4 +1,10 @@
 IS_PRODUCTION=False
 MOVIES_CSV_PATH="static/movies.csv"
 USERS_CSV_PATH="static/users.csv"
-REVIEWS_CSV_PATH="static/reviews.csv"
\ No newline at end of file
+REVIEWS_CSV_PATH="static/reviews.csv"
+# serve the hot read/like endpoints from the async (psycopg) handlers
+USE_ASYNC_DB=True
+# acknowledge POST /watch and POST /likes/ once buffered and write them in batches (utils/write_behind.py)
+USE_WRITE_BEHIND=False
+# cache hot read responses in process, invalidated by NOTIFY triggers (utils/response_cache.py)
+USE_RESPONSE_CACHE=True
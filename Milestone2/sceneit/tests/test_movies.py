@@ -0,0 +1,68 @@
+"""
+Regression tests for the movie write endpoints, which answer with the cached
+get_movie handler called positionally (get_movie(movie_id)).
+
+The endpoint test needs the database from connection_params and is skipped when
+it isn't reachable. Run from the sceneit directory:
+    python -m pytest tests
+"""
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from utils.db import get_db_connection
+from utils.response_cache import cached
+
+
+def test_cached_handler_accepts_positional_and_keyword_calls():
+    calls = []
+
+    @cached("test_movie", lambda movie_id: [f"movie:{movie_id}"], ttl=60)
+    def handler(movie_id: int, verbose: bool = False):
+        calls.append(movie_id)
+        return {"movie_id": movie_id, "verbose": verbose}
+
+    assert handler(-1) == {"movie_id": -1, "verbose": False}
+    # same parameters, so the keyword call is served from the same entry
+    assert handler(movie_id=-1) == {"movie_id": -1, "verbose": False}
+    assert handler(-1, True) == {"movie_id": -1, "verbose": True}
+    with pytest.raises(TypeError):
+        handler(-1, movie_id=-1)
+
+
+@pytest.fixture(scope="module")
+def client():
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM Movie LIMIT 1")
+    except psycopg2.Error as e:
+        pytest.skip(f"database not reachable: {e}")
+
+    from main import app
+    return TestClient(app)
+
+
+def test_create_then_update_movie(client):
+    response = client.post("/movies/", json={"title": "Regression Test Movie", "genres": ["Drama"]})
+    assert response.status_code == 201, response.text
+    movie = response.json()
+    movie_id = movie["movie_id"]
+    try:
+        assert movie["title"] == "Regression Test Movie"
+
+        response = client.put(f"/movies/{movie_id}",
+                              json={"title": "Regression Test Movie (updated)", "genres": ["Drama"]})
+        assert response.status_code == 200, response.text
+        assert response.json()["title"] == "Regression Test Movie (updated)"
+
+        response = client.get(f"/movies/{movie_id}")
+        assert response.status_code == 200, response.text
+        assert response.json()["title"] == "Regression Test Movie (updated)"
+    finally:
+        client.delete(f"/movies/{movie_id}")
+    # the cached entry goes with it
+    assert client.get(f"/movies/{movie_id}").status_code == 404
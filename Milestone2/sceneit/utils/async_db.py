@@ -0,0 +1,77 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from utils.db import connection_params, pool_params
+
+# Async counterpart of utils.db, used by the `async def` handlers.
+# It shares connection settings and lifetimes with the sync pool but is sized on
+# its own: a process can hold up to DB_POOL_MAX_SIZE + ASYNC_DB_POOL_MAX_SIZE
+# connections, which (times the number of uvicorn workers) has to stay under the
+# server's max_connections.
+async_pool_params = {
+    "min_size": int(os.environ.get("ASYNC_DB_POOL_MIN_SIZE", 1)),
+    "max_size": int(os.environ.get("ASYNC_DB_POOL_MAX_SIZE", 10)),
+}
+
+_async_pool = None
+_open_lock = asyncio.Lock()  # so concurrent first requests don't open the pool twice
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = AsyncConnectionPool(
+            make_conninfo(**connection_params),
+            min_size=async_pool_params["min_size"],
+            max_size=async_pool_params["max_size"],
+            max_lifetime=pool_params["max_lifetime"],
+            timeout=pool_params["wait_timeout"],
+            check=AsyncConnectionPool.check_connection,
+            kwargs={"row_factory": dict_row},
+            open=False,
+        )
+    return _async_pool
+
+
+async def open_async_pool():
+    pool = get_async_pool()
+    if pool.closed:
+        async with _open_lock:
+            if pool.closed:
+                await pool.open()
+    return pool
+
+
+async def close_async_pool():
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+
+
+def get_async_pool_stats():
+    if _async_pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_async_pool.get_stats()}
+
+
+@asynccontextmanager
+async def get_async_db_connection():
+    """
+    Borrow an async connection. Commits on success, rolls back on error and
+    always returns the connection to the pool. Rows come back as dicts.
+    """
+    # normally opened by the startup hook; this covers a database that was down then
+    pool = await open_async_pool()
+    try:
+        async with pool.connection() as conn:
+            yield conn
+    except psycopg.Error as e:
+        print(f"Async database error: {e}")
+        raise
@@ -1,5 +1,8 @@
 import psycopg2.extras 
-from typing import List
+from typing import Dict, List
+
+from queries.movies import MOVIE_LINKS_SQL
+from utils.dimension_cache import DIMENSION_TABLES, link_dimension
 
 
 def batch_handle_related(
@@ -12,73 +15,43 @@ def batch_handle_related(
     linking_table: str, 
     linking_fk_col: str):
     """
-    This function only makes 4 DB queries instead of N queries. It handles batch insertion of related entities and their links to a movie.
+    Links movie_id to the named entities, creating the ones that don't exist yet.
 
-    What it does: 
-    1. Finds existing entities.
-    2. Batch inserts missing entities.
-    3. Batch inserts links between movie and entities.
+    Name -> id lookups go through the shared dimension cache (utils.dimension_cache),
+    so names seen before cost no query; only unknown names are fetched or inserted,
+    in one statement, and the links are written in one more.
+    entity_pk_col/entity_name_col/linking_table/linking_fk_col must match the
+    dimension table's layout (kept for existing callers).
     """
     if not items:
         return
 
-    unique_items = list(set(items))
-    if not unique_items:
-        return
-        
-    print(f"Batch handling {len(unique_items)} unique {entity_table} items...") 
+    print(f"Batch handling {len(set(items))} unique {entity_table} items...") 
+    link_dimension(cur, movie_id, entity_table, items)
+    print(f"Finished batch handling {entity_table}.") 
 
-    # 1. Get existing IDs for the unique items
-    query_existing = f"""
-        SELECT {entity_pk_col}, {entity_name_col} 
-        FROM {entity_table} 
-        WHERE {entity_name_col} = ANY(%s) 
+
+def sync_movie_links(cur: psycopg2.extensions.cursor, movie_id: int, desired: Dict[str, List[str]]):
+    """
+    Makes movie_id's links match `desired` ({entity table: names}) by applying
+    only the difference: one query reads the current links of all five tables,
+    then each table that changed gets at most one batched insert of the added
+    names and one delete of the removed ones. Unchanged tables cost nothing.
     """
-    cur.execute(query_existing, (unique_items,))
-    name_to_id = {row[entity_name_col]: row[entity_pk_col] for row in cur.fetchall()}
-    existing_names = set(name_to_id.keys())
-    print(f"Found {len(existing_names)} existing {entity_table} items.") 
+    with cur.connection.cursor(cursor_factory=psycopg2.extensions.cursor) as link_cur:
+        link_cur.execute(MOVIE_LINKS_SQL, {"movie_id": movie_id})
+        current = {table: {} for table in DIMENSION_TABLES}
+        for table, entity_id, name in link_cur.fetchall():
+            current[table][name] = entity_id
 
-    # 2. Identify and batch insert missing items
-    items_to_insert = [(name,) for name in unique_items if name not in existing_names]
-    
-    if items_to_insert:
-        print(f"Inserting {len(items_to_insert)} new {entity_table} items...") 
-        insert_query = f"""
-            INSERT INTO {entity_table} ({entity_name_col}) VALUES %s
-            ON CONFLICT ({entity_name_col}) DO NOTHING 
-        """
-        psycopg2.extras.execute_values(
-            cur, 
-            insert_query, 
-            items_to_insert, 
-            template='(%s)', 
-            page_size=100
-        )
-        
-        # 2a. Re-query to get IDs of all items (existing + newly inserted)
-        cur.execute(query_existing, (unique_items,))
-        name_to_id = {row[entity_name_col]: row[entity_pk_col] for row in cur.fetchall()}
-    
-    # 3. Batch insert into the linking table
-    links_to_insert = []
-    for name in unique_items:
-        if name in name_to_id:
-             links_to_insert.append((movie_id, name_to_id[name]))
-        else:
-             print(f"Warning: Could not find ID for {entity_table} item '{name}' after attempting insert.")
+        for table, names in desired.items():
+            wanted = set(names)
+            added = [name for name in dict.fromkeys(names) if name not in current[table]]
+            removed_ids = [entity_id for name, entity_id in current[table].items() if name not in wanted]
 
-    if links_to_insert:
-        print(f"Inserting {len(links_to_insert)} links into {linking_table}...") 
-        link_insert_query = f"""
-            INSERT INTO {linking_table} (movie_id, {linking_fk_col}) VALUES %s 
-            ON CONFLICT (movie_id, {linking_fk_col}) DO NOTHING 
-        """
-        psycopg2.extras.execute_values(
-            cur, 
-            link_insert_query, 
-            links_to_insert, 
-            template='(%s, %s)', 
-            page_size=100
-        )
-    print(f"Finished batch handling {entity_table}.") 
\ No newline at end of file
+            if removed_ids:
+                pk_col, junction = DIMENSION_TABLES[table]
+                link_cur.execute(f"DELETE FROM {junction} WHERE movie_id = %s AND {pk_col} = ANY(%s)",
+                                 (movie_id, removed_ids))
+            if added:
+                link_dimension(cur, movie_id, table, added)
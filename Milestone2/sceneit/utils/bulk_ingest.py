@@ -0,0 +1,248 @@
+"""
+Set-based CSV ingest.
+
+Each CSV is streamed into a temp staging table with COPY FROM STDIN, then
+loaded with a handful of INSERT ... SELECT statements: dimension names and
+junction rows are resolved in SQL rather than with two statements per genre,
+actor, writer, studio and director per movie. Row selection matches
+utils.insert_data: the first sample_size rows (all rows when IS_PRODUCTION),
+skipping rows with an empty field.
+
+Run standalone from the sceneit directory:
+    python -m utils.bulk_ingest [--sample-size 50]
+"""
+import argparse
+import csv
+import io
+import time
+
+from psycopg2 import sql
+
+from queries.movies import MOVIE_UPDATE_COLUMNS
+from utils.db import get_db_connection
+from utils.insert_data import SAMPLE_SIZE, ingest_limit, hasMoviesBeenPopulated, hasUsersBeenPopulated, hasReviewsBeenPopulated
+from static.vars import MOVIES_CSV_PATH, USERS_CSV_PATH, REVIEWS_CSV_PATH
+
+# (csv column, entity table, junction table, fk column)
+MOVIE_DIMENSION_COLUMNS = [
+    ("genre", "Genre", "MovieGenre", "genre_id"),
+    ("directors", "Director", "MovieDirector", "director_id"),
+    ("writers", "Writer", "MovieWriter", "writer_id"),
+    ("cast", "Actor", "MovieActor", "actor_id"),
+    ("studio_name", "Studio", "MovieStudio", "studio_id"),
+]
+
+
+def create_stage_table(cur, stage_table: str, header):
+    """
+    Temp table with one TEXT column per CSV field, plus row_num (file order)
+    and assigned_id: the primary key a staged row will be inserted with.
+    Rows without an assigned_id are not loaded.
+    """
+    cur.execute(sql.SQL("CREATE TEMP TABLE {} (row_num BIGSERIAL, assigned_id INT, {}) ON COMMIT DROP").format(
+        sql.Identifier(stage_table),
+        sql.SQL(", ").join(sql.SQL("{} TEXT").format(sql.Identifier(col)) for col in header),
+    ))
+
+
+def _copy_into_stage(cur, stage_table: str, columns, csv_file, has_header: bool):
+    copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, HEADER {})").format(
+        sql.Identifier(stage_table),
+        sql.SQL(", ").join(sql.Identifier(col) for col in columns),
+        sql.SQL("true" if has_header else "false"),
+    )
+    cur.copy_expert(copy_sql.as_string(cur), csv_file)
+
+
+def stage_csv(cur, csv_filepath: str, stage_table: str):
+    """COPY a whole CSV into a new stage table. Empty fields arrive as NULL. Returns the header."""
+    with open(csv_filepath, newline='', encoding='utf-8') as csv_file:
+        header = next(csv.reader(csv_file))
+        create_stage_table(cur, stage_table, header)
+        csv_file.seek(0)
+        _copy_into_stage(cur, stage_table, header, csv_file, has_header=True)
+    return header
+
+
+def stage_rows(cur, stage_table: str, header, rows, first_id: int):
+    """COPY already parsed row dicts into a new stage table, assigning ids first_id, first_id + 1, ..."""
+    create_stage_table(cur, stage_table, header)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for i, row in enumerate(rows):
+        writer.writerow([first_id + i] + [row[col] for col in header])
+    buffer.seek(0)
+    _copy_into_stage(cur, stage_table, ["assigned_id"] + list(header), buffer, has_header=False)
+
+
+def selected_rows_condition(header, row_limit, alias="s"):
+    """
+    SQL condition for the rows the row-by-row loaders would insert: within the
+    first row_limit rows (None = all) and passing the *_attrs_soft_check rule
+    that every field is non-empty.
+    """
+    parts = [
+        sql.SQL("{}.{} IS NOT NULL AND {}.{} <> ''").format(
+            sql.Identifier(alias), sql.Identifier(col), sql.Identifier(alias), sql.Identifier(col))
+        for col in header
+    ]
+    if row_limit is not None:
+        parts.append(sql.SQL("{}.row_num <= {}").format(sql.Identifier(alias), sql.Literal(row_limit)))
+    return sql.SQL(" AND ").join(parts)
+
+
+def assign_ids(cur, stage_table: str, table: str, id_column: str, condition):
+    """Draws ids for the selected staged rows from table's serial sequence, in file order."""
+    cur.execute(sql.SQL("""
+        UPDATE {stage} s
+        SET assigned_id = ordered.id
+        FROM (
+            SELECT row_num, nextval(pg_get_serial_sequence({table}, {id_column})) AS id
+            FROM (SELECT s.row_num FROM {stage} s WHERE {condition} ORDER BY s.row_num) selected
+        ) ordered
+        WHERE s.row_num = ordered.row_num
+    """).format(
+        stage=sql.Identifier(stage_table),
+        table=sql.Literal(table),
+        id_column=sql.Literal(id_column),
+        condition=condition,
+    ))
+
+
+def insert_staged_movies(cur, stage_table: str, update_existing: bool = False):
+    """
+    Inserts the staged movies and their cast/crew links. With update_existing,
+    rows whose assigned_id already exists overwrite that movie instead (links
+    are only added; see utils.delta_sync for removals).
+    """
+    stage = sql.Identifier(stage_table)
+    on_conflict = sql.SQL("")
+    if update_existing:
+        on_conflict = sql.SQL("ON CONFLICT (movie_id) DO UPDATE SET {}").format(sql.SQL(", ").join(
+            sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(col)) for col in MOVIE_UPDATE_COLUMNS))
+    cur.execute(sql.SQL("""
+        INSERT INTO Movie (movie_id, title, info, critics_consensus, rating, in_theaters_date,
+                           on_streaming_date, runtime_in_minutes, tomatometer_status,
+                           tomatometer_rating, tomatometer_count, audience_rating, audience_count)
+        SELECT assigned_id, movie_title, movie_info, critics_consensus, rating, in_theaters_date::date,
+               on_streaming_date::date, runtime_in_minutes::numeric::int, tomatometer_status,
+               tomatometer_rating::numeric, tomatometer_count::numeric::int,
+               audience_rating::numeric, audience_count::numeric::int
+        FROM {}
+        WHERE assigned_id IS NOT NULL
+        ORDER BY row_num
+        {}
+    """).format(stage, on_conflict))
+    movies_loaded = cur.rowcount
+
+    for csv_col, entity_table, junction_table, fk_col in MOVIE_DIMENSION_COLUMNS:
+        names = sql.SQL("""
+            FROM {} s
+            CROSS JOIN LATERAL unnest(string_to_array(s.{}, ', ')) AS n(name)
+        """).format(stage, sql.Identifier(csv_col))
+        # names go in sorted so concurrent loaders take the unique-index locks in the same order
+        cur.execute(sql.SQL("""
+            INSERT INTO {entity} (name)
+            SELECT DISTINCT n.name {names}
+            WHERE s.assigned_id IS NOT NULL
+            ORDER BY n.name
+            ON CONFLICT (name) DO NOTHING
+        """).format(entity=sql.Identifier(entity_table.lower()), names=names))
+        cur.execute(sql.SQL("""
+            INSERT INTO {junction} (movie_id, {fk})
+            SELECT DISTINCT s.assigned_id, e.{fk} {names}
+            JOIN {entity} e ON e.name = n.name
+            WHERE s.assigned_id IS NOT NULL
+            ON CONFLICT DO NOTHING
+        """).format(
+            junction=sql.Identifier(junction_table.lower()),
+            entity=sql.Identifier(entity_table.lower()),
+            fk=sql.Identifier(fk_col),
+            names=names,
+        ))
+
+    return movies_loaded
+
+
+def insert_staged_users(cur, stage_table: str):
+    # CSV timestamps are UTC without an offset; parsed once here
+    cur.execute(sql.SQL("""
+        INSERT INTO Users (user_id, username, email, password_hash, created_at, updated_at)
+        SELECT s.assigned_id, s.username, s.email, s.password_hash,
+               s.created_at::timestamp AT TIME ZONE 'UTC', s.updated_at::timestamp AT TIME ZONE 'UTC'
+        FROM {} s
+        WHERE s.assigned_id IS NOT NULL
+        ORDER BY s.row_num
+        ON CONFLICT DO NOTHING
+    """).format(sql.Identifier(stage_table)))
+    return cur.rowcount
+
+
+def insert_staged_reviews(cur, stage_table: str):
+    # reviews pointing at movies/users that weren't loaded are skipped instead of
+    # failing the whole batch on the foreign key. Ordering by user_id makes the
+    # reputation trigger lock UserReputation rows in the same order in every loader.
+    cur.execute(sql.SQL("""
+        INSERT INTO Reviews (review_id, movie_id, user_id, title, content, rating, created_at, updated_at)
+        SELECT s.assigned_id, s.movie_id::int, s.user_id::int, s.title, s.content, s.rating::numeric,
+               s.created_at::timestamp AT TIME ZONE 'UTC', s.updated_at::timestamp AT TIME ZONE 'UTC'
+        FROM {} s
+        WHERE s.assigned_id IS NOT NULL
+          AND EXISTS (SELECT 1 FROM Movie m WHERE m.movie_id = s.movie_id::int)
+          AND EXISTS (SELECT 1 FROM Users u WHERE u.user_id = s.user_id::int)
+        ORDER BY s.user_id::int, s.row_num
+    """).format(sql.Identifier(stage_table)))
+    return cur.rowcount
+
+
+def _report(table, rows, started):
+    seconds = time.perf_counter() - started
+    rows_per_second = rows / seconds if seconds > 0 else float(rows)
+    print(f"Bulk loaded {rows} {table} rows in {seconds:.2f}s ({rows_per_second:.0f} rows/s)")
+    return {"table": table, "rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows_per_second)}
+
+
+def _bulk_insert(csv_filepath, sample_size, table, id_column, stage_table, has_been_populated, insert_staged):
+    started = time.perf_counter()
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            if has_been_populated(cur):
+                print(f"{table} table already populated. Skipping insertion.")
+                return _report(table, 0, started)
+
+            header = stage_csv(cur, csv_filepath, stage_table)
+            assign_ids(cur, stage_table, table.lower(), id_column,
+                       selected_rows_condition(header, ingest_limit(sample_size)))
+            rows_loaded = insert_staged(cur, stage_table)
+
+    return _report(table, rows_loaded, started)
+
+
+def bulk_insert_movies(csv_filepath: str, sample_size: int = SAMPLE_SIZE):
+    return _bulk_insert(csv_filepath, sample_size, "Movie", "movie_id", "stage_movies",
+                        hasMoviesBeenPopulated, insert_staged_movies)
+
+
+def bulk_insert_users(csv_filepath: str, sample_size: int = SAMPLE_SIZE):
+    return _bulk_insert(csv_filepath, sample_size, "Users", "user_id", "stage_users",
+                        hasUsersBeenPopulated, insert_staged_users)
+
+
+def bulk_insert_reviews(csv_filepath: str, sample_size: int = SAMPLE_SIZE):
+    return _bulk_insert(csv_filepath, sample_size, "Reviews", "review_id", "stage_reviews",
+                        hasReviewsBeenPopulated, insert_staged_reviews)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE,
+                        help="rows per file to load when IS_PRODUCTION is False")
+    args = parser.parse_args()
+
+    bulk_insert_movies(MOVIES_CSV_PATH, args.sample_size)
+    bulk_insert_users(USERS_CSV_PATH, args.sample_size)
+    bulk_insert_reviews(REVIEWS_CSV_PATH, args.sample_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import psycopg2
+import psycopg2.extras
+
+from queries.bulk import (
+    ALLOCATE_IDS_SQL,
+    BULK_INSERT_MOVIES_SQL,
+    BULK_INSERT_REVIEWS_SQL,
+    BULK_REVIEW_TEMPLATE,
+    BULK_INSERT_COMMENTS_SQL,
+    BULK_COMMENT_TEMPLATE,
+    BULK_INSERT_LIKES_SQL,
+    BULK_LIKE_TEMPLATE,
+    EXISTING_LIKES_SQL,
+    BULK_INSERT_WATCHED_SQL,
+    BULK_WATCHED_TEMPLATE,
+)
+from queries.movie_projection import MOVIE_DIMENSIONS
+from utils.dimension_cache import link_dimension_many
+
+# Set-wise versions of the single-item write endpoints. Each takes a
+# RealDictCursor and a list of request models and returns
+# {"created", "failed", "results"}, where results has one entry per input item
+# (same order) with the status code and error detail the single-item endpoint
+# would have returned. Everything runs in the caller's transaction:
+#   1. validate fields per item, then check referenced rows with one ANY() query per table
+#   2. insert all valid items with one multi-row statement
+#   3. only if that statement hits a constraint, retry its rows one at a time
+#      under savepoints so just the offending items fail
+
+BULK_MAX_ITEMS = 5000
+
+
+def item_result(index, status_code, detail=None, item=None):
+    result = {"index": index, "status_code": status_code}
+    if detail is not None:
+        result["detail"] = detail
+    if item is not None:
+        result["item"] = item
+    return result
+
+
+def bulk_summary(results):
+    results.sort(key=lambda result: result["index"])
+    return {
+        "created": sum(1 for result in results if result["status_code"] == 201),
+        "failed": sum(1 for result in results if result["status_code"] >= 400),
+        "results": results,
+    }
+
+
+def existing_ids(cur, table, id_column, ids):
+    ids = list(set(ids))
+    if not ids:
+        return set()
+    cur.execute(f"SELECT {id_column} FROM {table} WHERE {id_column} = ANY(%s)", (ids,))
+    return {row[id_column] for row in cur.fetchall()}
+
+
+def allocate_ids(cur, table, id_column, count):
+    """Reserves `count` ids from a serial so inserted rows can be matched back to their items."""
+    if count == 0:
+        return []
+    cur.execute(ALLOCATE_IDS_SQL, (table, id_column, count))
+    return [row["id"] for row in cur.fetchall()]
+
+
+def insert_rows(cur, query, rows, template=None):
+    """
+    Multi-row INSERT ... RETURNING of all rows in one statement. If a row breaks
+    a constraint, falls back to one row per savepoint. Returns (returned rows,
+    {position in rows: error message}).
+    """
+    if not rows:
+        return [], {}
+    cur.execute("SAVEPOINT bulk_insert")
+    try:
+        returned = psycopg2.extras.execute_values(cur, query, rows, template=template,
+                                                  page_size=len(rows), fetch=True)
+        cur.execute("RELEASE SAVEPOINT bulk_insert")
+        return returned, {}
+    except (psycopg2.IntegrityError, psycopg2.DataError):
+        cur.execute("ROLLBACK TO SAVEPOINT bulk_insert")
+
+    returned, errors = [], {}
+    for position, row in enumerate(rows):
+        cur.execute("SAVEPOINT bulk_insert_row")
+        try:
+            returned.extend(psycopg2.extras.execute_values(cur, query, [row], template=template, fetch=True))
+            cur.execute("RELEASE SAVEPOINT bulk_insert_row")
+        except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+            cur.execute("ROLLBACK TO SAVEPOINT bulk_insert_row")
+            errors[position] = e.diag.message_primary or str(e)
+    cur.execute("RELEASE SAVEPOINT bulk_insert")
+    return returned, errors
+
+
+def _collect(results, valid, keys, returned, errors, key_of, missing_status, missing_detail):
+    """Turns the outcome of insert_rows into per-item results; keys[i] identifies valid[i]'s row."""
+    by_key = {key_of(row): row for row in returned}
+    for position, ((index, _), key) in enumerate(zip(valid, keys)):
+        if key in by_key:
+            results.append(item_result(index, 201, item=by_key[key]))
+        elif position in errors:
+            results.append(item_result(index, 400, errors[position]))
+        else:
+            results.append(item_result(index, missing_status, missing_detail))
+
+
+def bulk_create_movies(cur, movies):
+    results = []
+    valid = list(enumerate(movies))
+    movie_ids = allocate_ids(cur, "movie", "movie_id", len(valid))
+    rows = [
+        (movie_id, movie.title, movie.info, movie.critics_consensus, movie.rating,
+         movie.in_theaters_date, movie.on_streaming_date, movie.runtime_in_minutes,
+         movie.tomatometer_status, movie.tomatometer_rating, movie.tomatometer_count,
+         movie.audience_rating, movie.audience_count)
+        for movie_id, (_, movie) in zip(movie_ids, valid)
+    ]
+    returned, errors = insert_rows(cur, BULK_INSERT_MOVIES_SQL, rows)
+    _collect(results, valid, movie_ids, returned, errors, lambda row: row["movie_id"], 400, "Movie not created")
+
+    created = {row["movie_id"] for row in returned}
+    for column, _, entity, _ in MOVIE_DIMENSIONS:
+        link_dimension_many(cur, entity, {
+            movie_id: getattr(movie, column)
+            for movie_id, (_, movie) in zip(movie_ids, valid)
+            if movie_id in created and getattr(movie, column)
+        })
+    return bulk_summary(results)
+
+
+def bulk_create_reviews(cur, reviews):
+    results = []
+    candidates = []
+    for index, review in enumerate(reviews):
+        if not (0 <= review.rating <= 100):
+            results.append(item_result(index, 400, "Rating must be between 0 and 100"))
+        else:
+            candidates.append((index, review))
+
+    movies = existing_ids(cur, "Movie", "movie_id", [review.movie_id for _, review in candidates])
+    users = existing_ids(cur, "Users", "user_id", [review.user_id for _, review in candidates])
+    valid = []
+    for index, review in candidates:
+        if review.movie_id not in movies:
+            results.append(item_result(index, 404, "Movie not found"))
+        elif review.user_id not in users:
+            results.append(item_result(index, 404, "User not found"))
+        else:
+            valid.append((index, review))
+
+    review_ids = allocate_ids(cur, "reviews", "review_id", len(valid))
+    rows = [
+        (review_id, review.movie_id, review.user_id, review.title, review.content, review.rating)
+        for review_id, (_, review) in zip(review_ids, valid)
+    ]
+    returned, errors = insert_rows(cur, BULK_INSERT_REVIEWS_SQL, rows, BULK_REVIEW_TEMPLATE)
+    _collect(results, valid, review_ids, returned, errors, lambda row: row["review_id"],
+             404, "Movie or user not found")
+    return bulk_summary(results)
+
+
+def bulk_create_comments(cur, comments):
+    results = []
+    candidates = []
+    for index, comment in enumerate(comments):
+        if not comment.content.strip():
+            results.append(item_result(index, 400, "Comment content cannot be empty"))
+        else:
+            candidates.append((index, comment))
+
+    reviews = existing_ids(cur, "Reviews", "review_id", [comment.review_id for _, comment in candidates])
+    users = existing_ids(cur, "Users", "user_id", [comment.user_id for _, comment in candidates])
+    valid = []
+    for index, comment in candidates:
+        if comment.review_id not in reviews:
+            results.append(item_result(index, 404, "Review not found"))
+        elif comment.user_id not in users:
+            results.append(item_result(index, 404, "User not found"))
+        else:
+            valid.append((index, comment))
+
+    comment_ids = allocate_ids(cur, "comments", "comment_id", len(valid))
+    rows = [
+        (comment_id, comment.review_id, comment.user_id, comment.content)
+        for comment_id, (_, comment) in zip(comment_ids, valid)
+    ]
+    returned, errors = insert_rows(cur, BULK_INSERT_COMMENTS_SQL, rows, BULK_COMMENT_TEMPLATE)
+    _collect(results, valid, comment_ids, returned, errors, lambda row: row["comment_id"],
+             404, "Review or user not found")
+    return bulk_summary(results)
+
+
+def like_validation_error(like):
+    if not like.review_id and not like.comment_id:
+        return "Must provide either review_id or comment_id"
+    if like.review_id and like.comment_id:
+        return "Cannot like both a review and a comment at the same time"
+    return None
+
+
+def bulk_like_items(cur, likes):
+    results = []
+    candidates = []
+    for index, like in enumerate(likes):
+        error = like_validation_error(like)
+        if error:
+            results.append(item_result(index, 400, error))
+        else:
+            candidates.append((index, like))
+
+    user_ids = [like.user_id for _, like in candidates]
+    review_ids = [like.review_id for _, like in candidates if like.review_id]
+    comment_ids = [like.comment_id for _, like in candidates if like.comment_id]
+    users = existing_ids(cur, "Users", "user_id", user_ids)
+    reviews = existing_ids(cur, "Reviews", "review_id", review_ids)
+    comments = existing_ids(cur, "Comments", "comment_id", comment_ids)
+    liked = set()
+    if candidates:
+        cur.execute(EXISTING_LIKES_SQL, (list(set(user_ids)), list(set(review_ids)), list(set(comment_ids))))
+        liked = {(row["user_id"], row["review_id"], row["comment_id"]) for row in cur.fetchall()}
+
+    valid, keys = [], []
+    for index, like in candidates:
+        key = (like.user_id, like.review_id or None, like.comment_id or None)
+        if like.user_id not in users:
+            results.append(item_result(index, 404, "User not found"))
+        elif like.review_id and like.review_id not in reviews:
+            results.append(item_result(index, 404, "Review not found"))
+        elif like.comment_id and like.comment_id not in comments:
+            results.append(item_result(index, 404, "Comment not found"))
+        elif key in liked:
+            target = "review" if like.review_id else "comment"
+            results.append(item_result(index, 400, f"User has already liked this {target}"))
+        else:
+            # a repeat within the batch counts as already liked
+            liked.add(key)
+            valid.append((index, like))
+            keys.append(key)
+
+    returned, errors = insert_rows(cur, BULK_INSERT_LIKES_SQL, keys, BULK_LIKE_TEMPLATE)
+    _collect(results, valid, keys, returned, errors,
+             lambda row: (row["user_id"], row["review_id"], row["comment_id"]),
+             400, "Already liked, or the user, review or comment no longer exists")
+    return bulk_summary(results)
+
+
+def bulk_add_watched(cur, watched):
+    results = []
+    users = existing_ids(cur, "Users", "user_id", [item.user_id for item in watched])
+    movies = existing_ids(cur, "Movie", "movie_id", [item.movie_id for item in watched])
+    valid, keys, seen = [], [], set()
+    for index, item in enumerate(watched):
+        key = (item.user_id, item.movie_id)
+        if item.user_id not in users:
+            results.append(item_result(index, 404, "User not found"))
+        elif item.movie_id not in movies:
+            results.append(item_result(index, 404, "Movie not found"))
+        elif key in seen:
+            results.append(item_result(index, 200, "Movie already watched by user"))
+        else:
+            seen.add(key)
+            valid.append((index, item))
+            keys.append(key)
+
+    returned, errors = insert_rows(cur, BULK_INSERT_WATCHED_SQL, keys, BULK_WATCHED_TEMPLATE)
+    # ON CONFLICT DO NOTHING: a valid pair that wasn't returned was already watched
+    _collect(results, valid, keys, returned, errors, lambda row: (row["user_id"], row["movie_id"]),
+             200, "Movie already watched by user")
+    return bulk_summary(results)
@@ -0,0 +1,75 @@
+"""
+Repairs the like_count/comment_count counters on Reviews and Comments and the
+per-movie review counts in MovieReviewCount (queries/counters.py) wherever they
+drifted from the real counts, e.g. after rows were written with triggers
+disabled or restored from a dump. recompute_reputation() does the same for
+UserReputation scores.
+
+Both are queued every few hours by the app's scheduler and run by the job queue
+worker (utils/job_queue.py); the counters can also be repaired by hand from the
+sceneit directory:
+    python -m utils.counters
+"""
+from queries.create_tables import MISSING_COUNTER_COLUMNS_SQL, MIGRATE_COUNTER_COLUMNS_SQL
+from queries.counters import (
+    RECONCILE_REVIEW_COUNTERS_SQL,
+    RECONCILE_COMMENT_COUNTERS_SQL,
+    RECONCILE_MOVIE_REVIEW_COUNTS_SQL
+)
+from queries.reputation import RECOMPUTE_REPUTATION_SQL
+from utils.db import get_db_connection
+
+
+# blocks review/like/comment writes (not reads) until the repair commits, so no
+# trigger update lands between counting and writing the counts back. Unlike SHARE
+# it conflicts with itself: overlapping runs queue instead of deadlocking on each
+# other's row updates.
+LOCK_COUNTED_TABLES_SQL = "LOCK TABLE Reviews, Likes, Comments IN SHARE ROW EXCLUSIVE MODE"
+
+
+def _reconcile_counters(cur):
+    cur.execute(LOCK_COUNTED_TABLES_SQL)
+    cur.execute(RECONCILE_REVIEW_COUNTERS_SQL)
+    reviews = cur.rowcount
+    cur.execute(RECONCILE_COMMENT_COUNTERS_SQL)
+    comments = cur.rowcount
+    cur.execute(RECONCILE_MOVIE_REVIEW_COUNTS_SQL)
+    movies = cur.fetchone()[0]
+    return {"reviews": reviews, "comments": comments, "movies": movies}
+
+
+def reconcile_counters():
+    """Returns how many reviews, comments and movies had their counters corrected."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            return _reconcile_counters(cur)
+
+
+def migrate_counter_columns(cur):
+    """
+    Adds the counter columns to databases created before them and backfills them
+    in cur's transaction. Returns the reconcile counts, or None if nothing was missing.
+    """
+    cur.execute(MISSING_COUNTER_COLUMNS_SQL)
+    if cur.fetchone()[0] == 0:
+        return None
+    cur.execute(MIGRATE_COUNTER_COLUMNS_SQL)
+    return _reconcile_counters(cur)
+
+
+def recompute_reputation():
+    """Returns how many users had their reputation score corrected."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(LOCK_COUNTED_TABLES_SQL)
+            cur.execute(RECOMPUTE_REPUTATION_SQL)
+            users = cur.fetchone()[0]
+    return {"users": users}
+
+
+def main():
+    print(f"Counters repaired: {reconcile_counters()}")
+
+
+if __name__ == "__main__":
+    main()
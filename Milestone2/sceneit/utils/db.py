@@ -1,5 +1,11 @@
+import os
+import threading
+import time
+from collections import deque
+
 import psycopg2
-from psycopg2.extensions import connection
+import psycopg2.pool
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 
 connection_params = {
     "dbname": "test_db",
@@ -9,10 +15,331 @@ connection_params = {
     "port": "5432"
 }
 
-def get_db_connection() -> connection:
-    try:
-        conn = psycopg2.connect(**connection_params)
+# Pool sizing/lifetime knobs, overridable from the environment.
+pool_params = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 20)),
+    "max_lifetime": float(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),   # seconds a connection may live
+    "wait_timeout": float(os.environ.get("DB_POOL_WAIT_TIMEOUT", 10)),     # seconds to wait for a free connection
+    "check_idle_after": float(os.environ.get("DB_POOL_CHECK_IDLE_AFTER", 30)),  # ping connections idle longer than this
+}
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no connection could be borrowed within wait_timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of psycopg2 connections.
+
+    - Keeps at least min_size and at most max_size connections open; when broken
+      or expired connections are dropped, a background thread reopens them up to
+      min_size (retried on the next checkout if the database is still down).
+    - Checks a connection on checkout (closed / broken / idle too long -> SELECT 1).
+    - Retires connections older than max_lifetime.
+    - Blocks up to wait_timeout when every connection is in use, then raises PoolTimeout.
+
+    The lock only guards the bookkeeping: connecting and the SELECT 1 ping run
+    outside it, so one slow round trip doesn't hold up every other checkout.
+    """
+
+    def __init__(self, min_size, max_size, max_lifetime, wait_timeout, check_idle_after, **conn_kwargs):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size: need 0 <= min_size <= max_size and max_size >= 1")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.wait_timeout = wait_timeout
+        self.check_idle_after = check_idle_after
+        self._conn_kwargs = conn_kwargs
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created_at, last_used)
+        self._created_at = {}  # id(conn) -> created_at for every open connection
+        self._in_use = 0
+        self._opening = 0  # slots reserved by checkouts that are connecting outside the lock
+        self._refilling = False  # a _refill thread is running
+        self._closed = False
+
+        self._stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "failed_health_checks": 0,
+            "expired": 0,
+            "total_wait_ms": 0.0,
+        }
+
+        for _ in range(min_size):
+            self._idle.append(self._open())
+
+    def _open(self):
+        return self._register(psycopg2.connect(**self._conn_kwargs))
+
+    def _register(self, conn):
+        now = time.monotonic()
+        self._created_at[id(conn)] = now
+        self._stats["connections_opened"] += 1
+        return conn, now, now
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        self._stats["connections_closed"] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        self._maybe_refill()
+
+    def _maybe_refill(self):
+        """Under the lock: starts a _refill thread if the pool is below min_size."""
+        if self._closed or self._refilling or len(self._created_at) + self._opening >= self.min_size:
+            return
+        self._refilling = True
+        threading.Thread(target=self._refill, name="db-pool-refill", daemon=True).start()
+
+    def _refill(self):
+        while True:
+            with self._cond:
+                if self._closed or len(self._created_at) + self._opening >= self.min_size:
+                    self._refilling = False
+                    return
+                self._opening += 1
+            try:
+                conn = psycopg2.connect(**self._conn_kwargs)
+            except psycopg2.Error as e:
+                # the database is still down; the next checkout tries again
+                print(f"Could not reopen pooled database connection: {e}")
+                with self._cond:
+                    self._opening -= 1
+                    self._refilling = False
+                    self._cond.notify()
+                return
+            with self._cond:
+                self._opening -= 1
+                if self._closed:
+                    conn.close()
+                else:
+                    self._idle.append(self._register(conn))
+                    self._cond.notify()
+
+    def _is_expired(self, created_at):
+        return self.max_lifetime > 0 and time.monotonic() - created_at > self.max_lifetime
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.check_idle_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self):
+        start = time.monotonic()
+        deadline = start + self.wait_timeout
+        waited = False
+        while True:
+            conn, last_used, waited = self._reserve(deadline, waited)
+
+            if conn is None:
+                # a slot was reserved: connect without holding the lock
+                try:
+                    conn = psycopg2.connect(**self._conn_kwargs)
+                except psycopg2.Error:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._register(conn)
+                    return self._checked_out(conn, start, waited)
+
+            if self._is_healthy(conn, last_used):
+                with self._cond:
+                    return self._checked_out(conn, start, waited)
+            with self._cond:
+                self._stats["failed_health_checks"] += 1
+                self._discard(conn)
+                self._cond.notify()
+
+    def _reserve(self, deadline, waited):
+        """
+        Under the lock: takes an idle connection ((conn, last_used, waited)) or
+        reserves a slot for a new one ((None, None, waited)), waiting until
+        deadline for either.
+        """
+        with self._cond:
+            self._maybe_refill()
+            while True:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                while self._idle:
+                    conn, created_at, last_used = self._idle.pop()
+                    if self._is_expired(created_at):
+                        self._stats["expired"] += 1
+                        self._discard(conn)
+                        continue
+                    return conn, last_used, waited
+
+                if len(self._created_at) + self._opening < self.max_size:
+                    self._opening += 1
+                    return None, None, waited
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.wait_timeout}s waiting for a database connection "
+                        f"(max_size={self.max_size})"
+                    )
+                if not waited:
+                    self._stats["waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+
+    def _checked_out(self, conn, start, waited):
+        self._in_use += 1
+        self._stats["checkouts"] += 1
+        if waited:
+            self._stats["total_wait_ms"] += (time.monotonic() - start) * 1000
         return conn
+
+    def putconn(self, conn):
+        with self._cond:
+            self._in_use -= 1
+            try:
+                reusable = not conn.closed and not self._closed
+                if reusable:
+                    # hand connections back clean: no open transaction, default autocommit
+                    if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    if conn.autocommit:
+                        conn.autocommit = False
+            except psycopg2.Error:
+                reusable = False
+
+            created_at = self._created_at.get(id(conn))
+            if not reusable or created_at is None or self._is_expired(created_at):
+                if created_at is not None and self._is_expired(created_at):
+                    self._stats["expired"] += 1
+                self._discard(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                **self._stats,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": len(self._created_at),
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._discard(conn)
+            self._cond.notify_all()
+
+
+class PooledConnection:
+    """
+    A connection borrowed from the pool. Behaves like a psycopg2 connection:
+    `with get_db_connection() as conn:` commits (or rolls back) and then returns
+    the connection to the pool, and `conn.close()` also returns it.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._conn is not None and not self._conn.closed:
+                if exc_type is None:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+        finally:
+            self.close()
+        return False
+
+    def close(self):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.putconn(conn)
+
+    @property
+    def closed(self):
+        conn = object.__getattribute__(self, "_conn")
+        return 1 if conn is None else conn.closed
+
+    def __del__(self):
+        # safety net for callers that never close
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(**pool_params, **connection_params)
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_pool_stats():
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
+
+def get_db_connection() -> PooledConnection:
+    try:
+        pool = get_pool()
+        return PooledConnection(pool, pool.getconn())
     except psycopg2.Error as e:
         print(f"Error connecting to the database: {e}")
         raise
@@ -0,0 +1,131 @@
+"""
+Incremental catalog refresh from movies.csv.
+
+Every incoming row is hashed and matched to an existing movie by (title,
+in_theaters_date). Rows whose hash equals the one stored in MovieSyncState are
+left alone; new rows are inserted and changed rows are upserted together with
+their cast/crew links (links no longer listed are removed). Movies that are no
+longer in the file are kept, since reviews and likes point at them.
+
+The first sync over a catalog loaded without hashes treats every movie as
+updated once and records the hashes.
+
+Run from the sceneit directory (e.g. nightly):
+    python -m utils.delta_sync [--sample-size 50]
+"""
+import argparse
+import time
+
+from psycopg2 import sql
+
+from static.vars import MOVIES_CSV_PATH
+from utils.bulk_ingest import (
+    MOVIE_DIMENSION_COLUMNS,
+    assign_ids,
+    insert_staged_movies,
+    selected_rows_condition,
+    stage_csv,
+)
+from utils.db import get_db_connection
+from utils.insert_data import SAMPLE_SIZE, ingest_limit
+
+STAGE_TABLE = "stage_movies"
+
+
+def _classify_staged_movies(cur, header, row_limit):
+    stage = sql.Identifier(STAGE_TABLE)
+    cur.execute(sql.SQL("DELETE FROM {} s WHERE NOT ({})").format(
+        stage, selected_rows_condition(header, row_limit)))
+    # a key repeated in the file: the last row wins
+    cur.execute(sql.SQL("""
+        DELETE FROM {stage} s
+        USING {stage} later
+        WHERE later.movie_title = s.movie_title
+          AND later.in_theaters_date = s.in_theaters_date
+          AND later.row_num > s.row_num
+    """).format(stage=stage))
+
+    cur.execute(sql.SQL("ALTER TABLE {} ADD COLUMN row_hash TEXT, ADD COLUMN change VARCHAR(10)").format(stage))
+    cur.execute(sql.SQL("""
+        UPDATE {stage} s
+        SET row_hash = md5(ROW({columns})::text),
+            assigned_id = (
+                SELECT MIN(m.movie_id)
+                FROM Movie m
+                WHERE m.title = s.movie_title AND m.in_theaters_date = s.in_theaters_date::date
+            )
+    """).format(stage=stage, columns=sql.SQL(", ").join(
+        sql.SQL("s.{}").format(sql.Identifier(col)) for col in header)))
+    cur.execute(sql.SQL("""
+        UPDATE {} s
+        SET change = CASE
+            WHEN s.assigned_id IS NULL THEN 'inserted'
+            WHEN (SELECT row_hash FROM MovieSyncState WHERE movie_id = s.assigned_id) = s.row_hash THEN 'unchanged'
+            ELSE 'updated'
+        END
+    """).format(stage))
+
+    cur.execute(sql.SQL("SELECT change, COUNT(*) FROM {} GROUP BY change").format(stage))
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    counts.update(dict(cur.fetchall()))
+    return counts
+
+
+def _remove_stale_movie_links(cur):
+    for csv_col, entity_table, junction_table, fk_col in MOVIE_DIMENSION_COLUMNS:
+        cur.execute(sql.SQL("""
+            DELETE FROM {junction} j
+            USING {stage} s
+            WHERE j.movie_id = s.assigned_id
+              AND s.change = 'updated'
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM unnest(string_to_array(s.{csv_col}, ', ')) AS n(name)
+                  JOIN {entity} e ON e.name = n.name
+                  WHERE e.{fk} = j.{fk}
+              )
+        """).format(
+            junction=sql.Identifier(junction_table.lower()),
+            stage=sql.Identifier(STAGE_TABLE),
+            csv_col=sql.Identifier(csv_col),
+            entity=sql.Identifier(entity_table.lower()),
+            fk=sql.Identifier(fk_col),
+        ))
+
+
+def delta_sync_movies(csv_filepath: str = MOVIES_CSV_PATH, sample_size: int = SAMPLE_SIZE):
+    """Returns {"inserted", "updated", "unchanged", "seconds"}."""
+    started = time.perf_counter()
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            header = stage_csv(cur, csv_filepath, STAGE_TABLE)
+            counts = _classify_staged_movies(cur, header, ingest_limit(sample_size))
+
+            # from here on the stage only holds rows that need writing
+            cur.execute(sql.SQL("DELETE FROM {} WHERE change = 'unchanged'").format(sql.Identifier(STAGE_TABLE)))
+            assign_ids(cur, STAGE_TABLE, "movie", "movie_id", sql.SQL("s.change = 'inserted'"))
+            insert_staged_movies(cur, STAGE_TABLE, update_existing=True)
+            _remove_stale_movie_links(cur)
+            cur.execute(sql.SQL("""
+                INSERT INTO MovieSyncState (movie_id, row_hash, synced_at)
+                SELECT assigned_id, row_hash, NOW()
+                FROM {}
+                ON CONFLICT (movie_id) DO UPDATE SET row_hash = EXCLUDED.row_hash, synced_at = EXCLUDED.synced_at
+            """).format(sql.Identifier(STAGE_TABLE)))
+
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    print(f"Delta sync: {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged in {counts['seconds']:.2f}s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE,
+                        help="rows to read when IS_PRODUCTION is False")
+    args = parser.parse_args()
+    delta_sync_movies(MOVIES_CSV_PATH, args.sample_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import os
+import threading
+from collections import OrderedDict
+
+import psycopg2.extensions
+import psycopg2.extras
+
+from queries.movie_projection import MOVIE_DIMENSIONS
+
+# In-process name -> id cache for the Genre/Writer/Actor/Studio/Director tables.
+#
+# Lookups go through resolve_dimension_ids: cached names cost nothing, the rest
+# are fetched-or-inserted in one statement and written back to the cache.
+# Entries can go stale (the row was deleted, or it was inserted by a transaction
+# that later rolled back), so link_dimension checks the cached ids while
+# inserting the junction rows; any id that no longer exists is dropped from the
+# cache and resolved again.
+
+DIMENSION_CACHE_MAX_ENTRIES = int(os.environ.get("DIMENSION_CACHE_MAX_ENTRIES", 50000))  # per table
+
+# entity table -> (pk column, junction table)
+DIMENSION_TABLES = {entity: (fk_col, junction) for _, junction, entity, fk_col in MOVIE_DIMENSIONS}
+
+
+class DimensionCache:
+    """Thread-safe LRU of name -> id, bounded to max_entries per table."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._tables = {table: OrderedDict() for table in DIMENSION_TABLES}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get_many(self, table, names):
+        """Returns ({name: id} for cached names, [names not cached])."""
+        found, missing = {}, []
+        with self._lock:
+            entries = self._tables[table]
+            for name in names:
+                entity_id = entries.get(name)
+                if entity_id is None:
+                    missing.append(name)
+                else:
+                    entries.move_to_end(name)
+                    found[name] = entity_id
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(missing)
+        return found, missing
+
+    def put_many(self, table, name_to_id):
+        with self._lock:
+            entries = self._tables[table]
+            for name, entity_id in name_to_id.items():
+                entries[name] = entity_id
+                entries.move_to_end(name)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, table, names=None):
+        """Drops the given names, or the whole table when names is None."""
+        with self._lock:
+            entries = self._tables[table]
+            if names is None:
+                self._stats["invalidations"] += len(entries)
+                entries.clear()
+                return
+            for name in names:
+                if entries.pop(name, None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "max_entries_per_table": self.max_entries,
+                "entries": {table: len(entries) for table, entries in self._tables.items()},
+            }
+
+
+dimension_cache = DimensionCache(DIMENSION_CACHE_MAX_ENTRIES)
+
+
+def _tuple_cursor(cur):
+    # callers pass RealDictCursors as well as plain ones; use a plain cursor on the same transaction
+    return cur.connection.cursor(cursor_factory=psycopg2.extensions.cursor)
+
+
+def _fetch_or_insert(cur, table, names):
+    pk_col, _ = DIMENSION_TABLES[table]
+    # rows inserted by the CTE aren't visible to the join in the same statement, hence the UNION.
+    # Names sorted so concurrent writers take the unique-index locks in the same order.
+    cur.execute(f"""
+        WITH input(name) AS (SELECT DISTINCT unnest(%s::text[])),
+        inserted AS (
+            INSERT INTO {table} (name)
+            SELECT name FROM input ORDER BY name
+            ON CONFLICT (name) DO NOTHING
+            RETURNING {pk_col}, name
+        )
+        SELECT {pk_col}, name FROM inserted
+        UNION ALL
+        SELECT t.{pk_col}, t.name FROM {table} t JOIN input USING (name)
+    """, (list(names),))
+    name_to_id = {name: entity_id for entity_id, name in cur.fetchall()}
+
+    missing = [name for name in names if name not in name_to_id]
+    if missing:
+        # inserted by a concurrent transaction that committed after this statement's snapshot
+        cur.execute(f"SELECT {pk_col}, name FROM {table} WHERE name = ANY(%s)", (missing,))
+        name_to_id.update({name: entity_id for entity_id, name in cur.fetchall()})
+    return name_to_id
+
+
+def resolve_dimension_ids(cur, table, names):
+    """Returns {name: id} for every name, inserting names that don't exist yet."""
+    unique_names = list(dict.fromkeys(names))
+    if not unique_names:
+        return {}
+    name_to_id, missing = dimension_cache.get_many(table, unique_names)
+    if missing:
+        with _tuple_cursor(cur) as tuple_cur:
+            fetched = _fetch_or_insert(tuple_cur, table, missing)
+        dimension_cache.put_many(table, fetched)
+        name_to_id.update(fetched)
+    return name_to_id
+
+
+def _insert_links(cur, table, pairs):
+    """
+    Inserts (movie_id, entity_id) links whose entity still exists and returns
+    the entity ids that don't.
+    """
+    pk_col, junction = DIMENSION_TABLES[table]
+    valid_ids = psycopg2.extras.execute_values(cur, f"""
+        WITH pairs(movie_id, entity_id) AS (VALUES %s),
+        valid AS (
+            SELECT {pk_col} FROM {table} WHERE {pk_col} IN (SELECT entity_id FROM pairs)
+        ),
+        linked AS (
+            INSERT INTO {junction} (movie_id, {pk_col})
+            SELECT DISTINCT p.movie_id, p.entity_id FROM pairs p JOIN valid v ON v.{pk_col} = p.entity_id
+            ON CONFLICT (movie_id, {pk_col}) DO NOTHING
+        )
+        SELECT {pk_col} FROM valid
+    """, pairs, page_size=len(pairs), fetch=True)
+    valid_ids = {row[0] for row in valid_ids}
+    return {entity_id for _, entity_id in pairs if entity_id not in valid_ids}
+
+
+def link_dimension_many(cur, table, names_by_movie):
+    """
+    Links every movie in names_by_movie ({movie_id: names}) to its named
+    Genre/Writer/Actor/Studio/Director rows, creating missing ones. Costs one
+    lookup for the names the cache doesn't know and one insert for all links.
+    """
+    all_names = [name for names in names_by_movie.values() for name in names]
+    name_to_id = resolve_dimension_ids(cur, table, all_names)
+    pairs = [(movie_id, name_to_id[name])
+             for movie_id, names in names_by_movie.items() for name in dict.fromkeys(names)]
+    if not pairs:
+        return
+    with _tuple_cursor(cur) as tuple_cur:
+        stale_ids = _insert_links(tuple_cur, table, pairs)
+        if stale_ids:
+            stale = [name for name, entity_id in name_to_id.items() if entity_id in stale_ids]
+            dimension_cache.invalidate(table, stale)
+            refreshed = _fetch_or_insert(tuple_cur, table, stale)
+            dimension_cache.put_many(table, refreshed)
+            _insert_links(tuple_cur, table, [
+                (movie_id, refreshed[name])
+                for movie_id, names in names_by_movie.items() for name in dict.fromkeys(names)
+                if name in refreshed
+            ])
+
+
+def link_dimension(cur, movie_id, table, names):
+    """Links movie_id to the named Genre/Writer/Actor/Studio/Director rows, creating missing ones."""
+    link_dimension_many(cur, table, {movie_id: names})
+
+
+def warm_dimension_cache(cur):
+    """Loads up to max_entries names per table, most recently created first."""
+    with _tuple_cursor(cur) as tuple_cur:
+        for table, (pk_col, _) in DIMENSION_TABLES.items():
+            tuple_cur.execute(f"SELECT {pk_col}, name FROM {table} ORDER BY {pk_col} DESC LIMIT %s",
+                              (dimension_cache.max_entries,))
+            dimension_cache.put_many(table, {name: entity_id for entity_id, name in reversed(tuple_cur.fetchall())})
+
+
+def get_dimension_cache_stats():
+    return dimension_cache.stats()
@@ -1,5 +1,6 @@
 from utils.db import get_db_connection
-from utils.load_csv import load_csv_data
+from utils.dimension_cache import resolve_dimension_ids, link_dimension
+from utils.load_csv import stream_csv_chunks, prefetch_chunks
 from static.vars import IS_PRODUCTION
 from queries.insert_movie import INSERT_MOVIE_SQL, NUM_MOVIES_SQL
 from queries.insert_tables import INSERT_REVIEW_SQL, INSERT_USER_SQL, NUM_REVIEWS_SQL, NUM_USERS_SQL
@@ -7,20 +8,16 @@ from objects.user import User
 from objects.review import Review
 from objects.movie import Movie
 from psycopg2.extensions import cursor
+from psycopg2.extras import execute_batch
 
 SAMPLE_SIZE = 50
 
+def ingest_limit(sample_size: int):
+    # rows read from each CSV: everything in production, the first sample_size otherwise
+    return None if IS_PRODUCTION else sample_size
+
 def insert_into_entity_table(cur: cursor, table_name, entity_name):
-    cur.execute(f"""
-        INSERT INTO {table_name} (name) 
-        VALUES (%s) 
-        ON CONFLICT (name) 
-        DO UPDATE SET name = EXCLUDED.name 
-        RETURNING {table_name.lower()}_id;
-    """, (entity_name,))
-    
-    entity_id = cur.fetchone()[0]
-    return entity_id
+    return resolve_dimension_ids(cur, table_name, [entity_name])[entity_name]
 
 def insert_into_junction_table(cur: cursor, table_name, entity_table_name, movie_id, entity_id, ):
     cur.execute(f"""
@@ -41,10 +38,9 @@ def populate_movie_junctions(movie: Movie, cur: cursor):
         "MovieStudio": (movie.studios, "Studio"),
     }
 
+    # one lookup/insert for the names the dimension cache doesn't know, one for the links
     for table_name, (entities, entity_table_name) in relations.items():
-        for entity_name in entities:
-            entity_id = insert_into_entity_table(cur, entity_table_name, entity_name)
-            insert_into_junction_table(cur, table_name, entity_table_name, movie_id, entity_id, )
+        link_dimension(cur, movie_id, entity_table_name, entities)
 
 def hasUsersBeenPopulated(cur):
     cur.execute(NUM_USERS_SQL)
@@ -68,16 +64,13 @@ def insert_reviews(csv_filepath: str, sample_size: int = SAMPLE_SIZE):
        conn.close()
        return 
     
-    reviews = load_csv_data(csv_filepath)
-    numReviews = len(reviews) if IS_PRODUCTION else min(sample_size, len(reviews))
-
-    for reviewIndex in range(numReviews):
-        review_attrs = reviews[reviewIndex]
-        if Review.review_attrs_soft_check(review_attrs):
-            review = Review(review_attrs)
-            cur.execute(INSERT_REVIEW_SQL, (
-                review.movie_id, review.user_id,
-                review.title, review.content, review.rating))
+    for chunk in prefetch_chunks(stream_csv_chunks(csv_filepath, validate=Review.review_attrs_soft_check,
+                                                   limit=ingest_limit(sample_size))):
+        reviews = [Review(review_attrs) for review_attrs in chunk]
+        execute_batch(cur, INSERT_REVIEW_SQL, [(
+            review.movie_id, review.user_id,
+            review.title, review.content, review.rating,
+            review.created_at, review.updated_at) for review in reviews])
     conn.commit()
     cur.close()
     conn.close()
@@ -92,16 +85,13 @@ def insert_users(csv_filepath: str, sample_size: int = SAMPLE_SIZE):
        conn.close()
        return 
     
-    users = load_csv_data(csv_filepath)
-    numUsers = len(users) if IS_PRODUCTION else min(len(users), sample_size)
-
-    for userIndex in range(numUsers):
-        user_attrs = users[userIndex]
-        if User.user_attrs_soft_check(user_attrs):
-            user = User(user_attrs)
-            cur.execute(INSERT_USER_SQL, (
-                user.username, user.email, user.password_hash
-                ))
+    for chunk in prefetch_chunks(stream_csv_chunks(csv_filepath, validate=User.user_attrs_soft_check,
+                                                   limit=ingest_limit(sample_size))):
+        users = [User(user_attrs) for user_attrs in chunk]
+        execute_batch(cur, INSERT_USER_SQL, [(
+            user.username, user.email, user.password_hash,
+            user.created_at, user.updated_at
+            ) for user in users])
     conn.commit()
     cur.close()
     conn.close()
@@ -122,12 +112,9 @@ def insert_movies(csv_filepath: str, sample_size: int = SAMPLE_SIZE):
        conn.close()
        return
     
-    movies = load_csv_data(csv_filepath)
-    numMovies = len(movies) if IS_PRODUCTION else min(len(movies), sample_size)
-
-    for movieIndex in range(numMovies):
-        movie_attrs = movies[movieIndex]
-        if Movie.movie_attrs_soft_check(movie_attrs):
+    for chunk in prefetch_chunks(stream_csv_chunks(csv_filepath, validate=Movie.movie_attrs_soft_check,
+                                                   limit=ingest_limit(sample_size))):
+        for movie_attrs in chunk:
             movie = Movie(movie_attrs)
             cur.execute(INSERT_MOVIE_SQL, (
               movie.movie_title, movie.movie_info, movie.critics_consensus,
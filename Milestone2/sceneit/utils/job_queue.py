@@ -0,0 +1,191 @@
+"""
+Worker for the JobQueue table (queries/job_queue.py): heavy maintenance work
+(catalog ingest, view refreshes, counter/reputation backfills) is enqueued by the
+API and its scheduler and run here, in a separate process, so it never holds up
+request threads.
+
+Workers claim jobs with FOR UPDATE SKIP LOCKED, so any number of them can run
+side by side. A failed job is retried with exponential backoff up to its
+max_attempts; each attempt's worker and duration are stored on the job.
+
+Run from the sceneit directory:
+    python -m utils.job_queue [--poll-interval 2] [--once]
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extras
+
+from queries.create_tables import REFRESH_MATERIALIZED_VIEW_CONCURRENTLY
+from queries.job_queue import (
+    CREATE_JOB_QUEUE_TABLE_SQL,
+    ENQUEUE_JOB_SQL,
+    CLAIM_JOB_SQL,
+    COMPLETE_JOB_SQL,
+    FAIL_JOB_SQL,
+    RECOVER_STALE_JOBS_SQL,
+    GET_JOB_SQL,
+    JOB_QUEUE_STATS_SQL
+)
+from static.vars import MOVIES_CSV_PATH, REVIEWS_CSV_PATH
+from utils.bulk_ingest import bulk_insert_movies, bulk_insert_reviews
+from utils.counters import reconcile_counters, recompute_reputation
+from utils.db import get_db_connection
+from utils.delta_sync import delta_sync_movies
+from utils.insert_data import SAMPLE_SIZE
+from utils.jobs import WORKER_ID
+
+RETRY_BASE_SECONDS = float(os.environ.get("JOB_QUEUE_RETRY_BASE", 30))       # first retry delay, doubled per attempt
+STALE_AFTER_SECONDS = float(os.environ.get("JOB_QUEUE_STALE_AFTER", 21600))  # longest a job may run before it is presumed dead
+
+
+def refresh_top_reviewed():
+    """Refreshes the mv_top_10_reviewed_movies fallback view of /movies_top_reviewed."""
+    with get_db_connection() as conn:
+        # REFRESH ... CONCURRENTLY can't run inside a transaction block
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(REFRESH_MATERIALIZED_VIEW_CONCURRENTLY)
+
+
+def sync_catalog(sample_size=SAMPLE_SIZE):
+    counts = delta_sync_movies(MOVIES_CSV_PATH, sample_size)
+    refresh_top_reviewed()
+    return counts
+
+
+# kind -> handler(**payload); handlers open their own connections and return
+# something JSON-serializable (stored as the job's result) or None
+JOB_HANDLERS = {
+    "sync_catalog": sync_catalog,
+    "ingest_movies": lambda sample_size=SAMPLE_SIZE: bulk_insert_movies(MOVIES_CSV_PATH, sample_size),
+    "ingest_reviews": lambda sample_size=SAMPLE_SIZE: bulk_insert_reviews(REVIEWS_CSV_PATH, sample_size),
+    "refresh_top_reviewed": refresh_top_reviewed,
+    "reconcile_counters": reconcile_counters,
+    "recompute_reputation": recompute_reputation,
+}
+
+
+def _json(value):
+    return psycopg2.extras.Json(value, dumps=lambda v: json.dumps(v, default=str))
+
+
+def ensure_job_queue_table():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_JOB_QUEUE_TABLE_SQL)
+
+
+def enqueue_job(kind, payload=None, priority=0, max_attempts=3):
+    """Returns the new job's id. Raises ValueError for a kind no handler is registered for."""
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(ENQUEUE_JOB_SQL, (kind, _json(payload or {}), priority, max_attempts))
+            return cur.fetchone()[0]
+
+
+def get_job(job_id):
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(GET_JOB_SQL, (job_id,))
+            return cur.fetchone()
+
+
+def get_job_queue_stats():
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(JOB_QUEUE_STATS_SQL)
+            return cur.fetchall()
+
+
+def claim_job():
+    """Marks the next ready job as running on this worker and returns it, or None if there is none."""
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(CLAIM_JOB_SQL, (WORKER_ID,))
+            return cur.fetchone()
+
+
+def recover_stale_jobs(stale_after=STALE_AFTER_SECONDS):
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(RECOVER_STALE_JOBS_SQL, (stale_after,))
+            return [row[0] for row in cur.fetchall()]
+
+
+def _finish(job_id, started, error=None, result=None):
+    seconds = time.perf_counter() - started
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            if error is None:
+                cur.execute(COMPLETE_JOB_SQL, (_json(result), seconds, job_id))
+                return "succeeded", seconds
+            cur.execute(FAIL_JOB_SQL, {"retry_base": RETRY_BASE_SECONDS, "error": error,
+                                       "duration": seconds, "job_id": job_id})
+            return cur.fetchone()[0], seconds
+
+
+def run_job(job):
+    """Runs a claimed job and records its outcome; returns the job's new status."""
+    job_id, kind = job["job_id"], job["kind"]
+    print(f"[{datetime.now()}] Job {job_id} ({kind}) started, attempt {job['attempts']}/{job['max_attempts']}")
+    started = time.perf_counter()
+    try:
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        result = handler(**job["payload"])
+    except KeyboardInterrupt:
+        _finish(job_id, started, error="worker interrupted")
+        raise
+    except Exception as e:
+        status, seconds = _finish(job_id, started, error=f"{type(e).__name__}: {e}")
+        print(f"[{datetime.now()}] Job {job_id} ({kind}) failed in {seconds:.2f}s, now {status}: {e}")
+        return status
+    status, seconds = _finish(job_id, started, result=result)
+    print(f"[{datetime.now()}] Job {job_id} ({kind}) succeeded in {seconds:.2f}s")
+    return status
+
+
+def run_worker(poll_interval=2.0, once=False):
+    """Runs jobs until interrupted; with once=True, returns when the queue has no ready job."""
+    ensure_job_queue_table()
+    print(f"Job queue worker {WORKER_ID} started")
+    while True:
+        try:
+            job = claim_job()
+            if job is None:
+                recovered = recover_stale_jobs()
+                if recovered:
+                    print(f"[{datetime.now()}] Recovered stale jobs {recovered}")
+                    continue
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+            run_job(job)
+        except psycopg2.Error as e:
+            # database restarts shouldn't take the worker down; claimed jobs are recovered once stale
+            print(f"[{datetime.now()}] Job queue database error: {e}")
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds to wait when the queue is empty")
+    parser.add_argument("--once", action="store_true", help="exit once no job is ready instead of polling")
+    args = parser.parse_args()
+    try:
+        run_worker(args.poll_interval, args.once)
+    except KeyboardInterrupt:
+        print("Job queue worker stopped")
+
+
+if __name__ == "__main__":
+    main()
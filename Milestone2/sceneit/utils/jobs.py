@@ -0,0 +1,93 @@
+import os
+import socket
+import time
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extras
+
+from queries.jobs import (
+    CREATE_JOB_RUN_TABLE_SQL,
+    TRY_JOB_LOCK_SQL,
+    JOB_UNLOCK_SQL,
+    RAN_RECENTLY_SQL,
+    START_JOB_RUN_SQL,
+    FINISH_JOB_RUN_SQL,
+    RECENT_JOB_RUNS_SQL
+)
+from utils.db import get_db_connection
+
+# Every uvicorn worker / replica starts the same APScheduler jobs; these helpers
+# make each job run on one of them per interval:
+#   - a Postgres advisory lock per job id keeps two workers from running it at once
+#   - under the lock, a worker skips the job if any worker started it within the
+#     last RECENT_RUN_FRACTION of its interval (the workers' timers aren't aligned)
+# Runs are recorded in JobRun with their duration and outcome.
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+RECENT_RUN_FRACTION = 0.9
+
+
+def ensure_job_run_table():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_JOB_RUN_TABLE_SQL)
+
+
+def run_scheduled_job(job_id, interval_seconds, job):
+    """
+    Runs job() on this worker unless another worker is running it or ran it
+    recently. Returns True if it ran here (whether or not it succeeded).
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(TRY_JOB_LOCK_SQL, (job_id,))
+            if not cur.fetchone()[0]:
+                return False
+            try:
+                cur.execute(RAN_RECENTLY_SQL, (job_id, interval_seconds * RECENT_RUN_FRACTION))
+                if cur.fetchone()[0]:
+                    return False
+                cur.execute(START_JOB_RUN_SQL, (job_id, WORKER_ID))
+                run_id = cur.fetchone()[0]
+                conn.commit()
+
+                print(f"[{datetime.now()}] Background Task: {job_id} started on {WORKER_ID}")
+                started = time.perf_counter()
+                status, detail = "succeeded", None
+                try:
+                    result = job()
+                    if result is not None:
+                        detail = str(result)
+                except Exception as e:
+                    status, detail = "failed", str(e)
+                seconds = time.perf_counter() - started
+                print(f"[{datetime.now()}] Background Task: {job_id} {status} in {seconds:.2f}s"
+                      + (f": {detail}" if detail else ""))
+
+                cur.execute(FINISH_JOB_RUN_SQL, (status, detail, seconds, run_id))
+                conn.commit()
+                return True
+            finally:
+                # the lock is held by the session, so it survives the rollback;
+                # release it before the connection goes back to the pool
+                conn.rollback()
+                cur.execute(JOB_UNLOCK_SQL, (job_id,))
+                conn.commit()
+
+
+def scheduled(job_id, interval_seconds, job):
+    """The function to hand APScheduler: run_scheduled_job with errors logged instead of raised."""
+    def run():
+        try:
+            run_scheduled_job(job_id, interval_seconds, job)
+        except psycopg2.Error as e:
+            print(f"[{datetime.now()}] Background Task Error: could not coordinate {job_id}: {e}")
+    return run
+
+
+def get_recent_job_runs(limit=50):
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(RECENT_JOB_RUNS_SQL, (limit,))
+            return cur.fetchall()
@@ -1,6 +1,121 @@
 import csv
+import queue
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 1000
+CSV_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"  # created_at/updated_at in the CSVs, in UTC
+
+
+def parse_csv_timestamp(value):
+    """Parses a CSV timestamp into an aware (UTC) datetime; None for an empty value."""
+    if not value:
+        return None
+    return datetime.strptime(value, CSV_TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
 
 def load_csv_data(csv_filepath: str):
     with open(csv_filepath, newline='', encoding='utf-8') as csv_file:
         reader = csv.DictReader(csv_file)
         return list(reader)
+
+def stream_csv_chunks(csv_filepath: str, chunk_size: int = DEFAULT_CHUNK_SIZE, validate=None, limit=None):
+    """
+    Yields lists of at most chunk_size row dicts, reading the file lazily so
+    only one chunk is held at a time. `limit` caps how many rows are read from
+    the file (None = all); rows failing `validate` are dropped from the chunk.
+    """
+    with open(csv_filepath, newline='', encoding='utf-8') as csv_file:
+        rows = csv.DictReader(csv_file)
+        if limit is not None:
+            rows = islice(rows, limit)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            if validate is not None:
+                chunk = [row for row in chunk if validate(row)]
+            if chunk:
+                yield chunk
+
+def prefetch_chunks(chunks, depth: int = 2):
+    """
+    Parses the next chunks on a background thread while the caller writes the
+    current one. At most `depth` chunks wait in the queue, so memory stays
+    bounded; a parse error is re-raised in the caller.
+    """
+    done = object()
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+            put(done)
+        except Exception as e:
+            put(e)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # the consumer stopped early (error or break): let the producer exit
+        stop.set()
+        producer.join()
+
+def _row_dict(header, values):
+    # same shape DictReader gives: missing trailing fields are None
+    return {col: values[i] if i < len(values) else None for i, col in enumerate(header)}
+
+def plan_csv_partitions(csv_filepath: str, partition_size: int, validate=None, limit=None):
+    """
+    Splits a CSV into partitions of partition_size rows without keeping them:
+    each partition records the file offset it starts at, how many rows it
+    spans and how many of them pass `validate`.
+    """
+    partitions = []
+    with open(csv_filepath, newline='', encoding='utf-8') as csv_file:
+        # readline (rather than iterating the file) keeps tell() usable; csv.reader
+        # only pulls the lines of the record it is returning
+        records = (values for values in csv.reader(iter(csv_file.readline, '')) if values)
+        header = next(records)
+        rows_read = 0
+        while limit is None or rows_read < limit:
+            byte_offset = csv_file.tell()
+            size = partition_size if limit is None else min(partition_size, limit - rows_read)
+            row_count = valid_count = 0
+            for values in islice(records, size):
+                row_count += 1
+                if validate is None or validate(_row_dict(header, values)):
+                    valid_count += 1
+            if row_count == 0:
+                break
+            partitions.append({"byte_offset": byte_offset, "row_count": row_count, "valid_count": valid_count})
+            rows_read += row_count
+    return partitions
+
+def read_csv_partition(csv_filepath: str, byte_offset: int, row_count: int):
+    """Returns (header, rows) for a partition from plan_csv_partitions."""
+    with open(csv_filepath, newline='', encoding='utf-8') as csv_file:
+        header = next(csv.reader(csv_file))
+        csv_file.seek(byte_offset)
+        records = (values for values in csv.reader(csv_file) if values)
+        return header, [_row_dict(header, values) for values in islice(records, row_count)]
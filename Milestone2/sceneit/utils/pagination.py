@@ -0,0 +1,106 @@
+import base64
+import binascii
+import json
+
+# Keyset (cursor) pagination helpers.
+#
+# A page is described by its sort keys: [(sql_expr, expr_params, "ASC" | "DESC"), ...]
+# in ORDER BY order, where the last key is unique (usually the primary key).
+# The cursor handed to clients is an opaque token holding the sort-key values of
+# the last row on the page; the next page starts strictly after that row, so
+# Postgres can seek straight to it through an index instead of counting past
+# OFFSET rows.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(tag: str, values):
+    raw = json.dumps({"k": tag, "v": list(values)}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, tag: str, size: int):
+    """
+    Returns the sort-key values stored in token. Raises ValueError if the token
+    is malformed or was issued for a different listing/sort order.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or payload.get("k") != tag:
+        raise ValueError("Cursor does not match this listing or sort order")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_condition(sort_keys, values):
+    """
+    WHERE fragment (and params) matching rows that sort after `values`:
+    (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ..., with < for DESC keys.
+    When every key sorts the same way this is the row comparison
+    (k1, k2, ...) > (v1, v2, ...), which Postgres can answer with a single range
+    scan of an index on (k1, k2, ...).
+    """
+    directions = {direction for _, _, direction in sort_keys}
+    if len(directions) == 1:
+        op = "<" if directions == {"DESC"} else ">"
+        exprs = ", ".join(expr for expr, _, _ in sort_keys)
+        placeholders = ", ".join(["%s"] * len(sort_keys))
+        params = [param for _, expr_params, _ in sort_keys for param in expr_params]
+        return f"(({exprs}) {op} ({placeholders}))", params + list(values)
+
+    clauses = []
+    params = []
+    for i, (expr, expr_params, direction) in enumerate(sort_keys):
+        parts = []
+        for (prev_expr, prev_params, _), prev_value in zip(sort_keys[:i], values[:i]):
+            parts.append(f"{prev_expr} = %s")
+            params.extend(prev_params)
+            params.append(prev_value)
+        op = "<" if direction == "DESC" else ">"
+        parts.append(f"{expr} {op} %s")
+        params.extend(expr_params)
+        params.append(values[i])
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def order_by_clause(sort_keys):
+    sql = "ORDER BY " + ", ".join(f"{expr} {direction}" for expr, _, direction in sort_keys)
+    params = [param for _, expr_params, _ in sort_keys for param in expr_params]
+    return sql, params
+
+
+def paginate(rows, limit: int, tag: str, cursor_columns):
+    """
+    Queries fetch limit + 1 rows; the extra row only tells us whether there is
+    another page. Returns (page_rows, next_cursor or None).
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(tag, [last[col] for col in cursor_columns])
+
+
+def apply_keyset(query: str, params, sort_keys, tag: str, cursor, limit: int):
+    """
+    Appends the cursor condition, ORDER BY and LIMIT (limit + 1) to a query that
+    already has a WHERE clause. Raises ValueError for a bad cursor.
+    """
+    params = list(params)
+    if cursor:
+        condition, condition_params = keyset_condition(sort_keys, decode_cursor(cursor, tag, len(sort_keys)))
+        query += f" AND {condition}"
+        params.extend(condition_params)
+    order_by, order_params = order_by_clause(sort_keys)
+    query += f" {order_by} LIMIT %s"
+    params.extend(order_params)
+    params.append(limit + 1)
+    return query, params
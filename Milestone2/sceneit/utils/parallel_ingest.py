@@ -0,0 +1,206 @@
+"""
+Offline parallel ingest with checkpoint/resume.
+
+Splits movies.csv, users.csv and reviews.csv into partitions, records the plan
+in IngestPartition and loads the partitions across a process pool with the
+set-based loaders from utils.bulk_ingest. Each partition is loaded and marked
+done in a single transaction, so if the run is interrupted, running the same
+command again only loads the partitions that never committed. Ids are fixed
+when the plan is made, so a retried partition gets the same ids as the first try.
+
+Movies and users load first, then reviews (which reference both).
+
+Run from the sceneit directory:
+    python -m utils.parallel_ingest [--workers 4] [--partition-size 5000] [--sample-size 50] [--restart]
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import psycopg2
+from psycopg2 import errors
+
+from objects.movie import Movie
+from objects.review import Review
+from objects.user import User
+from queries.create_tables import CREATE_TABLES_SQL, MIGRATE_TIMESTAMPS_SQL, CREATE_INDICES_SQL, INFO_TS_VECTOR_TRIGGER
+from queries.ingest import (
+    CREATE_INGEST_PARTITION_TABLE_SQL,
+    GET_INGEST_PARTITIONS_SQL,
+    INSERT_INGEST_PARTITION_SQL,
+    CLAIM_INGEST_PARTITION_SQL,
+    SET_INGEST_PARTITION_ROWS_SQL,
+    DELETE_INGEST_PARTITIONS_SQL,
+    SYNC_ID_SEQUENCE_SQL,
+    MAX_ID_SQL,
+)
+from queries.reputation import CREATE_REPUTATION_TABLE_SQL, CREATE_REPUTATION_TRIGGERS_SQL
+from queries.counters import CREATE_COUNTER_TRIGGERS_SQL
+from queries.response_cache import CREATE_CACHE_TRIGGERS_SQL
+from static.vars import MOVIES_CSV_PATH, USERS_CSV_PATH, REVIEWS_CSV_PATH
+from utils.bulk_ingest import stage_rows, insert_staged_movies, insert_staged_users, insert_staged_reviews
+from utils.counters import migrate_counter_columns
+from utils.db import connection_params, get_db_connection, close_pool
+from utils.insert_data import SAMPLE_SIZE, ingest_limit
+from utils.load_csv import plan_csv_partitions, read_csv_partition
+
+DEFAULT_PARTITION_SIZE = 5000
+MAX_PARTITION_ATTEMPTS = 3
+
+# dataset -> (csv path, row check, table, id column, loader for a stage table)
+DATASETS = {
+    "movies": (MOVIES_CSV_PATH, Movie.movie_attrs_soft_check, "movie", "movie_id", insert_staged_movies),
+    "users": (USERS_CSV_PATH, User.user_attrs_soft_check, "users", "user_id", insert_staged_users),
+    "reviews": (REVIEWS_CSV_PATH, Review.review_attrs_soft_check, "reviews", "review_id", insert_staged_reviews),
+}
+PHASES = [("movies", "users"), ("reviews",)]
+
+
+def ensure_schema(cur):
+    cur.execute(CREATE_TABLES_SQL)
+    cur.execute(MIGRATE_TIMESTAMPS_SQL)
+    migrate_counter_columns(cur)
+    for statement in (CREATE_INDICES_SQL, INFO_TS_VECTOR_TRIGGER,
+                      CREATE_REPUTATION_TABLE_SQL, CREATE_REPUTATION_TRIGGERS_SQL,
+                      CREATE_COUNTER_TRIGGERS_SQL, CREATE_CACHE_TRIGGERS_SQL, CREATE_INGEST_PARTITION_TABLE_SQL):
+        cur.execute(statement)
+
+
+def plan_dataset(cur, dataset, sample_size, partition_size, restart):
+    """
+    Returns the dataset's partitions as (partition_no, source_path, byte_offset,
+    row_count, first_id, status, rows_loaded) rows, creating the plan unless an
+    earlier run already did.
+    """
+    csv_filepath, validate, table, id_column, _ = DATASETS[dataset]
+    if restart:
+        cur.execute(DELETE_INGEST_PARTITIONS_SQL, (dataset,))
+
+    cur.execute(GET_INGEST_PARTITIONS_SQL, (dataset,))
+    partitions = cur.fetchall()
+    if partitions:
+        done = sum(1 for partition in partitions if partition[5] == 'done')
+        print(f"{dataset}: resuming, {done}/{len(partitions)} partitions already loaded")
+        return partitions
+
+    cur.execute(MAX_ID_SQL.format(table=table, id_column=id_column))
+    first_id = cur.fetchone()[0] + 1
+    if first_id > 1:
+        print(f"{dataset}: {table} table already populated. Skipping insertion.")
+        return []
+
+    partitions = []
+    for partition_no, partition in enumerate(plan_csv_partitions(
+            csv_filepath, partition_size, validate, ingest_limit(sample_size))):
+        row = (partition_no, csv_filepath, partition["byte_offset"], partition["row_count"], first_id)
+        cur.execute(INSERT_INGEST_PARTITION_SQL, (dataset,) + row)
+        partitions.append(row + ('pending', None))
+        first_id += partition["valid_count"]
+    print(f"{dataset}: planned {len(partitions)} partitions")
+    return partitions
+
+
+def load_partition(dataset, partition_no, source_path, byte_offset, row_count, first_id):
+    """
+    Worker: loads one partition on its own connection. Errors come back as text
+    since psycopg2 exceptions don't always survive pickling.
+    """
+    _, validate, _, _, insert_staged = DATASETS[dataset]
+    header, rows = read_csv_partition(source_path, byte_offset, row_count)
+    rows = [row for row in rows if validate(row)]
+    stage_table = f"stage_{dataset}"
+
+    for attempt in range(1, MAX_PARTITION_ATTEMPTS + 1):
+        try:
+            conn = psycopg2.connect(**connection_params)
+        except psycopg2.Error as e:
+            return {"dataset": dataset, "partition_no": partition_no, "error": f"connect failed: {e}"}
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    cur.execute(CLAIM_INGEST_PARTITION_SQL, (dataset, partition_no))
+                    if cur.rowcount == 0:
+                        return {"dataset": dataset, "partition_no": partition_no, "rows_loaded": 0, "skipped": True}
+                    stage_rows(cur, stage_table, header, rows, first_id)
+                    rows_loaded = insert_staged(cur, stage_table)
+                    cur.execute(SET_INGEST_PARTITION_ROWS_SQL, (rows_loaded, dataset, partition_no))
+            return {"dataset": dataset, "partition_no": partition_no, "rows_loaded": rows_loaded}
+        except (errors.DeadlockDetected, errors.SerializationFailure) as e:
+            if attempt == MAX_PARTITION_ATTEMPTS:
+                return {"dataset": dataset, "partition_no": partition_no, "error": str(e)}
+            time.sleep(attempt)
+        except Exception as e:
+            return {"dataset": dataset, "partition_no": partition_no, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            conn.close()
+
+
+def run_phase(executor, datasets, plans):
+    """Loads every pending partition of the given datasets. Returns (rows loaded, failed partitions)."""
+    futures = [
+        executor.submit(load_partition, dataset, partition_no, source_path, byte_offset, row_count, first_id)
+        for dataset in datasets
+        for partition_no, source_path, byte_offset, row_count, first_id, status, _ in plans[dataset]
+        if status == 'pending'
+    ]
+    rows_loaded = failed = 0
+    for future in as_completed(futures):
+        result = future.result()
+        label = f"{result['dataset']} partition {result['partition_no']}"
+        if "error" in result:
+            failed += 1
+            print(f"{label} failed: {result['error']}")
+        elif result.get("skipped"):
+            print(f"{label} already loaded")
+        else:
+            rows_loaded += result["rows_loaded"]
+            print(f"{label}: {result['rows_loaded']} rows")
+
+    # partitions insert explicit ids; keep the serials ahead of them for regular inserts
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            for dataset in datasets:
+                _, _, table, id_column, _ = DATASETS[dataset]
+                cur.execute(SYNC_ID_SEQUENCE_SQL.format(table=table, id_column=id_column))
+    return rows_loaded, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="loader processes")
+    parser.add_argument("--partition-size", type=int, default=DEFAULT_PARTITION_SIZE, help="CSV rows per partition")
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE,
+                        help="rows per file to load when IS_PRODUCTION is False")
+    parser.add_argument("--restart", action="store_true",
+                        help="discard saved checkpoints and plan again (only after emptying the tables)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            ensure_schema(cur)
+            plans = {
+                dataset: plan_dataset(cur, dataset, args.sample_size, args.partition_size, args.restart)
+                for dataset in DATASETS
+            }
+
+    total_rows = 0
+    # spawn: workers open their own connections instead of inheriting the parent's sockets
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for datasets in PHASES:
+            rows_loaded, failed = run_phase(executor, datasets, plans)
+            total_rows += rows_loaded
+            if failed:
+                close_pool()
+                print(f"{failed} partitions failed. Run the same command again to resume.")
+                raise SystemExit(1)
+    close_pool()
+
+    seconds = time.perf_counter() - started
+    print(f"Loaded {total_rows} rows in {seconds:.2f}s ({total_rows / seconds:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.context import CryptContext
+
+# bcrypt hashing/verification on a process pool, so the ~250ms of CPU per call
+# neither holds the GIL in the API process nor pins a request thread on it, and
+# logins scale across cores.
+#
+# At most PASSWORD_HASH_MAX_PENDING calls may be queued or running; past that,
+# submit raises PasswordHasherBusy straight away (the endpoints answer 503)
+# instead of letting a burst of logins queue up without bound.
+#
+# Each uvicorn worker process gets its own pool; with several workers, lower
+# PASSWORD_HASH_WORKERS so the pools together don't exceed the cores.
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 4))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_PENDING hashing calls are already queued or running."""
+
+
+# run in the pool's processes
+def _hash(password):
+    return pwd_context.hash(password)
+
+
+def _verify(password, password_hash):
+    return pwd_context.verify(password, password_hash)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.Condition()
+_pending = 0  # calls queued or running, guarded by _slots
+
+
+def get_password_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: forking a process that already runs threads (the
+            # db pool, the scheduler) can copy locks in a held state
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                            mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def close_password_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def _acquire_slot(wait):
+    global _pending
+    with _slots:
+        while _pending >= PASSWORD_HASH_MAX_PENDING:
+            if not wait:
+                return False
+            _slots.wait()
+        _pending += 1
+        return True
+
+
+def _release_slot(_future=None):
+    global _pending
+    with _slots:
+        _pending -= 1
+        _slots.notify()
+
+
+def _submit(fn, *args, wait=False):
+    if not _acquire_slot(wait):
+        raise PasswordHasherBusy("Too many password checks in progress, try again shortly")
+    try:
+        future = get_password_pool().submit(fn, *args)
+    except BaseException:
+        _release_slot()
+        raise
+    future.add_done_callback(_release_slot)
+    return future
+
+
+def hash_password(password):
+    return _submit(_hash, password).result()
+
+
+def verify_password(password, password_hash):
+    return _submit(_verify, password, password_hash).result()
+
+
+async def hash_password_async(password):
+    return await asyncio.wrap_future(_submit(_hash, password))
+
+
+async def verify_password_async(password, password_hash):
+    return await asyncio.wrap_future(_submit(_verify, password, password_hash))
+
+
+def hash_passwords(passwords):
+    """Hashes a batch in parallel (for seeding); waits for slots instead of raising PasswordHasherBusy."""
+    futures = [_submit(_hash, password, wait=True) for password in passwords]
+    return [future.result() for future in futures]
+
+
+def get_password_pool_stats():
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "pending": _pending,
+    }
@@ -0,0 +1,339 @@
+import asyncio
+import functools
+import inspect
+import json
+import os
+import select
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+
+import psycopg2
+
+from queries.response_cache import CACHE_CHANNEL, CREATE_CACHE_TRIGGERS_SQL
+from static.vars import USE_RESPONSE_CACHE
+from utils.db import connection_params, get_db_connection
+
+# In-process cache of whole endpoint responses, keyed by route + parameters.
+#
+# Handlers opt in with @cached(route, tags, ttl): entries expire after ttl
+# seconds and are evicted least-recently-used past RESPONSE_CACHE_MAX_ENTRIES
+# entries or RESPONSE_CACHE_MAX_BYTES of (JSON-encoded) responses. Writes are
+# picked up precisely through the NOTIFY triggers in queries/response_cache.py:
+# a listener thread per process drops every entry carrying a notified tag. If
+# the listener loses its connection the cache is cleared, since notifications
+# sent meanwhile are gone; ttl bounds staleness if the triggers aren't installed.
+#
+# With stale_while_revalidate > 0 (the ranking endpoints), an expired or
+# invalidated entry is still served for that many seconds while one background
+# load replaces it, so a burst of writes doesn't send every reader to Postgres.
+#
+# Errors (e.g. the 404 HTTPException) are never cached.
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 10000))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+
+class _Entry:
+    __slots__ = ("value", "size", "tags", "expires_at", "stale_until")
+
+    def __init__(self, value, size, tags, expires_at, stale_until):
+        self.value = value
+        self.size = size
+        self.tags = tags
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+
+
+def _family(tag):
+    return tag.split(":", 1)[0]
+
+
+class ResponseCache:
+    """Thread-safe LRU of key -> response with TTLs, tag invalidation and stale-while-revalidate."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        self._bytes = 0
+        self._refreshing = set()
+        # invalidation sequence numbers, so a load that raced an invalidation isn't stored
+        self._seq = 0
+        self._invalidated_at = OrderedDict()  # tag or "family:*" -> seq, oldest first
+        self._cleared_at = 0  # loads started before this are never stored
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0,
+                       "evictions": 0, "invalidations": 0, "clears": 0}
+
+    def _lookup(self, key):
+        """Returns (value, "fresh" | "stale" | None)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry.value, "fresh"
+                if now < entry.stale_until:
+                    self._entries.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    return entry.value, "stale"
+                self._remove(key)
+            self._stats["misses"] += 1
+            return None, None
+
+    def _begin_load(self):
+        with self._lock:
+            return self._seq
+
+    def _was_invalidated(self, tags, since):
+        if self._cleared_at > since:
+            return True
+        for tag in tags:
+            if self._invalidated_at.get(tag, 0) > since or self._invalidated_at.get(f"{_family(tag)}:*", 0) > since:
+                return True
+        return False
+
+    def _store(self, key, value, tags, ttl, stale_while_revalidate, since):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if self._was_invalidated(tags, since):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, tags, now + ttl, now + ttl + stale_while_revalidate)
+            self._bytes += size
+            for tag in tags:
+                self._keys_by_tag[tag].add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+    def _claim_refresh(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            self._stats["refreshes"] += 1
+            return True
+
+    def _end_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, tags):
+        """Drops entries carrying any of tags ("family:*" matches the whole family); stale-while-revalidate entries go stale instead."""
+        now = time.monotonic()
+        with self._lock:
+            self._seq += 1
+            keys = set()
+            for tag in tags:
+                self._invalidated_at[tag] = self._seq
+                self._invalidated_at.move_to_end(tag)
+                if tag.endswith(":*"):
+                    family = tag[:-2]
+                    for known_tag, tagged_keys in self._keys_by_tag.items():
+                        if _family(known_tag) == family:
+                            keys |= tagged_keys
+                else:
+                    keys |= self._keys_by_tag.get(tag, set())
+            for key in keys:
+                entry = self._entries[key]
+                if entry.stale_until > entry.expires_at:
+                    stale_for = entry.stale_until - entry.expires_at
+                    entry.expires_at = min(entry.expires_at, now)
+                    entry.stale_until = entry.expires_at + stale_for
+                else:
+                    self._remove(key)
+            self._stats["invalidations"] += len(keys)
+            # forget the oldest invalidations; loads that started before them are just not stored
+            while len(self._invalidated_at) > self.max_entries:
+                _, seq = self._invalidated_at.popitem(last=False)
+                self._cleared_at = max(self._cleared_at, seq)
+
+    def clear(self):
+        with self._lock:
+            self._seq += 1
+            self._cleared_at = self._seq
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._bytes = 0
+            self._stats["clears"] += 1
+
+    def get_or_load(self, key, tags, load, ttl, stale_while_revalidate=0):
+        value, state = self._lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if self._claim_refresh(key):
+                threading.Thread(target=self._refresh, args=(key, tags, load, ttl, stale_while_revalidate),
+                                 daemon=True).start()
+            return value
+        since = self._begin_load()
+        value = load()
+        self._store(key, value, tags, ttl, stale_while_revalidate, since)
+        return value
+
+    def _refresh(self, key, tags, load, ttl, stale_while_revalidate):
+        try:
+            since = self._begin_load()
+            self._store(key, load(), tags, ttl, stale_while_revalidate, since)
+        except Exception as e:
+            # keep serving the stale entry until it runs out
+            print(f"[{datetime.now()}] Response cache: refresh of {key[0]} failed: {e}")
+        finally:
+            self._end_refresh(key)
+
+    async def get_or_load_async(self, key, tags, load, ttl, stale_while_revalidate=0):
+        value, state = self._lookup(key)
+        if state == "fresh":
+            return value
+        if state == "stale":
+            if self._claim_refresh(key):
+                task = asyncio.create_task(self._refresh_async(key, tags, load, ttl, stale_while_revalidate))
+                _refresh_tasks.add(task)
+                task.add_done_callback(_refresh_tasks.discard)
+            return value
+        since = self._begin_load()
+        value = await load()
+        self._store(key, value, tags, ttl, stale_while_revalidate, since)
+        return value
+
+    async def _refresh_async(self, key, tags, load, ttl, stale_while_revalidate):
+        try:
+            since = self._begin_load()
+            self._store(key, await load(), tags, ttl, stale_while_revalidate, since)
+        except Exception as e:
+            print(f"[{datetime.now()}] Response cache: refresh of {key[0]} failed: {e}")
+        finally:
+            self._end_refresh(key)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes,
+                        max_entries=self.max_entries, max_bytes=self.max_bytes)
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+_refresh_tasks = set()  # background refreshes, referenced until done
+
+
+def cached(route, tags, ttl, stale_while_revalidate=0):
+    """
+    Caches a route handler's responses (sync or async) under route + its parameters.
+    tags is a list, or a function of the handler's parameters returning one.
+    """
+    def decorate(handler):
+        signature = inspect.signature(handler)
+
+        def bind(args, kwargs):
+            # FastAPI passes keywords, but handlers also call each other positionally
+            # (create_movie -> get_movie(movie_id)); normalise so both share a key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return dict(bound.arguments)
+
+        def key_and_tags(params):
+            key = (route, tuple(sorted(params.items())))
+            return key, tags(**params) if callable(tags) else tags
+
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def cached_handler(*args, **kwargs):
+                params = bind(args, kwargs)
+                if not USE_RESPONSE_CACHE:
+                    return await handler(**params)
+                key, entry_tags = key_and_tags(params)
+                return await response_cache.get_or_load_async(
+                    key, entry_tags, lambda: handler(**params), ttl, stale_while_revalidate)
+        else:
+            @functools.wraps(handler)
+            def cached_handler(*args, **kwargs):
+                params = bind(args, kwargs)
+                if not USE_RESPONSE_CACHE:
+                    return handler(**params)
+                key, entry_tags = key_and_tags(params)
+                return response_cache.get_or_load(
+                    key, entry_tags, lambda: handler(**params), ttl, stale_while_revalidate)
+        return cached_handler
+    return decorate
+
+
+def ensure_cache_triggers():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # replacing the triggers locks each table; give up rather than queue
+            # every request behind a long-running transaction
+            cur.execute("SET LOCAL lock_timeout = '2s'")
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext('sceneit.cache_triggers'))")
+            cur.execute(CREATE_CACHE_TRIGGERS_SQL)
+
+
+class CacheInvalidationListener:
+    """LISTENs on CACHE_CHANNEL on its own connection (not the pool) and invalidates response_cache."""
+
+    def __init__(self, cache, reconnect_delay=5.0):
+        self.cache = cache
+        self.reconnect_delay = reconnect_delay
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="response-cache-listener", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**connection_params)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CACHE_CHANNEL}")
+                # whatever was written while nobody listened may be cached
+                self.cache.clear()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.cache.invalidate(conn.notifies.pop(0).payload.split(","))
+            except psycopg2.Error as e:
+                print(f"[{datetime.now()}] Response cache listener error, reconnecting: {e}")
+                self.cache.clear()
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+cache_listener = CacheInvalidationListener(response_cache)
+
+
+def get_response_cache_stats():
+    return dict(response_cache.stats(), enabled=USE_RESPONSE_CACHE, listening=cache_listener._thread is not None)
@@ -1,33 +1,59 @@
 from utils.db import get_db_connection
 import psycopg2
+import psycopg2.extras
 
+# Review details, author and like count for many reviews in one round trip,
+# instead of two queries (and a connection) per review
+REVIEW_INFOS_SQL = """
+    SELECT r.*, u.username, u.email, r.like_count AS likes_count
+    FROM reviews r
+    JOIN users u ON r.user_id = u.user_id
+    WHERE r.review_id = ANY(%s)
+"""
 
-def get_review_info(review_id: int):
-    conn = get_db_connection()
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-
-    # Query to get review details
-    query = """
-        SELECT r.*, u.username, u.email
-        FROM reviews r
-        JOIN users u ON r.user_id = u.user_id
-        WHERE r.review_id = %s
+
+def _in_requested_order(review_ids, rows):
+    by_id = {row['review_id']: row for row in rows}
+    return [by_id[review_id] for review_id in review_ids if review_id in by_id]
+
+
+def get_review_infos(review_ids, conn=None):
     """
-    cur.execute(query, (review_id,))
-    review_info = cur.fetchone()
-
-    # Optionally, fetch likes for this review
-    likes_query = """
-        SELECT COUNT(*) as like_count
-        FROM likes
-        WHERE review_id = %s
+    Review rows (r.*, username, email, likes_count) for a list of review ids,
+    in the order the ids were given (missing reviews are skipped). Uses conn
+    if passed, otherwise borrows one from the pool.
     """
-    cur.execute(likes_query, (review_id,))
-    likes_count = cur.fetchone()['like_count']
+    review_ids = list(review_ids)
+    if not review_ids:
+        return []
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(REVIEW_INFOS_SQL, (review_ids,))
+            rows = cur.fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    return _in_requested_order(review_ids, rows)
+
+
+def get_review_info(review_id: int):
+    # Review details plus author and like count, or None if it doesn't exist
+    review_infos = get_review_infos([review_id])
+    return review_infos[0] if review_infos else None
+
 
-    review_info['likes_count'] = likes_count  # Add likes count to the review info
+async def get_review_infos_async(conn, review_ids):
+    review_ids = list(review_ids)
+    if not review_ids:
+        return []
 
-    cur.close()
-    conn.close()
+    async with conn.cursor() as cur:
+        await cur.execute(REVIEW_INFOS_SQL, (review_ids,))
+        rows = await cur.fetchall()
 
-    return review_info
+    return _in_requested_order(review_ids, rows)
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+
+# Signed session tokens handed out by /users/login, so later requests identify
+# the user with one HMAC check instead of another bcrypt verification.
+#
+# A token is base64url(payload) + "." + base64url(HMAC-SHA256(payload)), where the
+# payload holds the user id and expiry. Tokens are stateless: they stay valid
+# until they expire or SESSION_SECRET changes. SESSION_SECRET must be the same
+# for every worker/replica; without it each process signs with its own random
+# key and only accepts the tokens it issued itself.
+
+SESSION_TOKEN_TTL = int(os.environ.get("SESSION_TOKEN_TTL", 7 * 24 * 3600))  # seconds
+
+_secret = os.environ.get("SESSION_SECRET")
+if not _secret:
+    print("SESSION_SECRET is not set; session tokens will only be valid in this process.")
+    _secret = secrets.token_hex(32)
+SESSION_SECRET = _secret.encode()
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload):
+    return hmac.new(SESSION_SECRET, payload, hashlib.sha256).digest()
+
+
+def issue_session_token(user_id, ttl=SESSION_TOKEN_TTL):
+    """Returns (token, expires_at as a unix timestamp)."""
+    expires_at = int(time.time()) + ttl
+    payload = json.dumps({"uid": user_id, "exp": expires_at}, separators=(",", ":")).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}", expires_at
+
+
+def verify_session_token(token):
+    """Returns the user id in token. Raises ValueError if it is malformed, forged or expired."""
+    try:
+        encoded_payload, encoded_signature = token.split(".")
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, binascii.Error):
+        raise ValueError("Invalid session token")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError("Invalid session token")
+    claims = json.loads(payload)
+    if claims["exp"] < time.time():
+        raise ValueError("Session expired")
+    return claims["uid"]
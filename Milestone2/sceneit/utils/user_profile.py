@@ -1,17 +1,42 @@
 from utils.db import get_db_connection
-# Gets all reviews and comments written by a user.
+from utils.pagination import DEFAULT_PAGE_SIZE, apply_keyset, paginate
+
+# Query to get all review IDs associated with the user
+USER_REVIEW_IDS_SQL = "SELECT review_id, created_at FROM reviews where user_id = %s"
+USER_REVIEW_IDS_SORT_KEYS = [("reviews.created_at", [], "DESC"), ("reviews.review_id", [], "DESC")]
+USER_REVIEW_IDS_CURSOR_COLUMNS = ["created_at", "review_id"]
+USER_REVIEW_IDS_CURSOR_TAG = "user_reviews"
+
+
+def _user_review_ids_query(user_id: int, limit: int, cursor):
+    return apply_keyset(USER_REVIEW_IDS_SQL, [user_id], USER_REVIEW_IDS_SORT_KEYS,
+                        USER_REVIEW_IDS_CURSOR_TAG, cursor, limit)
+
+
+# Gets one page of reviews written by a user, newest first.
+# Returns (review_ids, next_cursor); raises ValueError for a bad cursor.
 # Comments table is not made yet
-def review_ids_from_user(user_id: int):
+def review_ids_from_user(user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor=None):
+    query, params = _user_review_ids_query(user_id, limit, cursor)
+
     conn = get_db_connection()
     cur = conn.cursor()
 
-    # Query to get all review IDs associated with the user
-    user_reviews_query = "SELECT review_id FROM reviews where user_id = %s order by reviews.created_at desc"
-    cur.execute(user_reviews_query, (user_id,))
-    review_ids = cur.fetchall()  # Fetch all review IDs
-    # print('REVIEW IDS', review_ids)
+    cur.execute(query, params)
+    columns = [desc[0] for desc in cur.description]
+    rows = [dict(zip(columns, row)) for row in cur.fetchall()]
     cur.close()
     conn.close()
 
-    # Return a list of review_ids
-    return [review_id[0] for review_id in review_ids]  # Extract the first item from each tuple
+    rows, next_cursor = paginate(rows, limit, USER_REVIEW_IDS_CURSOR_TAG, USER_REVIEW_IDS_CURSOR_COLUMNS)
+    return [row["review_id"] for row in rows], next_cursor
+
+
+async def review_ids_from_user_async(conn, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor=None):
+    query, params = _user_review_ids_query(user_id, limit, cursor)
+    async with conn.cursor() as cur:
+        await cur.execute(query, params)
+        rows = await cur.fetchall()
+
+    rows, next_cursor = paginate(rows, limit, USER_REVIEW_IDS_CURSOR_TAG, USER_REVIEW_IDS_CURSOR_COLUMNS)
+    return [row["review_id"] for row in rows], next_cursor
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psycopg2
+import psycopg2.extras
+
+from utils.bulk_writes import bulk_add_watched, bulk_like_items
+from utils.db import get_db_connection
+
+# In-process write-behind buffers for fire-and-forget events (POST /watch and
+# POST /likes/ when USE_WRITE_BEHIND is on in static/vars.py).
+#
+# The endpoint acknowledges as soon as the event is buffered; a flusher thread
+# writes buffered events with the set-wise writers in utils/bulk_writes.py (one
+# multi-row INSERT per batch) once a batch is full or the oldest event has waited
+# flush_interval seconds. The buffer is bounded: offer() returns False when it is
+# full and the endpoint writes that event synchronously instead, so a burst
+# slows requests down rather than growing memory or dropping events. Events that
+# turn out to be invalid (unknown user, already liked, ...) were already
+# acknowledged; they are only counted as rejected.
+#
+# Whatever is buffered is flushed on shutdown, but a crashed process loses its
+# buffer (at most max_pending events).
+
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("WRITE_BEHIND_BATCH_SIZE", 500))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.environ.get("WRITE_BEHIND_FLUSH_INTERVAL", 1.0))  # seconds
+WRITE_BEHIND_MAX_PENDING = int(os.environ.get("WRITE_BEHIND_MAX_PENDING", 10000))
+
+
+class WriteBehindBuffer:
+    """Thread-safe bounded buffer drained by one flusher thread into bulk_write(cur, items)."""
+
+    def __init__(self, name, bulk_write, batch_size, flush_interval, max_pending):
+        self.name = name
+        self.bulk_write = bulk_write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._oldest = None  # monotonic time the oldest pending event was buffered
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # one batch in flight at a time
+        self._thread = None
+        self._stopping = False
+        self._stats = {
+            "buffered": 0, "overflowed": 0, "written": 0, "rejected": 0, "lost": 0,
+            "flushes": 0, "failed_flushes": 0, "max_depth": 0,
+            "last_flush_seconds": 0.0, "max_flush_seconds": 0.0, "total_flush_seconds": 0.0,
+        }
+
+    def offer(self, item):
+        """Buffers item; returns False (and buffers nothing) if the buffer is full or not running."""
+        with self._cond:
+            if self._thread is None or self._stopping or len(self._pending) >= self.max_pending:
+                self._stats["overflowed"] += 1
+                return False
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(item)
+            self._stats["buffered"] += 1
+            self._stats["max_depth"] = max(self._stats["max_depth"], len(self._pending))
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops the flusher and writes out everything still buffered."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify()
+        thread.join()
+        with self._cond:
+            self._thread = None
+        while self.flush():
+            pass
+        with self._cond:
+            if self._pending:
+                # the database is unreachable; nothing left to retry with
+                self._stats["lost"] += len(self._pending)
+                self._pending.clear()
+
+    def _ready(self):
+        return bool(self._pending) and (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._oldest >= self.flush_interval
+        )
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping and not self._ready():
+                    timeout = self.flush_interval
+                    if self._pending:
+                        timeout = max(0.0, self.flush_interval - (time.monotonic() - self._oldest))
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+            if not self.flush():
+                # database error: back off instead of spinning on the same batch
+                time.sleep(self.flush_interval)
+
+    def flush(self):
+        """Writes up to batch_size buffered events; returns True if a batch was written."""
+        with self._flush_lock:
+            with self._cond:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                if self._pending:
+                    self._oldest = time.monotonic()
+            if not batch:
+                return False
+
+            started = time.perf_counter()
+            try:
+                with get_db_connection() as conn:
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                        summary = self.bulk_write(cur, batch)
+            except psycopg2.Error as e:
+                print(f"[{datetime.now()}] Write-behind {self.name}: flush of {len(batch)} events failed: {e}")
+                with self._cond:
+                    self._stats["failed_flushes"] += 1
+                    # put the batch back in front, as much of it as still fits
+                    room = max(0, self.max_pending - len(self._pending))
+                    self._stats["lost"] += max(0, len(batch) - room)
+                    self._pending.extendleft(reversed(batch[:room]))
+                    if self._pending:
+                        self._oldest = time.monotonic()
+                return False
+
+            seconds = time.perf_counter() - started
+            with self._cond:
+                self._stats["flushes"] += 1
+                self._stats["written"] += len(batch) - summary["failed"]
+                self._stats["rejected"] += summary["failed"]
+                self._stats["last_flush_seconds"] = seconds
+                self._stats["max_flush_seconds"] = max(self._stats["max_flush_seconds"], seconds)
+                self._stats["total_flush_seconds"] += seconds
+            return True
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats["depth"] = len(self._pending)
+            stats["running"] = self._thread is not None
+        stats["avg_flush_seconds"] = stats.pop("total_flush_seconds") / stats["flushes"] if stats["flushes"] else 0.0
+        stats.update(batch_size=self.batch_size, flush_interval=self.flush_interval, max_pending=self.max_pending)
+        return stats
+
+
+watch_buffer = WriteBehindBuffer("watched", bulk_add_watched, WRITE_BEHIND_BATCH_SIZE,
+                                 WRITE_BEHIND_FLUSH_INTERVAL, WRITE_BEHIND_MAX_PENDING)
+like_buffer = WriteBehindBuffer("likes", bulk_like_items, WRITE_BEHIND_BATCH_SIZE,
+                                WRITE_BEHIND_FLUSH_INTERVAL, WRITE_BEHIND_MAX_PENDING)
+WRITE_BEHIND_BUFFERS = (watch_buffer, like_buffer)
+
+
+def start_write_behind():
+    for buffer in WRITE_BEHIND_BUFFERS:
+        buffer.start()
+
+
+def stop_write_behind():
+    for buffer in WRITE_BEHIND_BUFFERS:
+        buffer.stop()
+
+
+def get_write_behind_stats():
+    return {buffer.name: buffer.stats() for buffer in WRITE_BEHIND_BUFFERS}